@@ -1,6 +1,17 @@
+from collections.abc import Mapping
 import json
+import os
+import posixpath
+import sqlite3
+import sys
+import threading
 from pathlib import Path
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from . import utilities
 
 global __logger__
@@ -75,17 +86,175 @@ ASSET_DESCRIPTOR_TEMPLATE = '''
             {"import_path": "Textures", "asset_catalog_name": "PolygonNatureBiomes"}
         ],
         "suffixes": [".png", ".tga", ".jpeg", ".jpg"]
+    },
+    "num_workers": 0,
+    "worker_pool": "thread",
+    "parallel_process_asset_data": false,
+    "yaml_backend": "python",
+    "yaml_parse_cache": {
+        "enabled": false,
+        "cache_path": ".yaml_parse_cache",
+        "max_size": 268435456
+    },
+    "guid_database": {
+        "enabled": false,
+        "database_path": "../asset_guid_database.sqlite3"
+    },
+    "asset_metadata_store": {
+        "type": "sqlite",
+        "journal_compaction_threshold": 10000
     }
 }
 '''
 
 MODEL_INFO_TEMPLATE = {
+    'asset_type': 'MODEL',
     'asset_path': '',
     'position': [0, 0, 0],
     'rotation': [0, 0, 0],
     'scale': [1, 1, 1],
 }
 
+SCENE_MODEL_INFOS_PATH = '.scene_model_infos'
+
+# dependency (UNRESOLVED_GUID, asset_type, guid) on a guid which was not registered when the asset was processed
+UNRESOLVED_GUID = 'UNRESOLVED_GUID'
+
+
+class ModelInfoView(Mapping):
+    """
+    read-only MODEL_INFO_TEMPLATE shaped dict view of one row of SceneModelInfos.
+    """
+    __slots__ = ('_scene_model_infos', '_index')
+
+    def __init__(self, scene_model_infos, index):
+        self._scene_model_infos = scene_model_infos
+        self._index = index
+
+    def __getitem__(self, key):
+        if 'asset_type' == key:
+            return self._scene_model_infos.get_asset_type(self._index)
+        elif 'asset_path' == key:
+            return self._scene_model_infos.get_asset_path(self._index)
+        transforms = self._scene_model_infos.get_transforms(key)
+        if transforms is None:
+            raise KeyError(key)
+        return transforms[self._index].tolist()
+
+    def __iter__(self):
+        return iter(MODEL_INFO_TEMPLATE.keys())
+
+    def __len__(self):
+        return len(MODEL_INFO_TEMPLATE)
+
+
+class SceneModelInfos:
+    """
+    columnar model_infos of a scene: an asset_type and asset_path table, an index into it per instance and
+    Nx3 float32 position, rotation and scale arrays. saved to a sidecar .npz next to the asset metadata,
+    the arrays are loaded on first access. iterating yields ModelInfoView, which reads like MODEL_INFO_TEMPLATE.
+    """
+    def __init__(self, asset_types=None, asset_paths=None, asset_path_indices=None, positions=None, rotations=None, scales=None, filepath=None, count=0):
+        self._asset_types = asset_types
+        self._asset_paths = asset_paths
+        self._asset_path_indices = asset_path_indices
+        self._transforms = {'position': positions, 'rotation': rotations, 'scale': scales}
+        self._filepath = Path(filepath) if filepath else None
+        self._count = len(asset_path_indices) if asset_path_indices is not None else count
+
+    @classmethod
+    def create(cls, assets, asset_path_indices, transforms):
+        """
+        assets: (asset_type, asset_path) table
+        transforms: position, rotation and scale of each instance in a row of 9 floats
+        """
+        transforms = numpy.array(transforms, dtype=numpy.float32).reshape(-1, 9)
+        return cls(
+            asset_types=[asset_type for (asset_type, asset_path) in assets],
+            asset_paths=[asset_path for (asset_type, asset_path) in assets],
+            asset_path_indices=numpy.array(asset_path_indices, dtype=numpy.int32),
+            positions=transforms[:, 0:3].copy(),
+            rotations=transforms[:, 3:6].copy(),
+            scales=transforms[:, 6:9].copy()
+        )
+
+    @staticmethod
+    def is_dump_data(value):
+        return isinstance(value, dict) and 'scene_model_infos' in value
+
+    def dump(self):
+        return {'scene_model_infos': self._filepath.as_posix() if self._filepath else '', 'count': self._count}
+
+    @classmethod
+    def from_dump_data(cls, value):
+        return cls(filepath=value['scene_model_infos'], count=value.get('count', 0))
+
+    def get_filepath(self):
+        return self._filepath
+
+    def is_loaded(self):
+        return self._asset_path_indices is not None
+
+    def is_valid(self):
+        return self.is_loaded() or (self._filepath is not None and self._filepath.exists())
+
+    def load(self):
+        if not self.is_loaded():
+            with numpy.load(self._filepath.as_posix(), allow_pickle=False) as npz:
+                self._asset_paths = npz['asset_paths'].tolist()
+                # sidecars written before the asset_type table hold models only
+                self._asset_types = npz['asset_types'].tolist() if 'asset_types' in npz else [MODEL_INFO_TEMPLATE['asset_type']] * len(self._asset_paths)
+                self._asset_path_indices = npz['asset_path_indices']
+                for key in self._transforms.keys():
+                    self._transforms[key] = npz[key]
+            self._count = len(self._asset_path_indices)
+
+    def save(self, filepath):
+        self.load()
+        filepath = Path(filepath)
+        if not filepath.parent.exists():
+            filepath.parent.mkdir(parents=True)
+        with open(filepath, 'wb') as f:
+            numpy.savez(
+                f,
+                asset_types=numpy.array(self._asset_types, dtype=str),
+                asset_paths=numpy.array(self._asset_paths, dtype=str),
+                asset_path_indices=self._asset_path_indices,
+                **self._transforms
+            )
+        self._filepath = filepath
+
+    def get_assets(self):
+        self.load()
+        return list(zip(self._asset_types, self._asset_paths))
+
+    def get_asset_type(self, index):
+        self.load()
+        return self._asset_types[self._asset_path_indices[index]]
+
+    def get_asset_path(self, index):
+        self.load()
+        return self._asset_paths[self._asset_path_indices[index]]
+
+    def get_transforms(self, key):
+        self.load()
+        return self._transforms.get(key)
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._count
+        if not (0 <= index < self._count):
+            raise IndexError(index)
+        return ModelInfoView(self, index)
+
+    def __iter__(self):
+        self.load()
+        for index in range(self._count):
+            yield ModelInfoView(self, index)
+
 class AssetTypes:
     ANIMATION_LAYER = 'ANIMATION_LAYER'
     COLOR = 'COLOR'
@@ -159,59 +328,591 @@ class AssetExts:
         return cls.asset_type_exts
 
 
+class FileStates:
+    UNCHANGED = 'UNCHANGED'
+    # same contents with a new mtime, after a git checkout or an archive extract
+    TOUCHED = 'TOUCHED'
+    CHANGED = 'CHANGED'
+
+
 class AssetMetadata:
-    def __init__(self, asset_type='', asset_path='', filepath='', guid='', mtime=None, data=None):
-        self._asset_type = asset_type
-        self._asset_path = Path(asset_path)
-        self._filepath = Path(filepath)
+    """
+    one record per asset. paths are kept as interned posix strings and Path objects are only created on demand,
+    the constructor never touches the file system so that loading tens of thousands of records stays cheap.
+    """
+    __slots__ = ('_asset_type', '_asset_path', '_filepath', '_filepath_object', '_guid', '_mtime', '_size', '_fingerprint', '_data', '_dependencies')
+
+    def __init__(self, asset_type='', asset_path='', filepath='', guid='', mtime=None, size=None, fingerprint='', data=None, dependencies=None):
+        self._asset_type = sys.intern(asset_type)
+        self._asset_path = AssetMetadata.to_posix_path(asset_path)
+        self._filepath = AssetMetadata.to_posix_path(filepath)
+        self._filepath_object = filepath if isinstance(filepath, Path) else None
         self._guid = guid
-        self._mtime = mtime or utilities.get_mtime(self._filepath)
-        self._data = data if data else {}
+        # the file is only stat'ed when get_mtime is called without a stored mtime
+        self._mtime = mtime or None
+        # size and BLAKE2 digest of the file contents, see check_file_state
+        self._size = size
+        self._fingerprint = fingerprint
+        self._data = AssetMetadata.load_data(data) if data else {}
+        # (asset_type, asset_path) of the assets this asset was resolved against, (UNRESOLVED_GUID, asset_type, guid) of the guids which did not resolve
+        self._dependencies = [tuple(dependency) for dependency in dependencies] if dependencies else []
+
+    @staticmethod
+    def to_posix_path(path):
+        # strings that are already normalized posix paths skip the Path round trip
+        if type(path) is str and '\\' not in path and '//' not in path and '/.' not in path and not path.startswith('./') and not path.endswith('/'):
+            return sys.intern(path or '.')
+        return sys.intern(Path(path).as_posix())
+
+    @staticmethod
+    def load_data(data):
+        return dict([
+            (key, SceneModelInfos.from_dump_data(value) if SceneModelInfos.is_dump_data(value) else value) for (key, value) in data.items()
+        ])
+
+    @classmethod
+    def load_asset_metadata_list(cls, asset_metadata_dicts):
+        """
+        bulk loader of dumped records, builds every record in one pass without going through __init__.
+        the dumped paths are already posix strings, so they are only interned.
+        """
+        intern = sys.intern
+        new = object.__new__
+        asset_metadata_list = []
+        for asset_metadata_dict in asset_metadata_dicts:
+            asset_metadata = new(cls)
+            asset_metadata._asset_type = intern(asset_metadata_dict['asset_type'])
+            asset_metadata._asset_path = intern(asset_metadata_dict['asset_path'])
+            asset_metadata._filepath = intern(asset_metadata_dict['filepath'])
+            asset_metadata._filepath_object = None
+            asset_metadata._guid = asset_metadata_dict.get('guid', '')
+            asset_metadata._mtime = asset_metadata_dict.get('mtime') or None
+            asset_metadata._size = asset_metadata_dict.get('size')
+            asset_metadata._fingerprint = asset_metadata_dict.get('fingerprint', '')
+            data = asset_metadata_dict.get('data')
+            asset_metadata._data = cls.load_data(data) if data else {}
+            dependencies = asset_metadata_dict.get('dependencies')
+            asset_metadata._dependencies = [tuple(dependency) for dependency in dependencies] if dependencies else []
+            asset_metadata_list.append(asset_metadata)
+        return asset_metadata_list
 
     def process(self):
         pass
 
     def dump(self):
         return {
-            'asset_type': self.get_asset_type(),
-            'asset_path': self.get_asset_path(),
-            'filepath': self._filepath.as_posix(),
-            'guid': self.get_guid(),
+            'asset_type': self._asset_type,
+            'asset_path': self._asset_path,
+            'filepath': self._filepath,
+            'guid': self._guid,
             'mtime': self.get_mtime(),
-            'data': self._data,
+            'size': self._size,
+            'fingerprint': self._fingerprint,
+            'data': dict([(key, value.dump() if isinstance(value, SceneModelInfos) else value) for (key, value) in self._data.items()]),
+            'dependencies': [list(dependency) for dependency in self._dependencies],
         }
 
     def get_guid(self):
         return self._guid
 
     def get_asset_name(self):
-        return self._asset_path.name
+        return posixpath.basename(self._asset_path)
 
     def get_asset_path(self):
-        return self._asset_path.as_posix()
+        return self._asset_path
 
     def get_asset_type(self):
         return self._asset_type
 
     def get_filepath(self):
+        if self._filepath_object is None:
+            self._filepath_object = Path(self._filepath)
+        return self._filepath_object
+
+    def get_filepath_posix(self):
         return self._filepath
 
     def exists(self):
-        return self._filepath.exists()
+        return utilities.exists(self._filepath)
 
     def get_mtime(self):
+        if self._mtime is None:
+            self._mtime = utilities.get_mtime(self.get_filepath())
         return self._mtime
 
     def update_mtime(self):
-        self._mtime = utilities.get_mtime(self._filepath)
+        self._mtime = utilities.get_mtime(self.get_filepath())
         return self._mtime
 
+    def get_size(self):
+        return self._size
+
+    def get_fingerprint(self):
+        return self._fingerprint
+
+    def update_fingerprint(self, fingerprint=None):
+        """
+        stores the mtime, size and fingerprint of the file. fingerprint is given when it was computed by a worker.
+        """
+        stat = utilities.get_stat(self._filepath)
+        self._mtime = stat.st_mtime if stat is not None else 0
+        self._size = stat.st_size if stat is not None else None
+        self._fingerprint = utilities.get_fingerprint(self._filepath) if fingerprint is None else fingerprint
+        return self._fingerprint
+
+    def check_file_state(self):
+        """
+        (size, mtime) is compared first and the file is hashed only when that check fails, so a file which was
+        rewritten with the same contents is TOUCHED and takes the new mtime. records without a fingerprint compare mtimes,
+        and when that check fails they are CHANGED but take the size and fingerprint of the file, a one-time backfill.
+        """
+        stat = utilities.get_stat(self._filepath)
+        if stat is None:
+            return FileStates.CHANGED
+
+        if not self._fingerprint:
+            if stat.st_mtime <= self.get_mtime():
+                return FileStates.UNCHANGED
+            self._mtime = stat.st_mtime
+            self._size = stat.st_size
+            self._fingerprint = utilities.get_fingerprint(self._filepath)
+            return FileStates.CHANGED
+
+        if stat.st_size != self._size:
+            return FileStates.CHANGED
+
+        if stat.st_mtime == self.get_mtime():
+            return FileStates.UNCHANGED
+
+        if utilities.get_fingerprint(self._filepath) != self._fingerprint:
+            return FileStates.CHANGED
+
+        self._mtime = stat.st_mtime
+        return FileStates.TOUCHED
+
     def get_data(self, key):
         return self._data.get(key)
 
     def set_data(self, key, value):
         self._data[key] = value
 
+    def has_valid_data(self):
+        return all([value.is_valid() for value in self._data.values() if isinstance(value, SceneModelInfos)])
+
+    def get_dependencies(self):
+        return self._dependencies
+
+    def set_dependencies(self, dependencies):
+        self._dependencies = [tuple(dependency) for dependency in dependencies]
+
+
+class AssetReference:
+    def __init__(self, asset_type='', asset_path='', guid='', filepath=None):
+        self._asset_type = asset_type
+        self._asset_path = asset_path
+        self._guid = guid
+        self._filepath = Path(filepath) if filepath else None
+
+    def get_guid(self):
+        return self._guid
+
+    def get_filepath(self):
+        return self._filepath
+
+    def get_asset_path(self):
+        return self._asset_path
+
+    def get_asset_type(self):
+        return self._asset_type
+
+
+class AssetGUIDDatabase:
+    """
+    sqlite index of the assets of every imported asset pack, so that guids referenced across packs resolve
+    without loading the asset_metadata.json of the other packs.
+    a pack is an asset descriptor root, named by AssetDescriptorManager.get_pack_name.
+    """
+    # rows of version 0 were keyed by the directory name of the pack, which collides between packs
+    SCHEMA_VERSION = 1
+
+    def __init__(self, database_path):
+        self._database_path = Path(database_path)
+        self._connection = None
+
+    def get_database_path(self):
+        return self._database_path
+
+    def get_connection(self):
+        if self._connection is None:
+            if not self._database_path.parent.exists():
+                self._database_path.parent.mkdir(parents=True)
+            self._connection = sqlite3.connect(self._database_path.as_posix())
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS assets (
+                    pack_name TEXT NOT NULL,
+                    asset_type TEXT NOT NULL,
+                    asset_path TEXT NOT NULL,
+                    filepath TEXT NOT NULL,
+                    guid TEXT NOT NULL,
+                    mtime REAL NOT NULL,
+                    PRIMARY KEY (pack_name, asset_type, asset_path)
+                );
+                CREATE INDEX IF NOT EXISTS assets_guid ON assets (guid, asset_type);
+            ''')
+            if self._connection.execute('PRAGMA user_version').fetchone()[0] < self.SCHEMA_VERSION:
+                # every pack writes its rows again under the new name on its next process
+                with self._connection:
+                    self._connection.execute('DELETE FROM assets')
+                    self._connection.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def find_asset(self, guid, asset_type=None, exclude_pack_name=None):
+        """
+        returns (pack_name, asset_type, asset_path, filepath, guid, mtime) or None.
+        """
+        query = 'SELECT pack_name, asset_type, asset_path, filepath, guid, mtime FROM assets WHERE guid = ?'
+        parameters = [guid]
+        if asset_type is not None:
+            query += ' AND asset_type = ?'
+            parameters.append(asset_type)
+        if exclude_pack_name is not None:
+            query += ' AND pack_name != ?'
+            parameters.append(exclude_pack_name)
+        return self.get_connection().execute(query + ' ORDER BY pack_name LIMIT 1', parameters).fetchone()
+
+    def find_asset_by_path(self, asset_type, asset_path, exclude_pack_name=None):
+        """
+        returns (pack_name, asset_type, asset_path, filepath, guid, mtime) or None.
+        """
+        query = 'SELECT pack_name, asset_type, asset_path, filepath, guid, mtime FROM assets WHERE asset_type = ? AND asset_path = ?'
+        parameters = [asset_type, asset_path]
+        if exclude_pack_name is not None:
+            query += ' AND pack_name != ?'
+            parameters.append(exclude_pack_name)
+        return self.get_connection().execute(query + ' ORDER BY pack_name LIMIT 1', parameters).fetchone()
+
+    def get_pack_names(self):
+        return [row[0] for row in self.get_connection().execute('SELECT DISTINCT pack_name FROM assets ORDER BY pack_name')]
+
+    def update_pack(self, pack_name, asset_metadata_list):
+        """
+        replaces the rows of a pack in one transaction.
+        """
+        connection = self.get_connection()
+        with connection:
+            connection.execute('DELETE FROM assets WHERE pack_name = ?', (pack_name,))
+            connection.executemany(
+                'INSERT OR REPLACE INTO assets (pack_name, asset_type, asset_path, filepath, guid, mtime) VALUES (?, ?, ?, ?, ?, ?)',
+                [
+                    (pack_name, asset_metadata.get_asset_type(), asset_metadata.get_asset_path(), asset_metadata.get_filepath_posix(), asset_metadata.get_guid(), asset_metadata.get_mtime())
+                    for asset_metadata in asset_metadata_list if asset_metadata.get_guid()
+                ]
+            )
+
+
+def load_json_asset_metadata_list(json_filepath):
+    """
+    one-time migration of the asset_metadata.json of older versions, either {asset_type: {asset_path: record}}
+    or {filepath: [record]}. the file is renamed to asset_metadata.json.migrated.
+    """
+    json_filepath = Path(json_filepath)
+    with open(json_filepath, 'r', encoding='utf-8') as f:
+        loaded_data = json.load(f)
+    asset_metadata_dicts = [
+        asset_metadata_dict
+        for asset_metadata_dicts in loaded_data.values()
+        for asset_metadata_dict in (asset_metadata_dicts.values() if isinstance(asset_metadata_dicts, dict) else asset_metadata_dicts)
+    ]
+    asset_metadata_list = AssetMetadata.load_asset_metadata_list(asset_metadata_dicts)
+    json_filepath.rename(json_filepath.with_name(f'{json_filepath.name}.migrated'))
+    return asset_metadata_list
+
+
+class AssetMetadataStore:
+    """
+    sqlite store of the asset metadata of an AssetDescriptorManager or an AssetImportManager.
+    records are upserted per (asset_type, asset_path), so a save only writes the assets which changed in the run.
+    """
+    def __init__(self, database_path):
+        self._database_path = Path(database_path)
+        self._connection = None
+
+    def get_database_path(self):
+        return self._database_path
+
+    def get_connection(self):
+        if self._connection is None:
+            if not self._database_path.parent.exists():
+                self._database_path.parent.mkdir(parents=True)
+            self._connection = sqlite3.connect(self._database_path.as_posix())
+            self._connection.executescript('''
+                CREATE TABLE IF NOT EXISTS asset_metadata (
+                    asset_type TEXT NOT NULL,
+                    asset_path TEXT NOT NULL,
+                    filepath TEXT NOT NULL,
+                    guid TEXT NOT NULL,
+                    mtime REAL NOT NULL,
+                    size INTEGER,
+                    fingerprint TEXT NOT NULL DEFAULT '',
+                    data TEXT,
+                    dependencies TEXT,
+                    PRIMARY KEY (asset_type, asset_path)
+                );
+                CREATE INDEX IF NOT EXISTS asset_metadata_guid ON asset_metadata (guid, asset_type);
+                CREATE INDEX IF NOT EXISTS asset_metadata_filepath ON asset_metadata (filepath);
+            ''')
+            # stores created before the content fingerprints
+            columns = [row[1] for row in self._connection.execute('PRAGMA table_info(asset_metadata)')]
+            if 'fingerprint' not in columns:
+                with self._connection:
+                    self._connection.execute('ALTER TABLE asset_metadata ADD COLUMN size INTEGER')
+                    self._connection.execute("ALTER TABLE asset_metadata ADD COLUMN fingerprint TEXT NOT NULL DEFAULT ''")
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def migrate_json(self, json_filepath):
+        asset_metadata_list = load_json_asset_metadata_list(json_filepath)
+        self.save(asset_metadata_list)
+        return len(asset_metadata_list)
+
+    def load_asset_metadata_list(self):
+        rows = self.get_connection().execute('SELECT asset_type, asset_path, filepath, guid, mtime, size, fingerprint, data, dependencies FROM asset_metadata')
+        return AssetMetadata.load_asset_metadata_list([
+            {
+                'asset_type': asset_type,
+                'asset_path': asset_path,
+                'filepath': filepath,
+                'guid': guid,
+                'mtime': mtime,
+                'size': size,
+                'fingerprint': fingerprint,
+                'data': json.loads(data) if data else None,
+                'dependencies': json.loads(dependencies) if dependencies else None,
+            } for (asset_type, asset_path, filepath, guid, mtime, size, fingerprint, data, dependencies) in rows
+        ])
+
+    def append(self, asset_metadata_list, removed_assets=()):
+        # the records are written in one transaction by save
+        return False
+
+    def save(self, asset_metadata_list, removed_assets=()):
+        """
+        upserts asset_metadata_list and deletes the (asset_type, asset_path) of removed_assets in one transaction.
+        """
+        rows = []
+        for asset_metadata in asset_metadata_list:
+            asset_metadata_dict = asset_metadata.dump()
+            rows.append((
+                asset_metadata_dict['asset_type'],
+                asset_metadata_dict['asset_path'],
+                asset_metadata_dict['filepath'],
+                asset_metadata_dict['guid'],
+                asset_metadata_dict['mtime'],
+                asset_metadata_dict['size'],
+                asset_metadata_dict['fingerprint'],
+                json.dumps(asset_metadata_dict['data']) if asset_metadata_dict['data'] else None,
+                json.dumps(asset_metadata_dict['dependencies']) if asset_metadata_dict['dependencies'] else None,
+            ))
+
+        connection = self.get_connection()
+        with connection:
+            connection.executemany('DELETE FROM asset_metadata WHERE asset_type = ? AND asset_path = ?', list(removed_assets))
+            connection.executemany(
+                'INSERT OR REPLACE INTO asset_metadata (asset_type, asset_path, filepath, guid, mtime, size, fingerprint, data, dependencies) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+
+class AssetMetadataJournal:
+    """
+    journaled alternative to AssetMetadataStore: a snapshot with one compact json record per line and
+    an append-only journal of ["put", record] and ["del", asset_type, asset_path] lines replayed on top of it.
+    records are journaled as soon as they are resolved, so an interrupted run keeps the assets it already processed.
+    once the journal holds more than compaction_threshold lines, save writes a new snapshot in a background thread.
+    """
+    def __init__(self, snapshot_path, compaction_threshold=10000):
+        self._snapshot_path = Path(snapshot_path)
+        self._journal_path = self._snapshot_path.with_name(f'{self._snapshot_path.stem}.journal.jsonl')
+        # journal which is being folded into the next snapshot by the compaction thread
+        self._compacting_journal_path = self._snapshot_path.with_name(f'{self._snapshot_path.stem}.journal.jsonl.compacting')
+        self._compaction_threshold = compaction_threshold
+        self._journal_file = None
+        self._num_journal_records = 0
+        self._compaction_thread = None
+
+    def get_database_path(self):
+        return self._snapshot_path
+
+    def get_journal_path(self):
+        return self._journal_path
+
+    @staticmethod
+    def encode(record):
+        return json.dumps(record, separators=(',', ':'))
+
+    @staticmethod
+    def read_records(filepath):
+        if filepath.exists():
+            with open(filepath, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        # the last line of a run which was killed while writing
+                        pass
+
+    def get_journal_file(self):
+        if self._journal_file is None:
+            if not self._journal_path.parent.exists():
+                self._journal_path.parent.mkdir(parents=True)
+            self._journal_file = open(self._journal_path, 'a', encoding='utf-8')
+            # terminate a line which was cut by a killed run, so that the next record is not lost with it
+            if 0 < self._journal_file.tell():
+                with open(self._journal_path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        self._journal_file.write('\n')
+        return self._journal_file
+
+    def close(self):
+        self.wait_compaction()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+    def migrate_json(self, json_filepath):
+        asset_metadata_list = load_json_asset_metadata_list(json_filepath)
+        self.append(asset_metadata_list)
+        return len(asset_metadata_list)
+
+    def load_asset_metadata_list(self):
+        self.wait_compaction()
+        asset_metadata_dicts = {}
+        for asset_metadata_dict in self.read_records(self._snapshot_path):
+            asset_metadata_dicts[(asset_metadata_dict['asset_type'], asset_metadata_dict['asset_path'])] = asset_metadata_dict
+
+        self._num_journal_records = 0
+        for journal_path in [self._compacting_journal_path, self._journal_path]:
+            for record in self.read_records(journal_path):
+                if record[0] == 'put':
+                    asset_metadata_dicts[(record[1]['asset_type'], record[1]['asset_path'])] = record[1]
+                else:
+                    asset_metadata_dicts.pop((record[1], record[2]), None)
+                self._num_journal_records += 1
+        return AssetMetadata.load_asset_metadata_list(asset_metadata_dicts.values())
+
+    def append(self, asset_metadata_list, removed_assets=()):
+        """
+        appends the records to the journal and flushes it, returns True as the records are stored right away.
+        """
+        lines = [self.encode(['del', asset_type, asset_path]) for (asset_type, asset_path) in removed_assets]
+        lines.extend([self.encode(['put', asset_metadata.dump()]) for asset_metadata in asset_metadata_list])
+        if lines:
+            journal_file = self.get_journal_file()
+            journal_file.write(''.join([f'{line}\n' for line in lines]))
+            journal_file.flush()
+            self._num_journal_records += len(lines)
+        return True
+
+    def save(self, asset_metadata_list, removed_assets=()):
+        self.append(asset_metadata_list, removed_assets)
+        return len(asset_metadata_list)
+
+    def needs_compaction(self):
+        return self._compaction_threshold < self._num_journal_records
+
+    def compact(self, asset_metadata_list):
+        self.wait_compaction()
+        if self._journal_file is not None:
+            self._journal_file.close()
+            self._journal_file = None
+
+        # the records appended from now on go to a new journal, which is replayed after the snapshot
+        if self._journal_path.exists():
+            if self._compacting_journal_path.exists():
+                with open(self._compacting_journal_path, 'a', encoding='utf-8') as f:
+                    f.write(self._journal_path.read_text(encoding='utf-8'))
+                self._journal_path.unlink()
+            else:
+                self._journal_path.rename(self._compacting_journal_path)
+        self._num_journal_records = 0
+
+        asset_metadata_dicts = [asset_metadata.dump() for asset_metadata in asset_metadata_list]
+        self._compaction_thread = threading.Thread(target=self.write_snapshot, args=(asset_metadata_dicts,))
+        self._compaction_thread.start()
+
+    def write_snapshot(self, asset_metadata_dicts):
+        temp_snapshot_path = self._snapshot_path.with_name(f'{self._snapshot_path.name}.tmp')
+        with open(temp_snapshot_path, 'w', encoding='utf-8') as f:
+            for asset_metadata_dict in asset_metadata_dicts:
+                f.write(self.encode(asset_metadata_dict))
+                f.write('\n')
+        os.replace(temp_snapshot_path, self._snapshot_path)
+        self._compacting_journal_path.unlink(missing_ok=True)
+
+    def wait_compaction(self):
+        if self._compaction_thread is not None:
+            self._compaction_thread.join()
+            self._compaction_thread = None
+
+
+class AssetDescriptorSnapshot:
+    """
+    read-only guid and asset_path tables of an AssetDescriptorManager, sent to the workers of the parallel asset processing.
+    get_asset_metadata returns AssetReference instead of AssetMetadata.
+    """
+    def __init__(self, asset_paths_by_guid_types=None, guids_by_asset_path_types=None, asset_types_by_guid=None, guid_database_path=None, pack_name=None, filepaths_by_guid_types=None):
+        self._asset_paths_by_guid_types = asset_paths_by_guid_types or {}
+        self._filepaths_by_guid_types = filepaths_by_guid_types or {}
+        self._guids_by_asset_path_types = guids_by_asset_path_types or {}
+        self._asset_types_by_guid = asset_types_by_guid or {}
+        # only the path is inherited by the workers, an sqlite connection must not be used across fork.
+        # each worker opens its own connection on the first lookup.
+        self._guid_database_path = guid_database_path
+        self._guid_database = None
+        self._pack_name = pack_name
+
+    def get_guid_database(self):
+        if self._guid_database is None and self._guid_database_path is not None:
+            self._guid_database = AssetGUIDDatabase(self._guid_database_path)
+        return self._guid_database
+
+    def get_filepath(self, asset_type, guid):
+        return self._filepaths_by_guid_types.get(asset_type, {}).get(guid)
+
+    def get_asset_metadata(self, asset_type, asset_path=None, guid=None):
+        if guid:
+            if asset_type is None:
+                registered_asset_type = self._asset_types_by_guid.get(guid)
+                if registered_asset_type is not None:
+                    return AssetReference(registered_asset_type, self._asset_paths_by_guid_types[registered_asset_type][guid], guid, self.get_filepath(registered_asset_type, guid))
+            else:
+                registered_asset_path = self._asset_paths_by_guid_types.get(asset_type, {}).get(guid)
+                if registered_asset_path is not None:
+                    return AssetReference(asset_type, registered_asset_path, guid, self.get_filepath(asset_type, guid))
+
+            guid_database = self.get_guid_database()
+            if guid_database is not None:
+                row = guid_database.find_asset(guid, asset_type=asset_type, exclude_pack_name=self._pack_name)
+                if row is not None:
+                    (pack_name, registered_asset_type, registered_asset_path, filepath, guid, mtime) = row
+                    return AssetReference(registered_asset_type, registered_asset_path, guid, filepath)
+
+        guids_by_asset_path = self._guids_by_asset_path_types.get(asset_type, {})
+        if asset_path in guids_by_asset_path:
+            return AssetReference(asset_type, asset_path, guids_by_asset_path[asset_path])
+        return None
+
 
 class AssetParser:
     pass
@@ -231,12 +932,31 @@ class AssetDescriptorManager:
 
         self._root_path = Path(root_path)
         self._descriptor_name = self._root_path.stem
+        # key of the pack in the guid database, unique unlike the directory name
+        self._pack_name = self._root_path.resolve().as_posix()
         self._asset_metadata_filepath = Path(self._root_path, 'asset_metadata.json')
+        self._asset_metadata_store = AssetMetadataStore(Path(self._root_path, 'asset_metadata.sqlite3'))
         self._asset_descriptor_filepath = Path(self._root_path, 'asset_descriptor.json')
         self._asset_metadata_by_types = {}
+        # (asset_type, asset_path) of the records to write or delete on the next save_asset_metadata
+        self._dirty_assets = set()
+        self._removed_assets = set()
+        # asset_path of the scenes whose removal is already journaled, their sidecars are deleted on save_asset_metadata
+        self._removed_scenes = set()
+        self._asset_metadata_by_guid_types = {}
+        self._asset_metadata_by_guid = {}
+        # reverse dependency edges: (asset_type, asset_path) or (UNRESOLVED_GUID, asset_type, guid) -> (asset_type, asset_path) of the assets which depend on it
+        self._asset_dependents = {}
+        # assets of the other packs, resolved by guid from the guid database
+        self._guid_database = None
+        self._external_asset_metadata_by_guid = {}
+        # records with data of the other packs, read from their asset metadata stores: pack_name -> {(asset_type, asset_path): AssetMetadata}
+        self._external_asset_metadata_by_packs = {}
 
     def close(self):
         self.save_asset_metadata()
+        self._asset_metadata_store.close()
+        self.close_guid_database()
 
     def get_root_path(self):
         return self._root_path
@@ -244,6 +964,9 @@ class AssetDescriptorManager:
     def get_descriptor_name(self):
         return self._descriptor_name
 
+    def get_pack_name(self):
+        return self._pack_name
+
     def get_asset_descriptor_filepath(self):
         return self._asset_descriptor_filepath.as_posix()
 
@@ -259,45 +982,349 @@ class AssetDescriptorManager:
 
     def get_asset_metadata(self, asset_type, asset_path=None, guid=None):
         if guid:
-            for asset_metadata in self.get_asset_metadata_list(asset_type).values():
-                if asset_metadata.get_guid() == guid:
-                    return asset_metadata
+            asset_metadata_by_guid = self._asset_metadata_by_guid if asset_type is None else self._asset_metadata_by_guid_types.get(asset_type, {})
+            asset_metadata = asset_metadata_by_guid.get(guid)
+            if asset_metadata:
+                return asset_metadata
+
+            asset_metadata = self.get_external_asset_metadata(asset_type, guid)
+            if asset_metadata:
+                return asset_metadata
 
         return self.get_asset_metadata_list(asset_type).get(asset_path)
 
+    def open_asset_metadata_store(self, asset_descriptor_data):
+        asset_metadata_store_info = asset_descriptor_data.get('asset_metadata_store', {})
+        if asset_metadata_store_info.get('type', 'sqlite') == 'journal':
+            if not isinstance(self._asset_metadata_store, AssetMetadataJournal):
+                self._asset_metadata_store.close()
+                self._asset_metadata_store = AssetMetadataJournal(
+                    Path(self._root_path, 'asset_metadata.jsonl'),
+                    compaction_threshold=asset_metadata_store_info.get('journal_compaction_threshold', 10000)
+                )
+        elif not isinstance(self._asset_metadata_store, AssetMetadataStore):
+            self._asset_metadata_store.close()
+            self._asset_metadata_store = AssetMetadataStore(Path(self._root_path, 'asset_metadata.sqlite3'))
+        __logger__.info(f'open_asset_metadata_store: {self._asset_metadata_store.get_database_path()}')
+
+    def journal_asset_metadata(self, asset_metadata_list=(), removed_assets=()):
+        # a journaled record must not refer to a sidecar which is not written yet, it would be reparsed after a crash
+        for asset_metadata in asset_metadata_list:
+            self.save_asset_scene_model_infos(asset_metadata)
+        # a journaled store writes the records right away, otherwise they stay dirty until save_asset_metadata
+        if self._asset_metadata_store.append(asset_metadata_list, removed_assets):
+            for asset_metadata in asset_metadata_list:
+                self._dirty_assets.discard((asset_metadata.get_asset_type(), asset_metadata.get_asset_path()))
+            self._removed_assets.difference_update(removed_assets)
+            self._removed_scenes.update([asset_path for (asset_type, asset_path) in removed_assets if AssetTypes.SCENE == asset_type])
+
+    def open_guid_database(self, asset_descriptor_data):
+        guid_database_info = asset_descriptor_data.get('guid_database', {})
+        if guid_database_info.get('enabled', False) and self._guid_database is None:
+            database_path = Path(self._root_path, guid_database_info.get('database_path', '../asset_guid_database.sqlite3')).resolve()
+            __logger__.info(f'open_guid_database: {database_path}')
+            self._guid_database = AssetGUIDDatabase(database_path)
+        self._external_asset_metadata_by_guid.clear()
+        self._external_asset_metadata_by_packs.clear()
+
+    def close_guid_database(self):
+        if self._guid_database is not None:
+            self._guid_database.close()
+            self._guid_database = None
+        self._external_asset_metadata_by_guid.clear()
+        self._external_asset_metadata_by_packs.clear()
+
+    def get_guid_database(self):
+        return self._guid_database
+
+    def get_external_asset_metadata(self, asset_type, guid):
+        if self._guid_database is None:
+            return None
+
+        asset_metadata = self._external_asset_metadata_by_guid.get((asset_type, guid))
+        if asset_metadata is None and (asset_type, guid) not in self._external_asset_metadata_by_guid:
+            row = self._guid_database.find_asset(guid, asset_type=asset_type, exclude_pack_name=self._pack_name)
+            if row is not None:
+                (pack_name, registered_asset_type, asset_path, filepath, guid, mtime) = row
+                asset_metadata = AssetMetadata(asset_type=registered_asset_type, asset_path=asset_path, filepath=filepath, guid=guid, mtime=mtime)
+                __logger__.debug(f'get_external_asset_metadata: {guid}, {registered_asset_type}, {asset_path}, pack: {pack_name}')
+            self._external_asset_metadata_by_guid[(asset_type, guid)] = asset_metadata
+        return asset_metadata
+
+    def load_pack_asset_metadata(self, pack_name):
+        """
+        records of another pack with their data, read once from the asset metadata store in its root path.
+        """
+        asset_metadata_by_assets = self._external_asset_metadata_by_packs.get(pack_name)
+        if asset_metadata_by_assets is None:
+            asset_metadata_store = None
+            journal = AssetMetadataJournal(Path(pack_name, 'asset_metadata.jsonl'))
+            if journal.get_database_path().exists() or journal.get_journal_path().exists():
+                asset_metadata_store = journal
+            elif Path(pack_name, 'asset_metadata.sqlite3').exists():
+                asset_metadata_store = AssetMetadataStore(Path(pack_name, 'asset_metadata.sqlite3'))
+
+            asset_metadata_by_assets = {}
+            if asset_metadata_store is not None:
+                for asset_metadata in asset_metadata_store.load_asset_metadata_list():
+                    asset_metadata_by_assets[(asset_metadata.get_asset_type(), asset_metadata.get_asset_path())] = asset_metadata
+                asset_metadata_store.close()
+            else:
+                __logger__.warning(f'load_pack_asset_metadata - asset metadata store not found: {pack_name}')
+            self._external_asset_metadata_by_packs[pack_name] = asset_metadata_by_assets
+        return asset_metadata_by_assets
+
+    def find_asset_metadata(self, asset_type, asset_path, pack_name=None):
+        """
+        returns (pack_name, asset_metadata) of an asset of this pack or, through the guid database, of another pack.
+        the records of other packs come with their data. pack_name limits the lookup to one pack,
+        e.g. the pack of the asset which refers to it. returns (None, None) if the asset is not found.
+        """
+        if pack_name is None or pack_name == self._pack_name:
+            asset_metadata = self.get_asset_metadata(asset_type, asset_path=asset_path)
+            if asset_metadata is not None:
+                return (self._pack_name, asset_metadata)
+            if pack_name is not None or self._guid_database is None:
+                return (None, None)
+            row = self._guid_database.find_asset_by_path(asset_type, asset_path, exclude_pack_name=self._pack_name)
+            if row is None:
+                return (None, None)
+            pack_name = row[0]
+
+        asset_metadata = self.load_pack_asset_metadata(pack_name).get((asset_type, asset_path))
+        return (pack_name, asset_metadata) if asset_metadata is not None else (None, None)
+
+    def update_guid_database(self):
+        if self._guid_database is not None:
+            self._guid_database.update_pack(self._pack_name, [
+                asset_metadata for asset_metadata_list in self._asset_metadata_by_types.values() for asset_metadata in asset_metadata_list.values()
+            ])
+
+    @staticmethod
+    def register_guid(asset_metadata_by_guid, asset_metadata):
+        # the first registered asset owns a guid, like the linear scan this index replaces.
+        guid = asset_metadata.get_guid()
+        registered_asset_metadata = asset_metadata_by_guid.get(guid)
+        if registered_asset_metadata is None or (
+            registered_asset_metadata.get_asset_type() == asset_metadata.get_asset_type() and
+            registered_asset_metadata.get_asset_path() == asset_metadata.get_asset_path()
+        ):
+            asset_metadata_by_guid[guid] = asset_metadata
+
+    @staticmethod
+    def unregister_guid(asset_metadata_by_guid, asset_metadata):
+        if asset_metadata_by_guid.get(asset_metadata.get_guid()) is asset_metadata:
+            asset_metadata_by_guid.pop(asset_metadata.get_guid())
+
+    def create_snapshot(self):
+        return AssetDescriptorSnapshot(
+            asset_paths_by_guid_types=dict([
+                (asset_type, dict([(guid, asset_metadata.get_asset_path()) for (guid, asset_metadata) in asset_metadata_by_guid.items()]))
+                for (asset_type, asset_metadata_by_guid) in self._asset_metadata_by_guid_types.items()
+            ]),
+            guids_by_asset_path_types=dict([
+                (asset_type, dict([(asset_path, asset_metadata.get_guid()) for (asset_path, asset_metadata) in asset_metadata_list.items()]))
+                for (asset_type, asset_metadata_list) in self._asset_metadata_by_types.items()
+            ]),
+            asset_types_by_guid=dict([(guid, asset_metadata.get_asset_type()) for (guid, asset_metadata) in self._asset_metadata_by_guid.items()]),
+            guid_database_path=self._guid_database.get_database_path() if self._guid_database is not None else None,
+            pack_name=self._pack_name,
+            filepaths_by_guid_types=dict([
+                (asset_type, dict([(guid, asset_metadata.get_filepath_posix()) for (guid, asset_metadata) in asset_metadata_by_guid.items()]))
+                for (asset_type, asset_metadata_by_guid) in self._asset_metadata_by_guid_types.items()
+            ])
+        )
+
     def register_asset_metadata(self, asset_metadata):
         asset_type = asset_metadata.get_asset_type()
         if asset_type not in self._asset_metadata_by_types:
             self._asset_metadata_by_types[asset_type] = {}
-        self._asset_metadata_by_types[asset_type][asset_metadata.get_asset_path()] = asset_metadata
+            self._asset_metadata_by_guid_types[asset_type] = {}
+        asset_metadata_list = self._asset_metadata_by_types[asset_type]
+        asset_metadata_by_guid = self._asset_metadata_by_guid_types[asset_type]
+
+        prev_asset_metadata = asset_metadata_list.get(asset_metadata.get_asset_path())
+        if prev_asset_metadata is not None:
+            self.unregister_guid(asset_metadata_by_guid, prev_asset_metadata)
+            self.unregister_guid(self._asset_metadata_by_guid, prev_asset_metadata)
+
+            self.unregister_dependents(prev_asset_metadata)
+
+        asset_metadata_list[asset_metadata.get_asset_path()] = asset_metadata
+        if asset_metadata.get_guid():
+            self.register_guid(asset_metadata_by_guid, asset_metadata)
+            self.register_guid(self._asset_metadata_by_guid, asset_metadata)
+        self.register_dependents(asset_metadata)
+
+        asset = (asset_type, asset_metadata.get_asset_path())
+        self._dirty_assets.add(asset)
+        self._removed_assets.discard(asset)
+
+    def unregister_asset_metadata(self, asset_type, asset_path):
+        asset_metadata = self.get_asset_metadata_list(asset_type).pop(asset_path, None)
+        if asset_metadata is not None:
+            self.unregister_guid(self._asset_metadata_by_guid_types[asset_type], asset_metadata)
+            self.unregister_guid(self._asset_metadata_by_guid, asset_metadata)
+            self.unregister_dependents(asset_metadata)
+            self._dirty_assets.discard((asset_type, asset_path))
+            self._removed_assets.add((asset_type, asset_path))
+            self.journal_asset_metadata(removed_assets=[(asset_type, asset_path)])
+        return asset_metadata
+
+    def register_dependents(self, asset_metadata):
+        dependent = (asset_metadata.get_asset_type(), asset_metadata.get_asset_path())
+        for dependency in asset_metadata.get_dependencies():
+            self._asset_dependents.setdefault(dependency, set()).add(dependent)
+
+    def unregister_dependents(self, asset_metadata):
+        dependent = (asset_metadata.get_asset_type(), asset_metadata.get_asset_path())
+        for dependency in asset_metadata.get_dependencies():
+            dependents = self._asset_dependents.get(dependency)
+            if dependents is not None:
+                dependents.discard(dependent)
+                if not dependents:
+                    self._asset_dependents.pop(dependency)
+
+    def set_asset_dependencies(self, asset_metadata, dependencies):
+        self.unregister_dependents(asset_metadata)
+        asset_metadata.set_dependencies(dependencies)
+        self.register_dependents(asset_metadata)
+        self._dirty_assets.add((asset_metadata.get_asset_type(), asset_metadata.get_asset_path()))
+        # the dependencies are set last when an asset is processed, so the record is complete here
+        self.journal_asset_metadata([asset_metadata])
+
+    def get_asset_dependents(self, asset_type, asset_path):
+        return sorted(self._asset_dependents.get((asset_type, asset_path), []))
+
+    def invalidate_asset_metadata(self, asset_type, asset_path):
+        """
+        unregisters the asset and its transitive dependents, so that they are re-processed. returns the invalidated AssetMetadata.
+        """
+        invalidated_asset_metadata_list = []
+        visited_assets = set()
+        stack = [(asset_type, asset_path)]
+        while stack:
+            asset = stack.pop()
+            if asset in visited_assets:
+                continue
+            visited_assets.add(asset)
+            stack.extend(self.get_asset_dependents(*asset))
+            asset_metadata = self.unregister_asset_metadata(*asset)
+            if asset_metadata is not None:
+                invalidated_asset_metadata_list.append(asset_metadata)
+        return invalidated_asset_metadata_list
+
+    def invalidate_unresolved_guid_dependents(self, asset_metadata_list):
+        """
+        unregisters the assets which referenced the guid of one of the given assets before it was registered, and their dependents.
+        returns the invalidated AssetMetadata, so that they are processed again with the new assets.
+        """
+        invalidated_asset_metadata_list = []
+        for asset_metadata in asset_metadata_list:
+            unresolved_guid = (UNRESOLVED_GUID, asset_metadata.get_asset_type(), asset_metadata.get_guid())
+            for (asset_type, asset_path) in sorted(self._asset_dependents.get(unresolved_guid, [])):
+                for invalidated_asset_metadata in self.invalidate_asset_metadata(asset_type, asset_path):
+                    __logger__.info(f'invalidate_asset_metadata: {(invalidated_asset_metadata.get_asset_type(), invalidated_asset_metadata.get_asset_path())}, registered guid: {unresolved_guid}')
+                    invalidated_asset_metadata_list.append(invalidated_asset_metadata)
+        return invalidated_asset_metadata_list
 
     def process(self):
         __logger__.info(f'AssetDescriptorManager::process: {self._asset_descriptor_filepath}')
-        self.load_asset_metadata()
         asset_descriptor_data = json.loads(self._asset_descriptor_filepath.read_text())
-        __asset_parser__.process(asset_descriptor_data)
-        self.save_asset_metadata()
+        with utilities.stat_cache_scope(__logger__):
+            self.open_asset_metadata_store(asset_descriptor_data)
+            self.load_asset_metadata()
+            self.open_guid_database(asset_descriptor_data)
+            __asset_parser__.process(asset_descriptor_data)
+            self.save_asset_metadata()
+            self.update_guid_database()
 
     def load_asset_metadata(self):
-        __logger__.info(f'>>> load_asset_metadata: {self._asset_metadata_filepath}')
+        __logger__.info(f'>>> load_asset_metadata: {self._asset_metadata_store.get_database_path()}')
         self._asset_metadata_by_types.clear()
+        self._asset_metadata_by_guid_types.clear()
+        self._asset_metadata_by_guid.clear()
+        self._asset_dependents.clear()
+        self._dirty_assets.clear()
+        self._removed_assets.clear()
+        self._removed_scenes.clear()
+
+        # one-time migration of the json metadata of older versions
         if self._asset_metadata_filepath.exists():
-            with open(self._asset_metadata_filepath, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-                for (asset_type, asset_metadata_list) in loaded_data.items():
-                    for asset_path, asset_metadata_dict in asset_metadata_list.items():
-                        asset_metadata = AssetMetadata(**asset_metadata_dict)
-                        filepath = asset_metadata.get_filepath()
-                        if filepath.exists() and filepath.stat().st_mtime <= asset_metadata.get_mtime():
-                            self.register_asset_metadata(asset_metadata)
+            num_migrated = self._asset_metadata_store.migrate_json(self._asset_metadata_filepath)
+            __logger__.info(f'migrate asset metadata: {self._asset_metadata_filepath}, {num_migrated} assets')
+
+        changed_assets = []
+        touched_assets = []
+        with utilities.stat_cache_scope(__logger__):
+            for asset_metadata in self._asset_metadata_store.load_asset_metadata_list():
+                asset = (asset_metadata.get_asset_type(), asset_metadata.get_asset_path())
+                file_state = asset_metadata.check_file_state()
+                if file_state != FileStates.CHANGED and asset_metadata.has_valid_data():
+                    self.register_asset_metadata(asset_metadata)
+                    if file_state == FileStates.TOUCHED:
+                        touched_assets.append(asset)
+                else:
+                    changed_assets.append(asset)
+        # the loaded records are already stored, the touched ones only get their new mtime
+        self._dirty_assets.clear()
+        self._dirty_assets.update(touched_assets)
+        # changed or removed assets are deleted from the store unless they are registered again
+        self._removed_assets.update(changed_assets)
+        self.journal_asset_metadata(removed_assets=changed_assets)
+
+        # dirty propagation: the dependents of changed or removed assets are re-processed with them
+        for (asset_type, asset_path) in changed_assets:
+            for invalidated_asset_metadata in self.invalidate_asset_metadata(asset_type, asset_path):
+                __logger__.info(f'invalidate_asset_metadata: {(invalidated_asset_metadata.get_asset_type(), invalidated_asset_metadata.get_asset_path())}, dependency: {(asset_type, asset_path)}')
+
+    def get_scene_model_infos_filepath(self, asset_path):
+        return Path(self._root_path, SCENE_MODEL_INFOS_PATH, f'{asset_path}.npz')
+
+    def save_asset_scene_model_infos(self, asset_metadata):
+        """
+        writes the model_infos sidecar of a scene which has not been saved yet, returns True if it was written.
+        """
+        if AssetTypes.SCENE == asset_metadata.get_asset_type():
+            scene_model_infos = asset_metadata.get_data(AssetTypes.MODEL)
+            if isinstance(scene_model_infos, SceneModelInfos) and scene_model_infos.get_filepath() is None:
+                scene_model_infos.save(self.get_scene_model_infos_filepath(asset_metadata.get_asset_path()))
+                return True
+        return False
+
+    def remove_scene_model_infos(self):
+        """
+        deletes the model_infos sidecars of the scenes removed from the store, unless the scene is registered again.
+        """
+        scene_metadata_list = self.get_asset_metadata_list(AssetTypes.SCENE)
+        self._removed_scenes.update([asset_path for (asset_type, asset_path) in self._removed_assets if AssetTypes.SCENE == asset_type])
+        for asset_path in sorted(self._removed_scenes):
+            if asset_path not in scene_metadata_list:
+                filepath = self.get_scene_model_infos_filepath(asset_path)
+                if filepath.exists():
+                    __logger__.info(f'remove_scene_model_infos: {filepath}')
+                    filepath.unlink()
+        self._removed_scenes.clear()
+
+    def save_scene_model_infos(self):
+        for asset_metadata in self.get_asset_metadata_list(AssetTypes.SCENE).values():
+            if self.save_asset_scene_model_infos(asset_metadata):
+                self._dirty_assets.add((AssetTypes.SCENE, asset_metadata.get_asset_path()))
 
     def save_asset_metadata(self):
-        __logger__.info(f'>>> save_asset_metadata: {self._asset_metadata_filepath}')
-        with open(self._asset_metadata_filepath, 'w', encoding='utf-8') as f:
-            save_data = {}
-            for (asset_type, asset_metadata_list) in self._asset_metadata_by_types.items():
-                for asset_path, asset_metadata in asset_metadata_list.items():
-                    if asset_type not in save_data:
-                        save_data[asset_type] = {}
-                    save_data[asset_type][asset_path] = asset_metadata.dump()
-            json.dump(save_data, f, indent=4)
\ No newline at end of file
+        __logger__.info(f'>>> save_asset_metadata: {self._asset_metadata_store.get_database_path()}')
+        self.save_scene_model_infos()
+        num_saved = self._asset_metadata_store.save(
+            [self.get_asset_metadata(asset_type, asset_path=asset_path) for (asset_type, asset_path) in sorted(self._dirty_assets)],
+            sorted(self._removed_assets)
+        )
+        __logger__.info(f'save_asset_metadata: {num_saved} changed, {len(self._removed_assets)} removed')
+        self.remove_scene_model_infos()
+        self._dirty_assets.clear()
+        self._removed_assets.clear()
+
+        if isinstance(self._asset_metadata_store, AssetMetadataJournal) and self._asset_metadata_store.needs_compaction():
+            __logger__.info(f'compact asset metadata journal: {self._asset_metadata_store.get_database_path()}')
+            self._asset_metadata_store.compact([
+                asset_metadata for asset_metadata_list in self._asset_metadata_by_types.values() for asset_metadata in asset_metadata_list.values()
+            ])
@@ -0,0 +1,182 @@
+import argparse
+import importlib
+import io
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tarfile
+import time
+import tracemalloc
+import types
+from pathlib import Path
+
+from generate_unity_project import ADDON_PACKAGE_NAME, generate_unity_project, load_addon_module
+
+BASELINE_PACKAGE_NAME = f'{ADDON_PACKAGE_NAME}_baseline'
+
+
+def create_benchmark_logger():
+    logger = logging.getLogger('benchmark_asset_descriptor')
+    logger.setLevel(logging.WARN)
+    if not logger.handlers:
+        logger.addHandler(logging.StreamHandler())
+    return logger
+
+
+def load_baseline_addon_module(module_name, revision, export_path):
+    """
+    imports a module of this addon as it was at a git revision, so that its numbers can be compared with the working tree.
+    """
+    if BASELINE_PACKAGE_NAME not in sys.modules:
+        archive = subprocess.run(
+            ['git', 'archive', '--format=tar', revision],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stdout=subprocess.PIPE, check=True
+        ).stdout
+        if export_path.exists():
+            shutil.rmtree(export_path)
+        os.makedirs(export_path.as_posix())
+        with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+            tar.extractall(export_path.as_posix())
+        if 'bpy' not in sys.modules:
+            sys.modules['bpy'] = types.ModuleType('bpy')
+        package = types.ModuleType(BASELINE_PACKAGE_NAME)
+        package.__path__ = [export_path.as_posix()]
+        sys.modules[BASELINE_PACKAGE_NAME] = package
+    return importlib.import_module(f'{BASELINE_PACKAGE_NAME}.{module_name}')
+
+
+def remove_stored_asset_metadata(root_path):
+    for asset_metadata_filename in ['asset_metadata.json', 'asset_metadata.sqlite3']:
+        asset_metadata_filepath = Path(root_path, asset_metadata_filename)
+        if asset_metadata_filepath.exists():
+            asset_metadata_filepath.unlink()
+
+
+def benchmark_asset_descriptor_process(root_path, logger):
+    """
+    times AssetDescriptorManager.process on a cold descriptor (no stored asset metadata) and a warm one.
+    """
+    asset_descriptor = load_addon_module('asset_descriptor')
+    remove_stored_asset_metadata(root_path)
+
+    result = {}
+    for run_name in ['cold', 'warm']:
+        asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, root_path)
+        begin_time = time.perf_counter()
+        asset_descriptor_manager.process()
+        result[f'{run_name}_seconds'] = time.perf_counter() - begin_time
+    result['guid_lookup_microseconds'] = benchmark_guid_lookup(asset_descriptor_manager)
+    result.update(benchmark_load_asset_metadata(root_path, logger))
+    return result
+
+
+def benchmark_load_asset_metadata(root_path, logger, num_runs=5, asset_descriptor=None):
+    """
+    startup cost: best time and peak memory of AssetDescriptorManager.load_asset_metadata on warm stored asset metadata.
+    """
+    asset_descriptor = asset_descriptor or load_addon_module('asset_descriptor')
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, root_path)
+    load_seconds = []
+    for index in range(num_runs):
+        begin_time = time.perf_counter()
+        asset_descriptor_manager.load_asset_metadata()
+        load_seconds.append(time.perf_counter() - begin_time)
+
+    tracemalloc.start()
+    asset_descriptor_manager.load_asset_metadata()
+    load_peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'load_asset_metadata_seconds': min(load_seconds),
+        'load_asset_metadata_peak_megabytes': load_peak_bytes / (1024.0 * 1024.0),
+    }
+
+
+def benchmark_baseline_load_asset_metadata(root_path, logger, revision, export_path):
+    """
+    the same startup cost measured with the asset_descriptor of a git revision, e.g. the loader before the slotted records.
+    the baseline stores its own asset metadata, which is removed afterwards so that it is not migrated by the working tree.
+    """
+    asset_descriptor = load_baseline_addon_module('asset_descriptor', revision, export_path)
+    remove_stored_asset_metadata(root_path)
+    asset_descriptor.AssetDescriptorManager(logger, root_path).process()
+    result = benchmark_load_asset_metadata(root_path, logger, asset_descriptor=asset_descriptor)
+    remove_stored_asset_metadata(root_path)
+    return dict([(f'baseline_{key}', value) for (key, value) in result.items()])
+
+
+def benchmark_guid_lookup(asset_descriptor_manager, num_lookups=100000):
+    """
+    average time of a reference resolution by guid, the way the unity parser resolves textures, materials and models.
+    """
+    asset_descriptor = load_addon_module('asset_descriptor')
+    guids = [
+        (asset_type, asset_metadata.get_guid())
+        for asset_type in asset_descriptor.AssetTypes.get_types()
+        for asset_metadata in asset_descriptor_manager.get_asset_metadata_list(asset_type).values()
+    ]
+    if not guids:
+        return 0.0
+
+    begin_time = time.perf_counter()
+    for index in range(num_lookups):
+        asset_type, guid = guids[(index * 7919) % len(guids)]
+        asset_descriptor_manager.get_asset_metadata(asset_type, guid=guid)
+    return (time.perf_counter() - begin_time) / num_lookups * 1000000.0
+
+
+def run_benchmarks(work_path, sizes, num_scene_instances, output_filepath, keep_projects=False, baseline_revision=None):
+    logger = create_benchmark_logger()
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'baseline_revision': baseline_revision,
+        'benchmarks': [],
+    }
+    for num_assets in sizes:
+        root_path = Path(work_path, f'unity_project_{num_assets}')
+        if root_path.exists():
+            shutil.rmtree(root_path)
+
+        begin_time = time.perf_counter()
+        num_assets_by_types = generate_unity_project(root_path, num_assets=num_assets, num_scene_instances=num_scene_instances)
+        generate_seconds = time.perf_counter() - begin_time
+
+        result = {
+            'num_assets': num_assets,
+            'num_assets_by_types': num_assets_by_types,
+            'num_scene_instances': num_scene_instances,
+            'generate_seconds': generate_seconds,
+        }
+        result.update(benchmark_asset_descriptor_process(root_path, logger))
+        if baseline_revision:
+            result.update(benchmark_baseline_load_asset_metadata(root_path, logger, baseline_revision, Path(work_path, 'baseline')))
+        results['benchmarks'].append(result)
+        print(json.dumps(result))
+
+        if not keep_projects:
+            shutil.rmtree(root_path)
+
+    output_filepath = Path(output_filepath)
+    if not output_filepath.parent.exists():
+        os.makedirs(output_filepath.parent.as_posix())
+    output_filepath.write_text(json.dumps(results, indent=4))
+    print(f'write benchmark results: {output_filepath}')
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='benchmark AssetDescriptorManager.process on synthetic unity projects')
+    parser.add_argument('--work_path', default='/tmp/rust_engine_3d_asset_manager')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--num_scene_instances', type=int, default=1000)
+    parser.add_argument('--output', default='/tmp/rust_engine_3d_asset_manager/benchmark_asset_descriptor.json')
+    parser.add_argument('--keep_projects', action='store_true')
+    parser.add_argument('--baseline_revision', default=None, help='git revision whose load_asset_metadata is measured for comparison, e.g. 3fd8a2b^')
+    args = parser.parse_args()
+    run_benchmarks(args.work_path, args.sizes, args.num_scene_instances, args.output, args.keep_projects, args.baseline_revision)
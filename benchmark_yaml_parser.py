@@ -0,0 +1,151 @@
+import argparse
+import json
+import os
+import platform
+import random
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmark_asset_descriptor import create_benchmark_logger
+from generate_unity_project import create_scene_contents, load_addon_module
+
+
+def create_yaml_contents(num_children):
+    """
+    a mapping with num_children named children and a sequence of num_children single-key groups,
+    the layout of m_SavedProperties and m_Modifications in unity files.
+    """
+    lines = ['Node:']
+    lines.extend([f'  m_Child_{index}: {index}' for index in range(num_children)])
+    lines.append('  m_Groups:')
+    for index in range(num_children):
+        lines.append(f'  - target: {{fileID: {index}}}')
+        lines.append(f'    propertyPath: m_Property_{index}')
+        lines.append(f'    value: {index}')
+    return '\n'.join(lines)
+
+
+def benchmark_child_lookup(yaml_parser, num_children, num_lookups=100000):
+    """
+    average time of YAML.get_child and YAMLGroup.find_node by name, which should not grow with the number of children.
+    linear_get_child is the scan over the children that get_child did before the name index, for comparison.
+    """
+    node = yaml_parser.YAML(name='YAML', contents=create_yaml_contents(num_children)).get_child('Node')
+    names = [f'm_Child_{(index * 7919) % num_children}' for index in range(num_lookups)]
+    begin_time = time.perf_counter()
+    for name in names:
+        node.get_child(name)
+    get_child_microseconds = (time.perf_counter() - begin_time) / num_lookups * 1000000.0
+
+    children = node.get_children()
+    num_linear_lookups = max(1, num_lookups // num_children)
+    begin_time = time.perf_counter()
+    for name in names[:num_linear_lookups]:
+        next(child for child in children if child.get_name() == name)
+    linear_get_child_microseconds = (time.perf_counter() - begin_time) / num_linear_lookups * 1000000.0
+
+    groups = node.get_child('m_Groups').get_children()
+    group_names = ['target', 'propertyPath', 'value']
+    begin_time = time.perf_counter()
+    for index in range(num_lookups):
+        groups[(index * 7919) % num_children].find_node(group_names[index % 3])
+    find_node_microseconds = (time.perf_counter() - begin_time) / num_lookups * 1000000.0
+    return {
+        'num_children': num_children,
+        'get_child_microseconds': get_child_microseconds,
+        'linear_get_child_microseconds': linear_get_child_microseconds,
+        'find_node_microseconds': find_node_microseconds,
+    }
+
+
+def count_nodes(yaml_parser, yaml_node):
+    return 1 + sum([count_nodes(yaml_parser, child) for child in yaml_node.iter_child_nodes()])
+
+
+def benchmark_tree_memory(yaml_parser, num_scene_instances):
+    """
+    peak traced memory while parsing a scene and the memory retained by the parsed tree.
+    """
+    rand = random.Random(0)
+    prefab_guids = [f'{rand.getrandbits(128):032x}' for index in range(100)]
+    contents = create_scene_contents(prefab_guids, num_scene_instances, rand)
+
+    tracemalloc.start()
+    yaml = yaml_parser.YAML(name='YAML', contents=contents)
+    (retained_bytes, peak_bytes) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    num_nodes = count_nodes(yaml_parser, yaml)
+    return {
+        'num_scene_instances': num_scene_instances,
+        'num_lines': contents.count('\n') + 1,
+        'num_nodes': num_nodes,
+        'retained_megabytes': retained_bytes / (1024.0 * 1024.0),
+        'peak_megabytes': peak_bytes / (1024.0 * 1024.0),
+        'retained_bytes_per_node': retained_bytes / num_nodes,
+    }
+
+
+def benchmark_backends(yaml_parser, num_scene_instances, num_runs=3):
+    """
+    best parse time of a scene with each available backend, speedup is relative to the python backend.
+    """
+    rand = random.Random(0)
+    prefab_guids = [f'{rand.getrandbits(128):032x}' for index in range(100)]
+    contents = create_scene_contents(prefab_guids, num_scene_instances, rand)
+    result = {'num_scene_instances': num_scene_instances}
+    for backend_class in yaml_parser.YAML_BACKENDS.values():
+        if backend_class.is_available():
+            backend = backend_class()
+            parse_seconds = []
+            for index in range(num_runs):
+                begin_time = time.perf_counter()
+                backend.parse(contents)
+                parse_seconds.append(time.perf_counter() - begin_time)
+            result[f'{backend.name}_seconds'] = min(parse_seconds)
+    for backend_name in yaml_parser.YAML_BACKENDS.keys():
+        if f'{backend_name}_seconds' in result:
+            result[f'{backend_name}_speedup'] = result[f'{yaml_parser.PythonYAMLBackend.name}_seconds'] / result[f'{backend_name}_seconds']
+    return result
+
+
+def run_benchmarks(child_counts, scene_instance_counts, output_filepath):
+    yaml_parser = load_addon_module('yaml_parser')
+    yaml_parser.__logger__ = create_benchmark_logger()
+    results = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'child_lookup': [],
+        'tree_memory': [],
+        'backends': [],
+    }
+    for num_children in child_counts:
+        result = benchmark_child_lookup(yaml_parser, num_children)
+        results['child_lookup'].append(result)
+        print(json.dumps(result))
+
+    for num_scene_instances in scene_instance_counts:
+        result = benchmark_tree_memory(yaml_parser, num_scene_instances)
+        results['tree_memory'].append(result)
+        print(json.dumps(result))
+
+        result = benchmark_backends(yaml_parser, num_scene_instances)
+        results['backends'].append(result)
+        print(json.dumps(result))
+
+    output_filepath = Path(output_filepath)
+    if not output_filepath.parent.exists():
+        os.makedirs(output_filepath.parent.as_posix())
+    output_filepath.write_text(json.dumps(results, indent=4))
+    print(f'write benchmark results: {output_filepath}')
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='benchmark yaml_parser lookups, the memory of parsed trees and the yaml backends')
+    parser.add_argument('--child_counts', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--scene_instance_counts', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--output', default='/tmp/rust_engine_3d_asset_manager/benchmark_yaml_parser.json')
+    args = parser.parse_args()
+    run_benchmarks(args.child_counts, args.scene_instance_counts, args.output)
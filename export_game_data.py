@@ -117,7 +117,9 @@ class AssetExportManager:
             dst_dirpath = os.path.split(dst_filepath)[0]
             if not os.path.exists(dst_dirpath):
                 os.makedirs(dst_dirpath)
+                utilities.invalidate_stat_cache()
             shutil.copy(src_filepath, dst_filepath)
+            utilities.invalidate_stat_cache(dst_filepath)
         except:
             __logger__.error(traceback.format_exc())
             raise
@@ -127,9 +129,11 @@ class AssetExportManager:
         export_path = os.path.split(export_filepath)[0]
         if not os.path.exists(export_path):
             os.makedirs(export_path)
+            utilities.invalidate_stat_cache()
 
         with open(export_filepath, 'w') as f:
             f.write(json.dumps(data, sort_keys=True, indent=4))
+        utilities.invalidate_stat_cache(export_filepath)
 
     def export_animation_layers(self, asset, asset_info):
         bone_blend_map = OrderedDict()
@@ -217,6 +221,7 @@ class AssetExportManager:
             export_dirpath = os.path.split(export_filepath)[0]
             if not os.path.exists(export_dirpath):
                 os.makedirs(export_dirpath)
+                utilities.invalidate_stat_cache()
 
             bpy.ops.export_scene.gltf(
                 filepath=export_filepath,
@@ -237,6 +242,8 @@ class AssetExportManager:
                 export_anim_single_armature=False,
                 export_reset_pose_bones=True
             )
+            # GLTF_SEPARATE writes the .bin and the textures next to the .gltf
+            utilities.invalidate_stat_cache(export_filepath)
             __logger__.info(f'export_selected_meshes {asset_info.asset_namepath}: {export_filepath}')
         except:
             __logger__.error(traceback.format_exc())
@@ -602,70 +609,84 @@ class AssetExportManager:
 
     def export_resources(self):
         __logger__.info(f'>>> export_resource: {self.asset_library.path}')
+        with utilities.stat_cache_scope(__logger__):
+            # build asset metadata of exporter
+            exporter_asset_metadata = {}
+            catalog_names = AssetTypeCatalogNames.get_catalog_names()
+            all_asset_exts = AssetExts.get_asset_exts()
+            for asset_type, catalog_name in catalog_names.items():
+                asset_dir = Path(self.resource_path, catalog_name)
+                for dirpath, dirnames, filenames in os.walk(asset_dir):
+                    for filename in filenames:
+                        filepath = Path(dirpath, filename)
+                        ext = filepath.suffix.lower()
+                        asset_path = filepath.relative_to(asset_dir).with_suffix('').as_posix()
+                        if ext in all_asset_exts[asset_type]:
+                            asset_metadata = AssetMetadata(
+                                asset_type=asset_type,
+                                asset_path=asset_path,
+                                filepath=filepath,
+                                mtime=utilities.get_mtime(filepath)
+                            )
+                            if asset_type not in exporter_asset_metadata:
+                                exporter_asset_metadata[asset_type] = {}
+                            exporter_asset_metadata[asset_type][asset_path] = asset_metadata
+
+            # load asset metadata of importer
+            asset_metadata_in_files = {}
+            importer_asset_metadata = self.asset_import_manager.get_asset_metadata_list()
+            for asset_type, asset_metadata_by_type in importer_asset_metadata.items():
+                for asset_path, asset_metadata in asset_metadata_by_type.items():
+                    filepath = asset_metadata.get_filepath()
+                    if not utilities.exists(filepath):
+                        continue
+
+                    if filepath not in asset_metadata_in_files:
+                        asset_metadata_in_files[filepath] = []
+                    asset_metadata_in_files[filepath].append(asset_metadata)
+
+            # export assets
+            for filepath, asset_metadata_list in asset_metadata_in_files.items():
+                source_file_mtime = utilities.get_mtime(filepath)
+                # the blend file is hashed only when the mtime check fails
+                source_fingerprint = None
+                for source_asset_metadata in asset_metadata_list:
+                    asset_type = source_asset_metadata.get_asset_type()
+                    asset_path = source_asset_metadata.get_asset_path()
+                    export_assets = True
+                    if asset_type in exporter_asset_metadata and asset_path in exporter_asset_metadata[asset_type]:
+                        target_asset_metadata = exporter_asset_metadata[asset_type][asset_path]
+                        if target_asset_metadata.exists():
+                            if source_file_mtime <= target_asset_metadata.get_mtime():
+                                export_assets = False
+                            elif source_asset_metadata.get_data('exported_fingerprint'):
+                                if source_fingerprint is None:
+                                    source_fingerprint = utilities.get_fingerprint(filepath)
+                                export_assets = source_fingerprint != source_asset_metadata.get_data('exported_fingerprint')
+
+                    if export_assets and filepath.suffix.lower() == '.blend':
+                        self.export_blend(filepath.as_posix())
+                        if source_fingerprint is None:
+                            source_fingerprint = utilities.get_fingerprint(filepath)
+                        for asset_metadata in asset_metadata_list:
+                            self.asset_import_manager.set_asset_metadata_data(asset_metadata, 'exported_fingerprint', source_fingerprint)
+                        break
+                    else:
+                        __logger__.debug(f'>>> skip export filepath: {filepath}, assets: {[metadata.get_asset_path() for metadata in asset_metadata_list]}')
+                        pass
 
-        # build asset metadata of exporter
-        exporter_asset_metadata = {}
-        catalog_names = AssetTypeCatalogNames.get_catalog_names()
-        all_asset_exts = AssetExts.get_asset_exts()
-        for asset_type, catalog_name in catalog_names.items():
-            asset_dir = Path(self.resource_path, catalog_name)
-            for dirpath, dirnames, filenames in os.walk(asset_dir):
-                for filename in filenames:
-                    filepath = Path(dirpath, filename)
-                    ext = filepath.suffix.lower()
-                    asset_path = filepath.relative_to(asset_dir).with_suffix('').as_posix()
-                    if ext in all_asset_exts[asset_type]:
-                        asset_metadata = AssetMetadata(
-                            asset_type=asset_type,
-                            asset_path=asset_path,
-                            filepath=filepath,
-                            mtime=utilities.get_mtime(filepath)
-                        )
-                        if asset_type not in exporter_asset_metadata:
-                            exporter_asset_metadata[asset_type] = {}
-                        exporter_asset_metadata[asset_type][asset_path] = asset_metadata
-
-        # load asset metadata of importer
-        asset_metadata_in_files = {}
-        importer_asset_metadata = self.asset_import_manager.get_asset_metadata_list()
-        for asset_type, asset_metadata_by_type in importer_asset_metadata.items():
-            for asset_path, asset_metadata in asset_metadata_by_type.items():
-                filepath = asset_metadata.get_filepath()
-                if not filepath.exists():
-                    continue
+            # remove asset_metadata
+            # for asset_type, asset_metadata_list in exporter_asset_metadata.items():
+            #     for asset_path, asset_metadata in asset_metadata_list.items():
+            #         if asset_type not in importer_asset_metadata or asset_path not in importer_asset_metadata[asset_type]:
+            #             __logger__.info(f'remove asset: {asset_metadata.get_filepath()}')
+            #             os.remove(asset_metadata.get_filepath())
 
-                if filepath not in asset_metadata_in_files:
-                    asset_metadata_in_files[filepath] = []
-                asset_metadata_in_files[filepath].append(asset_metadata)
-
-        # export assets
-        for filepath, asset_metadata_list in asset_metadata_in_files.items():
-            source_file_mtime = utilities.get_mtime(filepath)
-            for source_asset_metadata in asset_metadata_list:
-                asset_type = source_asset_metadata.get_asset_type()
-                asset_path = source_asset_metadata.get_asset_path()
-                export_assets = True
-                if asset_type in exporter_asset_metadata and asset_path in exporter_asset_metadata[asset_type]:
-                    target_asset_metadata = exporter_asset_metadata[asset_type][asset_path]
-                    if target_asset_metadata.get_filepath().exists() and source_file_mtime <= target_asset_metadata.get_mtime():
-                        export_assets = False
-
-                if export_assets and filepath.suffix.lower() == '.blend':
-                    self.export_blend(filepath.as_posix())
-                    break
-                else:
-                    __logger__.debug(f'>>> skip export filepath: {filepath}, assets: {[metadata.get_asset_path() for metadata in asset_metadata_list]}')
-                    pass
-
-        # remove asset_metadata
-        # for asset_type, asset_metadata_list in exporter_asset_metadata.items():
-        #     for asset_path, asset_metadata in asset_metadata_list.items():
-        #         if asset_type not in importer_asset_metadata or asset_path not in importer_asset_metadata[asset_type]:
-        #             __logger__.info(f'remove asset: {asset_metadata.get_filepath()}')
-        #             os.remove(asset_metadata.get_filepath())
-
-        # clear scene
-        utilities.clear_scene(read_homefile=False)
+            # fingerprints of the exported blend files
+            self.asset_import_manager.save_asset_metadata()
+
+            # clear scene
+            utilities.clear_scene(read_homefile=False)
 
     def run_export_resources(self):
         if bpy.context.selected_objects:
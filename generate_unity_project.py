@@ -0,0 +1,198 @@
+import importlib
+import json
+import os
+import random
+import sys
+import types
+from pathlib import Path
+
+ADDON_PACKAGE_NAME = 'rust_engine_3d_asset_manager'
+
+UNITY_YAML_HEADER = '%YAML 1.1\n%TAG !u! tag:unity3d.com,2011:\n'
+
+
+def load_addon_module(module_name):
+    """
+    imports a module of this addon outside of blender, bpy is replaced by an empty module.
+    """
+    if 'bpy' not in sys.modules:
+        sys.modules['bpy'] = types.ModuleType('bpy')
+    if ADDON_PACKAGE_NAME not in sys.modules:
+        package = types.ModuleType(ADDON_PACKAGE_NAME)
+        package.__path__ = [os.path.dirname(os.path.abspath(__file__))]
+        sys.modules[ADDON_PACKAGE_NAME] = package
+    return importlib.import_module(f'{ADDON_PACKAGE_NAME}.{module_name}')
+
+
+def write_unity_asset(filepath, guid, contents=None):
+    if not filepath.parent.exists():
+        os.makedirs(filepath.parent.as_posix())
+    if contents is None:
+        filepath.write_bytes(b'')
+    else:
+        filepath.write_text(contents)
+    Path(f'{filepath.as_posix()}.meta').write_text(f'fileFormatVersion: 2\nguid: {guid}\nDefaultImporter:\n  externalObjects: {{}}\n  userData: \n')
+
+
+def create_material_contents(name, shader_guid, material_create_info, texture_guids, rand):
+    tex_envs = ''.join([
+        f'    - {tex_env}:\n'
+        f'        m_Texture: {{fileID: 2800000, guid: {rand.choice(texture_guids)}, type: 3}}\n'
+        f'        m_Scale: {{x: 1, y: 1}}\n'
+        f'        m_Offset: {{x: 0, y: 0}}\n' for tex_env in material_create_info['m_TexEnvs']
+    ])
+    floats = ''.join([f'    - {value}: {rand.random():.3f}\n' for value in material_create_info['m_Floats']])
+    colors = ''.join([f'    - {color}: {{r: {rand.random():.3f}, g: {rand.random():.3f}, b: {rand.random():.3f}, a: 1}}\n' for color in material_create_info['m_Colors']])
+    return (
+        f'{UNITY_YAML_HEADER}--- !u!21 &2100000\n'
+        f'Material:\n'
+        f'  serializedVersion: 6\n'
+        f'  m_ObjectHideFlags: 0\n'
+        f'  m_Name: {name}\n'
+        f'  m_Shader: {{fileID: 4800000, guid: {shader_guid}, type: 3}}\n'
+        f'  m_ShaderKeywords: \n'
+        f'  m_SavedProperties:\n'
+        f'    serializedVersion: 3\n'
+        f'    m_TexEnvs:\n{tex_envs}'
+        f'    m_Floats:\n{floats}'
+        f'    m_Colors:\n{colors}'
+        f'  m_BuildTextureStacks: []\n'
+    )
+
+
+def create_prefab_contents(name, mesh_guid, material_guids):
+    materials = ''.join([f'  - {{fileID: 2100000, guid: {material_guid}, type: 2}}\n' for material_guid in material_guids])
+    return (
+        f'{UNITY_YAML_HEADER}--- !u!1 &100000\n'
+        f'GameObject:\n'
+        f'  m_ObjectHideFlags: 0\n'
+        f'  serializedVersion: 6\n'
+        f'  m_Component:\n'
+        f'  - component: {{fileID: 400000}}\n'
+        f'  - component: {{fileID: 3300000}}\n'
+        f'  - component: {{fileID: 2300000}}\n'
+        f'  m_Layer: 0\n'
+        f'  m_Name: {name}\n'
+        f'--- !u!4 &400000\n'
+        f'Transform:\n'
+        f'  m_GameObject: {{fileID: 100000}}\n'
+        f'  m_LocalRotation: {{x: 0, y: 0, z: 0, w: 1}}\n'
+        f'  m_LocalPosition: {{x: 0, y: 0, z: 0}}\n'
+        f'  m_LocalScale: {{x: 1, y: 1, z: 1}}\n'
+        f'  m_Children: []\n'
+        f'  m_Father: {{fileID: 0}}\n'
+        f'  m_RootOrder: 0\n'
+        f'  m_LocalEulerAnglesHint: {{x: 0, y: 0, z: 0}}\n'
+        f'--- !u!33 &3300000\n'
+        f'MeshFilter:\n'
+        f'  m_GameObject: {{fileID: 100000}}\n'
+        f'  m_Mesh: {{fileID: 4300000, guid: {mesh_guid}, type: 3}}\n'
+        f'--- !u!23 &2300000\n'
+        f'MeshRenderer:\n'
+        f'  m_GameObject: {{fileID: 100000}}\n'
+        f'  m_Enabled: 1\n'
+        f'  m_Materials:\n{materials}'
+        f'  m_StaticBatchRoot: {{fileID: 0}}\n'
+    )
+
+
+def create_scene_contents(prefab_guids, num_instances, rand):
+    documents = [UNITY_YAML_HEADER]
+    for index in range(num_instances):
+        prefab_guid = rand.choice(prefab_guids)
+        modifications = [
+            ('m_LocalPosition.x', f'{rand.uniform(-500.0, 500.0):.3f}'),
+            ('m_LocalPosition.y', f'{rand.uniform(-10.0, 10.0):.3f}'),
+            ('m_LocalPosition.z', f'{rand.uniform(-500.0, 500.0):.3f}'),
+            ('m_LocalEulerAnglesHint.y', f'{rand.uniform(0.0, 360.0):.3f}'),
+            ('m_LocalScale.x', f'{rand.uniform(0.5, 2.0):.3f}'),
+            ('m_LocalScale.y', f'{rand.uniform(0.5, 2.0):.3f}'),
+            ('m_LocalScale.z', f'{rand.uniform(0.5, 2.0):.3f}'),
+            ('m_Name', f'instance_{index}'),
+        ]
+        documents.append(
+            f'--- !u!1001 &{1000000 + index}\n'
+            f'PrefabInstance:\n'
+            f'  m_ObjectHideFlags: 0\n'
+            f'  serializedVersion: 2\n'
+            f'  m_Modification:\n'
+            f'    m_TransformParent: {{fileID: 0}}\n'
+            f'    m_Modifications:\n'
+        )
+        documents.extend([
+            f'    - target: {{fileID: 400000, guid: {prefab_guid}, type: 3}}\n'
+            f'      propertyPath: {property_path}\n'
+            f'      value: {value}\n'
+            f'      objectReference: {{fileID: 0}}\n' for (property_path, value) in modifications
+        ])
+        documents.append(
+            f'    m_RemovedComponents: []\n'
+            f'  m_SourcePrefab: {{fileID: 100100000, guid: {prefab_guid}, type: 3}}\n'
+        )
+    return ''.join(documents)
+
+
+def generate_unity_project(root_path, num_assets, num_scene_instances=1000, seed=0):
+    """
+    writes a synthetic unity project with about num_assets assets and a default asset_descriptor.json to root_path.
+    textures, meshes, materials, prefabs and scenes reference each other by guid like a unity asset pack does.
+    """
+    asset_descriptor = load_addon_module('asset_descriptor')
+    rand = random.Random(seed)
+    root_path = Path(root_path)
+    if not root_path.exists():
+        os.makedirs(root_path.as_posix())
+
+    asset_descriptor_data = json.loads(asset_descriptor.ASSET_DESCRIPTOR_TEMPLATE)
+    (root_path / 'asset_descriptor.json').write_text(asset_descriptor.ASSET_DESCRIPTOR_TEMPLATE)
+    material_create_infos = asset_descriptor_data['MATERIAL']['material_create_infos']
+    guid_index = iter(range(1, sys.maxsize))
+
+    def next_guid():
+        return f'{rand.getrandbits(64):016x}{next(guid_index):016x}'
+
+    num_scenes = max(1, num_assets // 1000)
+    num_textures = max(1, num_assets * 40 // 100)
+    num_meshes = max(1, num_assets * 20 // 100)
+    num_materials = max(1, num_assets * 15 // 100)
+    num_prefabs = max(1, num_assets - num_scenes - num_textures - num_meshes - num_materials)
+
+    texture_guids = []
+    for index in range(num_textures):
+        texture_dirname = 'Terrain' if index % 10 == 0 else 'Textures'
+        texture_guids.append(next_guid())
+        write_unity_asset(root_path / texture_dirname / f'group_{index // 500}' / f'texture_{index}.png', texture_guids[-1])
+
+    mesh_guids = []
+    for index in range(num_meshes):
+        mesh_guids.append(next_guid())
+        write_unity_asset(root_path / 'Models' / f'group_{index // 500}' / f'mesh_{index}.fbx', mesh_guids[-1])
+
+    material_guids = []
+    for index in range(num_materials):
+        material_guids.append(next_guid())
+        shader_guid = rand.choice(list(material_create_infos.keys()))
+        contents = create_material_contents(f'material_{index}', shader_guid, material_create_infos[shader_guid], texture_guids, rand)
+        write_unity_asset(root_path / 'Materials' / f'group_{index // 500}' / f'material_{index}.mat', material_guids[-1], contents)
+
+    prefab_guids = []
+    for index in range(num_prefabs):
+        prefab_guids.append(next_guid())
+        contents = create_prefab_contents(f'prefab_{index}', rand.choice(mesh_guids), rand.sample(material_guids, min(len(material_guids), rand.randint(1, 3))))
+        write_unity_asset(root_path / 'Prefabs' / f'group_{index // 500}' / f'prefab_{index}.prefab', prefab_guids[-1], contents)
+
+    for index in range(num_scenes):
+        contents = create_scene_contents(prefab_guids, num_scene_instances, rand)
+        write_unity_asset(root_path / 'Scenes' / f'scene_{index}.unity', next_guid(), contents)
+
+    return {
+        'TEXTURE': num_textures,
+        'MESH': num_meshes,
+        'MATERIAL_INSTANCE': num_materials,
+        'MODEL': num_prefabs,
+        'SCENE': num_scenes,
+    }
+
+
+if __name__ == "__main__":
+    print(generate_unity_project('/tmp/rust_engine_3d_asset_manager/unity_project_1k', num_assets=1000))
@@ -1,13 +1,12 @@
 import math
 import os
 import uuid
-import json
 from pathlib import Path
 
 import bpy
 
 from . import utilities
-from .asset_descriptor import AssetMetadata, AssetTypeCatalogNames, AssetTypes
+from .asset_descriptor import AssetMetadata, AssetMetadataStore, AssetTypeCatalogNames, AssetTypes, FileStates
 
 global __logger__
     
@@ -25,14 +24,19 @@ class AssetImportManager:
         self._asset_metadata = {}
         self._asset_descriptor_manager = asset_descriptor_manager
         self._asset_metadata_filepath = Path(asset_library.path, 'asset_metadata.json')
+        self._asset_metadata_store = AssetMetadataStore(Path(asset_library.path, 'asset_metadata.sqlite3'))
+        # (asset_type, asset_path) of the records to write or delete on the next save_asset_metadata
+        self._dirty_assets = set()
+        self._removed_assets = set()
 
         # initialize
         self.initialize()
 
     def initialize(self):
-        self.load_asset_catalogs()
-        self.load_asset_metadata()
-        self._asset_descriptor_manager.process()
+        with utilities.stat_cache_scope(__logger__):
+            self.load_asset_catalogs()
+            self.load_asset_metadata()
+            self._asset_descriptor_manager.process()
 
     def get_asset_type_and_name_from_asset_path(self, target_asset_path):
         for asset_type_name, asset_catalog_name in self._asset_catalog_name_type_map.items():
@@ -81,36 +85,70 @@ class AssetImportManager:
             return catalog_id
         return ''
 
-    def make_asset_library(self, asset, asset_type, asset_path, filepath):
+    def make_asset_library(self, asset, asset_type, asset_path, filepath, data=None):
         asset.asset_mark()
         catalog_name = Path(self.get_asset_catalog_name_by_type(asset_type), asset_path).parent.as_posix()
         asset.asset_data.catalog_id = self.get_asset_catalog_id(catalog_name)
-        return self.register_asset_metadata(asset_type, asset_path, filepath)
+        return self.register_asset_metadata(asset_type, asset_path, filepath, data=data)
 
-    def register_asset_metadata(self, asset_type, asset_path, filepath):
+    def register_asset_metadata(self, asset_type, asset_path, filepath, data=None):
         if asset_type not in self._asset_metadata:
             self._asset_metadata[asset_type] = {}
-        asset_metadata = AssetMetadata(asset_type=asset_type, asset_path=asset_path, filepath=filepath)
+        asset_metadata = AssetMetadata(asset_type=asset_type, asset_path=asset_path, filepath=filepath, data=data)
         self._asset_metadata[asset_type][asset_path] = asset_metadata
+        self._dirty_assets.add((asset_type, asset_path))
+        self._removed_assets.discard((asset_type, asset_path))
         return asset_metadata
 
+    def set_asset_metadata_data(self, asset_metadata, key, value):
+        asset_metadata.set_data(key, value)
+        self._dirty_assets.add((asset_metadata.get_asset_type(), asset_metadata.get_asset_path()))
+
+    def is_imported(self, source_asset_metadata, filepath):
+        """
+        filepath was imported from the current contents of the source asset. the mtimes are compared first,
+        then the fingerprint of the source against the one recorded when filepath was imported.
+        """
+        if not utilities.exists(filepath):
+            return False
+
+        asset_metadata = self.get_asset_metadata(source_asset_metadata.get_asset_type(), source_asset_metadata.get_asset_path())
+        source_fingerprint = source_asset_metadata.get_fingerprint()
+        if source_asset_metadata.get_mtime() <= utilities.get_mtime(filepath):
+            # one-time backfill of the records imported before the fingerprints, so that touching the source is not a change
+            if source_fingerprint and asset_metadata is not None and not asset_metadata.get_data('source_fingerprint'):
+                self.set_asset_metadata_data(asset_metadata, 'source_fingerprint', source_fingerprint)
+            return True
+
+        return bool(source_fingerprint) and asset_metadata is not None and asset_metadata.get_data('source_fingerprint') == source_fingerprint
+
     def load_asset_metadata(self):
-        __logger__.info(f'>>> load_asset_metadata: {self._asset_metadata_filepath}')
-        asset_metadata_in_files = {}
+        __logger__.info(f'>>> load_asset_metadata: {self._asset_metadata_store.get_database_path()}')
+        # one-time migration of the json metadata of older versions
         if self._asset_metadata_filepath.exists():
-            with open(self._asset_metadata_filepath, 'r', encoding='utf-8') as f:
-                loaded_data = json.load(f)
-                for (filepath, asset_metadata_list) in loaded_data.items():
-                    if not os.path.exists(filepath):
-                        continue
+            num_migrated = self._asset_metadata_store.migrate_json(self._asset_metadata_filepath)
+            __logger__.info(f'migrate asset metadata: {self._asset_metadata_filepath}, {num_migrated} assets')
 
-                    for asset_metadata_dict in asset_metadata_list:
-                        asset_metadata = AssetMetadata(**asset_metadata_dict)
-                        filepath = asset_metadata.get_filepath()
-                        if filepath.exists() and filepath.stat().st_mtime <= asset_metadata.get_mtime():
-                            if filepath not in asset_metadata_in_files:
-                                asset_metadata_in_files[filepath] = []
-                            asset_metadata_in_files[filepath].append(asset_metadata)
+        asset_metadata_in_files = {}
+        stored_assets = set()
+        unchanged_assets = set()
+        touched_assets = set()
+        for asset_metadata in self._asset_metadata_store.load_asset_metadata_list():
+            asset = (asset_metadata.get_asset_type(), asset_metadata.get_asset_path())
+            stored_assets.add(asset)
+            is_backfilled = not asset_metadata.get_fingerprint()
+            file_state = asset_metadata.check_file_state()
+            # a record without a fingerprint is backfilled as CHANGED, it is kept if the blend has the contents it was exported with
+            if is_backfilled and file_state == FileStates.CHANGED and asset_metadata.get_fingerprint() == asset_metadata.get_data('exported_fingerprint'):
+                file_state = FileStates.TOUCHED
+            if file_state != FileStates.CHANGED:
+                unchanged_assets.add(asset)
+                if file_state == FileStates.TOUCHED:
+                    touched_assets.add(asset)
+                filepath = asset_metadata.get_filepath()
+                if filepath not in asset_metadata_in_files:
+                    asset_metadata_in_files[filepath] = []
+                asset_metadata_in_files[filepath].append(asset_metadata)
 
         # update asset metadata
         for filepath in self._asset_metadata_filepath.parent.glob('**/*.blend'):
@@ -145,24 +183,38 @@ class AssetImportManager:
 
         # convert asset metadata
         self._asset_metadata.clear()
+        self._dirty_assets.clear()
         for (filepath, asset_metadata_list) in asset_metadata_in_files.items():
             for asset_metadata in asset_metadata_list:
-                self.register_asset_metadata(asset_metadata.get_asset_type(), asset_metadata.get_asset_path(), filepath)
-
-        # save to file
+                asset_type = asset_metadata.get_asset_type()
+                asset_path = asset_metadata.get_asset_path()
+                if (asset_type, asset_path) in unchanged_assets:
+                    # the stored record keeps its data and its mtime, size and fingerprint
+                    self._asset_metadata.setdefault(asset_type, {})[asset_path] = asset_metadata
+                else:
+                    self.register_asset_metadata(asset_type, asset_path, filepath, data=asset_metadata.dump()['data'])
+
+        # only new and touched records are written, records of changed or removed files are deleted
+        self._removed_assets = stored_assets - unchanged_assets - self._dirty_assets
+        self._dirty_assets.difference_update(unchanged_assets)
+        self._dirty_assets.update(touched_assets)
         self.save_asset_metadata()
 
     def save_asset_metadata(self):
-        __logger__.info(f'>>> save_asset_metadata: {self._asset_metadata_filepath}')
-        with open(self._asset_metadata_filepath, 'w', encoding='utf-8') as f:
-            save_data = {}
-            for (asset_type, asset_metadata_list) in self._asset_metadata.items():
-                for asset_path, asset_metadata in asset_metadata_list.items():
-                    filepath = asset_metadata.get_filepath().as_posix()
-                    if filepath not in save_data:
-                        save_data[filepath] = []
-                    save_data[filepath].append(asset_metadata.dump())
-            json.dump(save_data, f, indent=4)
+        __logger__.info(f'>>> save_asset_metadata: {self._asset_metadata_store.get_database_path()}')
+        asset_metadata_list = [self.get_asset_metadata(asset_type, asset_path) for (asset_type, asset_path) in sorted(self._dirty_assets)]
+        # records registered in this run are fingerprinted once their file is written, each file is hashed once
+        fingerprints = {}
+        for asset_metadata in asset_metadata_list:
+            filepath = asset_metadata.get_filepath()
+            if not asset_metadata.get_fingerprint() and utilities.exists(filepath):
+                if filepath not in fingerprints:
+                    fingerprints[filepath] = utilities.get_fingerprint(filepath)
+                asset_metadata.update_fingerprint(fingerprints[filepath])
+        num_saved = self._asset_metadata_store.save(asset_metadata_list, sorted(self._removed_assets))
+        __logger__.info(f'save_asset_metadata: {num_saved} changed, {len(self._removed_assets)} removed')
+        self._dirty_assets.clear()
+        self._removed_assets.clear()
 
     def get_asset_metadata(self, asset_type, asset_path):
         type_asset_metadata = self._asset_metadata.get(asset_type)
@@ -238,10 +290,10 @@ class AssetImportManager:
         for texture in textures:
             ext = texture.get_filepath().suffix
             dst_texture_filepath = Path(textures_path, texture.get_asset_path()).with_suffix(ext)
-            if utilities.get_mtime(dst_texture_filepath) < texture.get_mtime():
+            if not self.is_imported(texture, dst_texture_filepath):
                 __logger__.info(f'copy {texture.get_filepath()} -> {dst_texture_filepath}')
                 utilities.copy(texture.get_filepath(), dst_texture_filepath)
-                self.register_asset_metadata(texture.get_asset_type(), texture.get_asset_path(), dst_texture_filepath)
+                self.register_asset_metadata(texture.get_asset_type(), texture.get_asset_path(), dst_texture_filepath, data={'source_fingerprint': texture.get_fingerprint()})
 
     def import_meshes(self):
         mesh_path = Path(self._asset_library.path, 'meshes')
@@ -253,7 +305,7 @@ class AssetImportManager:
 
             asset_path = mesh.get_asset_path()
             blend_filepath = Path(mesh_path, asset_path).with_suffix('.blend')
-            if mesh.get_mtime() <= utilities.get_mtime(blend_filepath):
+            if self.is_imported(mesh, blend_filepath):
                 continue
             
             # save
@@ -266,7 +318,7 @@ class AssetImportManager:
             # create a collection
             asset_name = Path(asset_path).name
             collection = utilities.create_collection(asset_name)
-            self.make_asset_library(asset=collection, asset_type=AssetTypes.MESH, asset_path=asset_path, filepath=blend_filepath)
+            self.make_asset_library(asset=collection, asset_type=AssetTypes.MESH, asset_path=asset_path, filepath=blend_filepath, data={'source_fingerprint': mesh.get_fingerprint()})
             
             # default material
             set_default_material = False
@@ -297,6 +349,37 @@ class AssetImportManager:
             utilities.asset_generate_preview(collection.name)
             utilities.save_as(blend_filepath)
     
+    def collect_material_instances(self, model):
+        """
+        returns the material instance records and the material asset paths of a model, one group per renderer.
+        material instances of other packs are found through the guid database. an empty slot or a slot which does not resolve is None.
+        """
+        material_instance_group = []
+        material_path_group = []
+        for material_instance_path_group in model.get_data(AssetTypes.MATERIAL_INSTANCE):
+            material_instance_group.append([])
+            material_instances = material_instance_group[-1]
+            material_path_group.append([])
+            material_paths = material_path_group[-1]
+            for material_instance_path in material_instance_path_group:
+                if not material_instance_path:
+                    material_instances.append(None)
+                    material_paths.append('')
+                    continue
+                (pack_name, material_instance) = self._asset_descriptor_manager.find_asset_metadata(AssetTypes.MATERIAL_INSTANCE, material_instance_path)
+                material = None
+                if material_instance is not None:
+                    # the material is looked up in the pack of the material instance
+                    (_, material) = self._asset_descriptor_manager.find_asset_metadata(AssetTypes.MATERIAL, material_instance.get_data(AssetTypes.MATERIAL), pack_name=pack_name)
+                if material is None:
+                    __logger__.error(f'collect_material_instances - model: {model.get_asset_path()}, material_instance: {material_instance_path}')
+                    material_instances.append(None)
+                    material_paths.append('')
+                else:
+                    material_instances.append(material_instance)
+                    material_paths.append(material.get_asset_path())
+        return material_instance_group, material_path_group
+
     def import_models(self):
         model_path = Path(self._asset_library.path, 'models')
         models = self._asset_descriptor_manager.get_asset_metadata_list(AssetTypes.MODEL).values()
@@ -307,7 +390,7 @@ class AssetImportManager:
 
             asset_path = model.get_asset_path()
             blend_filepath = Path(model_path, asset_path).with_suffix('.blend')
-            if model.get_mtime() <= utilities.get_mtime(blend_filepath):
+            if self.is_imported(model, blend_filepath):
                 continue
             
             # save
@@ -317,7 +400,7 @@ class AssetImportManager:
             # create a collection
             asset_name = Path(asset_path).name
             collection = utilities.create_collection(asset_name)
-            self.make_asset_library(asset=collection, asset_type=AssetTypes.MODEL, asset_path=asset_path, filepath=blend_filepath)
+            self.make_asset_library(asset=collection, asset_type=AssetTypes.MODEL, asset_path=asset_path, filepath=blend_filepath, data={'source_fingerprint': model.get_fingerprint()})
 
             # link mesh and override
             mesh_asset_path = model.get_data(AssetTypes.MESH)
@@ -332,18 +415,7 @@ class AssetImportManager:
             collection.children.link(override_collection)
 
             # collect material
-            material_instance_group = []
-            material_path_group = []
-            for material_instance_path_group in model.get_data(AssetTypes.MATERIAL_INSTANCE):
-                material_instance_group.append([])
-                material_instances = material_instance_group[-1]
-                material_path_group.append([])
-                material_paths = material_path_group[-1]
-                for material_instance_path in material_instance_path_group:
-                    material_instance = self._asset_descriptor_manager.get_asset_metadata(AssetTypes.MATERIAL_INSTANCE, asset_path=material_instance_path)
-                    material_path = self._asset_descriptor_manager.get_asset_metadata(AssetTypes.MATERIAL, asset_path=material_instance.get_data(AssetTypes.MATERIAL))
-                    material_paths.append(material_path.get_asset_path())
-                    material_instances.append(material_instance)
+            (material_instance_group, material_path_group) = self.collect_material_instances(model)
 
             for (object_index, obj) in enumerate(bpy.context.scene.objects):
                 # select object
@@ -358,6 +430,8 @@ class AssetImportManager:
                 material_instances = material_instance_group[object_index]
                 material_paths = material_path_group[object_index]
                 for (material_index, material_slot) in enumerate(obj.material_slots):
+                    if len(material_instances) <= material_index or material_instances[material_index] is None:
+                        continue
                     material = self.load_asset(AssetTypes.MATERIAL, material_paths[material_index])
                     material_slot.link = 'DATA'
                     material_slot.material = material
@@ -389,7 +463,7 @@ class AssetImportManager:
 
             asset_path = scene.get_asset_path()
             blend_filepath = Path(scene_path, asset_path).with_suffix('.blend')
-            if scene.get_mtime() <= utilities.get_mtime(blend_filepath):
+            if self.is_imported(scene, blend_filepath):
                 continue
 
             # save
@@ -399,12 +473,12 @@ class AssetImportManager:
             # create a collection
             asset_name = Path(asset_path).name
             collection = utilities.create_collection(asset_name)
-            self.make_asset_library(asset=collection, asset_type=AssetTypes.SCENE, asset_path=asset_path, filepath=blend_filepath)
+            self.make_asset_library(asset=collection, asset_type=AssetTypes.SCENE, asset_path=asset_path, filepath=blend_filepath, data={'source_fingerprint': scene.get_fingerprint()})
 
             # link model - MODEL_INFO_TEMPLATE
             model_infos = scene.get_data(AssetTypes.MODEL)
             for model_info in model_infos:
-                model_asset_collection = self.load_asset(asset_type=AssetTypes.MODEL, asset_path=model_info['asset_path'])
+                model_asset_collection = self.load_asset(asset_type=model_info.get('asset_type', AssetTypes.MODEL), asset_path=model_info['asset_path'])
                 if model_asset_collection:
                     asset = bpy.data.objects.new(model_asset_collection.name, None)
                     asset.instance_type = 'COLLECTION'
@@ -420,15 +494,16 @@ class AssetImportManager:
         
     def import_assets(self):
         __logger__.info(f'>>> Begin: import_assets')
-        
-        # process import        
-        self.import_textures()
-        self.import_meshes()
-        self.import_models()
-        self.import_scenes()
-
-        # close
-        utilities.clear_scene()
-        self._asset_descriptor_manager.close()
-        self.save_asset_metadata()
-        __logger__.info(f'>>> End: import_assets')
\ No newline at end of file
+        with utilities.stat_cache_scope(__logger__):
+            # process import        
+            self.import_textures()
+            self.import_meshes()
+            self.import_models()
+            self.import_scenes()
+
+            # close
+            utilities.clear_scene()
+            self._asset_descriptor_manager.close()
+            self.save_asset_metadata()
+            self._asset_metadata_store.close()
+            __logger__.info(f'>>> End: import_assets')
\ No newline at end of file
@@ -0,0 +1,22 @@
+import logging
+import os
+import sys
+
+import pytest
+
+# the addon modules are imported outside of blender with generate_unity_project.load_addon_module
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from generate_unity_project import load_addon_module
+
+
+@pytest.fixture
+def logger():
+    return logging.getLogger('rust_engine_3d_asset_manager.tests')
+
+
+@pytest.fixture
+def yaml_parser(logger):
+    yaml_parser = load_addon_module('yaml_parser')
+    yaml_parser.__logger__ = logger
+    return yaml_parser
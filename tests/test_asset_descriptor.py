@@ -0,0 +1,258 @@
+import os
+
+import pytest
+
+from generate_unity_project import load_addon_module
+
+
+def create_asset_metadata(asset_descriptor, asset_type, asset_path, **kwargs):
+    return asset_descriptor.AssetMetadata(
+        asset_type=asset_type,
+        asset_path=asset_path,
+        filepath=f'/project/{asset_path}',
+        guid=asset_path.replace('/', '_'),
+        mtime=1.0,
+        **kwargs
+    )
+
+
+def load_records(journal):
+    return dict([((asset_metadata.get_asset_type(), asset_metadata.get_asset_path()), asset_metadata.dump()) for asset_metadata in journal.load_asset_metadata_list()])
+
+
+@pytest.fixture
+def asset_descriptor(logger):
+    asset_descriptor = load_addon_module('asset_descriptor')
+    asset_descriptor.__logger__ = logger
+    return asset_descriptor
+
+
+def test_journal_replays_records(asset_descriptor, tmp_path):
+    texture = create_asset_metadata(asset_descriptor, 'TEXTURE', 'textures/a')
+    mesh = create_asset_metadata(asset_descriptor, 'MESH', 'meshes/a')
+    journal = asset_descriptor.AssetMetadataJournal(tmp_path / 'asset_metadata.jsonl')
+    journal.append([texture, mesh])
+    changed_texture = create_asset_metadata(asset_descriptor, 'TEXTURE', 'textures/a', fingerprint='changed')
+    journal.append([changed_texture], removed_assets=[('MESH', 'meshes/a')])
+    journal.close()
+
+    records = load_records(asset_descriptor.AssetMetadataJournal(tmp_path / 'asset_metadata.jsonl'))
+    assert records == {('TEXTURE', 'textures/a'): changed_texture.dump()}
+
+
+def test_journal_skips_truncated_last_line(asset_descriptor, tmp_path):
+    texture = create_asset_metadata(asset_descriptor, 'TEXTURE', 'textures/a')
+    journal = asset_descriptor.AssetMetadataJournal(tmp_path / 'asset_metadata.jsonl')
+    journal.append([texture])
+    journal.close()
+    # a run which was killed while writing a record
+    with open(tmp_path / 'asset_metadata.journal.jsonl', 'a', encoding='utf-8') as f:
+        f.write('["put",{"asset_type":"MESH","asset_pa')
+
+    journal = asset_descriptor.AssetMetadataJournal(tmp_path / 'asset_metadata.jsonl')
+    assert list(load_records(journal).keys()) == [('TEXTURE', 'textures/a')]
+
+    # the record appended after the cut line is not lost with it
+    mesh = create_asset_metadata(asset_descriptor, 'MESH', 'meshes/a')
+    journal.append([mesh])
+    journal.close()
+    records = load_records(asset_descriptor.AssetMetadataJournal(tmp_path / 'asset_metadata.jsonl'))
+    assert records == {('TEXTURE', 'textures/a'): texture.dump(), ('MESH', 'meshes/a'): mesh.dump()}
+
+
+def test_journal_compaction(asset_descriptor, tmp_path):
+    asset_metadata_list = [create_asset_metadata(asset_descriptor, 'TEXTURE', f'textures/{index}') for index in range(8)]
+    journal = asset_descriptor.AssetMetadataJournal(tmp_path / 'asset_metadata.jsonl', compaction_threshold=4)
+    journal.append(asset_metadata_list)
+    assert journal.needs_compaction()
+
+    journal.compact(asset_metadata_list)
+    # records appended while the snapshot is written are replayed after it
+    mesh = create_asset_metadata(asset_descriptor, 'MESH', 'meshes/a')
+    journal.append([mesh], removed_assets=[('TEXTURE', 'textures/0')])
+    journal.close()
+
+    assert (tmp_path / 'asset_metadata.jsonl').exists()
+    assert not (tmp_path / 'asset_metadata.journal.jsonl.compacting').exists()
+    assert 8 == len((tmp_path / 'asset_metadata.jsonl').read_text().splitlines())
+
+    journal = asset_descriptor.AssetMetadataJournal(tmp_path / 'asset_metadata.jsonl', compaction_threshold=4)
+    expected_records = dict([(('TEXTURE', asset_metadata.get_asset_path()), asset_metadata.dump()) for asset_metadata in asset_metadata_list[1:]])
+    expected_records[('MESH', 'meshes/a')] = mesh.dump()
+    assert load_records(journal) == expected_records
+    assert not journal.needs_compaction()
+
+
+def test_journaled_scene_refers_to_written_model_infos(asset_descriptor, logger, tmp_path):
+    if asset_descriptor.numpy is None:
+        pytest.skip('numpy is not installed')
+
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, tmp_path)
+    asset_descriptor_manager.open_asset_metadata_store({'asset_metadata_store': {'type': 'journal'}})
+    scene = create_asset_metadata(asset_descriptor, 'SCENE', 'scenes/a')
+    scene.set_data('MODEL', asset_descriptor.SceneModelInfos.create([('MODEL', 'models/a')], [0, 0], [[0.0] * 6 + [1.0] * 3] * 2))
+    asset_descriptor_manager.register_asset_metadata(scene)
+    asset_descriptor_manager.set_asset_dependencies(scene, [('MODEL', 'models/a')])
+
+    # replay the journal as a run which crashed before save_asset_metadata would
+    records = asset_descriptor.AssetMetadataJournal(tmp_path / 'asset_metadata.jsonl').load_asset_metadata_list()
+    assert 1 == len(records)
+    assert records[0].has_valid_data()
+    assert [('MODEL', 'models/a')] * 2 == [(model_info['asset_type'], model_info['asset_path']) for model_info in records[0].get_data('MODEL')]
+
+
+@pytest.mark.parametrize('store_type', ['sqlite', 'journal'])
+def test_unregistered_scene_removes_model_infos(asset_descriptor, logger, tmp_path, store_type):
+    if asset_descriptor.numpy is None:
+        pytest.skip('numpy is not installed')
+
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, tmp_path)
+    asset_descriptor_manager.open_asset_metadata_store({'asset_metadata_store': {'type': store_type}})
+    for asset_path in ['scenes/a', 'scenes/b']:
+        scene = create_asset_metadata(asset_descriptor, 'SCENE', asset_path)
+        scene.set_data('MODEL', asset_descriptor.SceneModelInfos.create([('MODEL', 'models/a')], [0], [[0.0] * 6 + [1.0] * 3]))
+        asset_descriptor_manager.register_asset_metadata(scene)
+    asset_descriptor_manager.save_asset_metadata()
+    filepath_a = asset_descriptor_manager.get_scene_model_infos_filepath('scenes/a')
+    filepath_b = asset_descriptor_manager.get_scene_model_infos_filepath('scenes/b')
+    assert filepath_a.exists() and filepath_b.exists()
+
+    # scenes/b is registered again before the save, its sidecar is kept
+    scene_b = asset_descriptor_manager.unregister_asset_metadata('SCENE', 'scenes/b')
+    asset_descriptor_manager.unregister_asset_metadata('SCENE', 'scenes/a')
+    asset_descriptor_manager.register_asset_metadata(scene_b)
+    asset_descriptor_manager.save_asset_metadata()
+    assert not filepath_a.exists()
+    assert filepath_b.exists()
+
+
+def register_assets(asset_descriptor, asset_descriptor_manager, dependencies_by_asset):
+    for ((asset_type, asset_path), dependencies) in dependencies_by_asset.items():
+        asset_metadata = create_asset_metadata(asset_descriptor, asset_type, asset_path)
+        asset_descriptor_manager.register_asset_metadata(asset_metadata)
+        asset_descriptor_manager.set_asset_dependencies(asset_metadata, dependencies)
+
+
+def get_registered_assets(asset_descriptor_manager, asset_types):
+    return sorted([(asset_type, asset_path) for asset_type in asset_types for asset_path in asset_descriptor_manager.get_asset_metadata_list(asset_type)])
+
+
+ASSET_TYPES = ['MATERIAL', 'MATERIAL_INSTANCE', 'MESH', 'MODEL', 'SCENE', 'TEXTURE']
+DEPENDENCIES_BY_ASSET = {
+    ('TEXTURE', 'textures/rock'): [],
+    ('TEXTURE', 'textures/wood'): [],
+    ('MATERIAL', 'shaders/standard'): [],
+    ('MESH', 'meshes/rock'): [],
+    ('MATERIAL_INSTANCE', 'materials/rock'): [('MATERIAL', 'shaders/standard'), ('TEXTURE', 'textures/rock')],
+    ('MATERIAL_INSTANCE', 'materials/wood'): [('MATERIAL', 'shaders/standard'), ('TEXTURE', 'textures/wood')],
+    ('MODEL', 'models/rock'): [('MESH', 'meshes/rock'), ('MATERIAL_INSTANCE', 'materials/rock')],
+    ('MODEL', 'models/rock_variant'): [('MESH', 'meshes/rock'), ('MATERIAL_INSTANCE', 'materials/rock'), ('MODEL', 'models/rock')],
+    ('MODEL', 'models/house'): [('MATERIAL_INSTANCE', 'materials/wood'), ('UNRESOLVED_GUID', 'MESH', 'guid_of_house')],
+    ('SCENE', 'scenes/level'): [('MODEL', 'models/rock_variant'), ('MODEL', 'models/house')],
+}
+
+
+def test_invalidate_dependents_transitively(asset_descriptor, logger, tmp_path):
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, tmp_path)
+    register_assets(asset_descriptor, asset_descriptor_manager, DEPENDENCIES_BY_ASSET)
+
+    invalidated_asset_metadata_list = asset_descriptor_manager.invalidate_asset_metadata('TEXTURE', 'textures/rock')
+    invalidated_assets = [(asset_metadata.get_asset_type(), asset_metadata.get_asset_path()) for asset_metadata in invalidated_asset_metadata_list]
+    # each asset once, the variant is reached through the material instance and through its base prefab
+    assert sorted(invalidated_assets) == [
+        ('MATERIAL_INSTANCE', 'materials/rock'), ('MODEL', 'models/rock'), ('MODEL', 'models/rock_variant'), ('SCENE', 'scenes/level'), ('TEXTURE', 'textures/rock')
+    ]
+    assert get_registered_assets(asset_descriptor_manager, ASSET_TYPES) == sorted(set(DEPENDENCIES_BY_ASSET.keys()) - set(invalidated_assets))
+    # the edges of the unregistered dependents are removed with them
+    assert asset_descriptor_manager.get_asset_dependents('MODEL', 'models/house') == []
+    assert asset_descriptor_manager.get_asset_dependents('MATERIAL', 'shaders/standard') == [('MATERIAL_INSTANCE', 'materials/wood')]
+
+
+def test_invalidate_dependents_of_registered_guid(asset_descriptor, logger, tmp_path):
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, tmp_path)
+    register_assets(asset_descriptor, asset_descriptor_manager, DEPENDENCIES_BY_ASSET)
+
+    house_mesh = asset_descriptor.AssetMetadata(asset_type='MESH', asset_path='meshes/house', filepath='/project/meshes/house', guid='guid_of_house')
+    invalidated_asset_metadata_list = asset_descriptor_manager.invalidate_unresolved_guid_dependents([house_mesh])
+    assert sorted([(asset_metadata.get_asset_type(), asset_metadata.get_asset_path()) for asset_metadata in invalidated_asset_metadata_list]) == [('MODEL', 'models/house'), ('SCENE', 'scenes/level')]
+    # a guid of another asset type does not match
+    house_texture = asset_descriptor.AssetMetadata(asset_type='TEXTURE', asset_path='textures/house', filepath='/project/textures/house', guid='guid_of_house')
+    assert asset_descriptor_manager.invalidate_unresolved_guid_dependents([house_texture]) == []
+
+
+def test_changed_file_invalidates_stored_dependents(asset_descriptor, logger, tmp_path):
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, tmp_path)
+    for ((asset_type, asset_path), dependencies) in DEPENDENCIES_BY_ASSET.items():
+        filepath = tmp_path / asset_path
+        filepath.parent.mkdir(parents=True, exist_ok=True)
+        filepath.write_text(asset_path)
+        asset_metadata = asset_descriptor.AssetMetadata(asset_type=asset_type, asset_path=asset_path, filepath=filepath)
+        asset_metadata.update_fingerprint()
+        asset_descriptor_manager.register_asset_metadata(asset_metadata)
+        asset_descriptor_manager.set_asset_dependencies(asset_metadata, dependencies)
+    asset_descriptor_manager.close()
+
+    (tmp_path / 'meshes/rock').write_text('changed contents')
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, tmp_path)
+    asset_descriptor_manager.load_asset_metadata()
+    assert get_registered_assets(asset_descriptor_manager, ASSET_TYPES) == sorted(set(DEPENDENCIES_BY_ASSET.keys()) - {
+        ('MESH', 'meshes/rock'), ('MODEL', 'models/rock'), ('MODEL', 'models/rock_variant'), ('SCENE', 'scenes/level')
+    })
+    asset_descriptor_manager.close()
+
+
+@pytest.fixture
+def stored_file(asset_descriptor, tmp_path):
+    filepath = tmp_path / 'texture.png'
+    filepath.write_bytes(b'texture contents')
+    asset_metadata = asset_descriptor.AssetMetadata(asset_type='TEXTURE', asset_path='textures/texture', filepath=filepath)
+    asset_metadata.update_fingerprint()
+    return (filepath, asset_metadata)
+
+
+def set_mtime(filepath, mtime):
+    os.utime(filepath, (mtime, mtime))
+
+
+def test_check_file_state_unchanged(asset_descriptor, stored_file):
+    (filepath, asset_metadata) = stored_file
+    assert asset_descriptor.FileStates.UNCHANGED == asset_metadata.check_file_state()
+
+
+def test_check_file_state_touched(asset_descriptor, stored_file):
+    (filepath, asset_metadata) = stored_file
+    set_mtime(filepath, asset_metadata.get_mtime() + 10.0)
+    assert asset_descriptor.FileStates.TOUCHED == asset_metadata.check_file_state()
+    # the record takes the new mtime, the next check does not hash the file again
+    assert asset_metadata.get_mtime() == filepath.stat().st_mtime
+    assert asset_descriptor.FileStates.UNCHANGED == asset_metadata.check_file_state()
+
+
+@pytest.mark.parametrize('contents', [b'texture contents, resized', b'texture_contents'], ids=['size', 'contents'])
+def test_check_file_state_changed(asset_descriptor, stored_file, contents):
+    (filepath, asset_metadata) = stored_file
+    mtime = asset_metadata.get_mtime()
+    filepath.write_bytes(contents)
+    set_mtime(filepath, mtime + 10.0)
+    assert asset_descriptor.FileStates.CHANGED == asset_metadata.check_file_state()
+
+
+def test_check_file_state_removed(asset_descriptor, stored_file):
+    (filepath, asset_metadata) = stored_file
+    filepath.unlink()
+    assert asset_descriptor.FileStates.CHANGED == asset_metadata.check_file_state()
+
+
+def test_check_file_state_backfills_fingerprint(asset_descriptor, stored_file):
+    (filepath, stored_asset_metadata) = stored_file
+    # a record of an older version has an mtime only
+    asset_metadata = asset_descriptor.AssetMetadata(asset_type='TEXTURE', asset_path='textures/texture', filepath=filepath, mtime=stored_asset_metadata.get_mtime())
+    assert asset_descriptor.FileStates.UNCHANGED == asset_metadata.check_file_state()
+    assert '' == asset_metadata.get_fingerprint()
+
+    set_mtime(filepath, stored_asset_metadata.get_mtime() + 10.0)
+    # there is nothing to compare the contents with, but the record takes the fingerprint of the file
+    assert asset_descriptor.FileStates.CHANGED == asset_metadata.check_file_state()
+    assert (asset_metadata.get_fingerprint(), asset_metadata.get_size()) == (stored_asset_metadata.get_fingerprint(), stored_asset_metadata.get_size())
+    set_mtime(filepath, stored_asset_metadata.get_mtime() + 20.0)
+    assert asset_descriptor.FileStates.TOUCHED == asset_metadata.check_file_state()
@@ -0,0 +1,58 @@
+import pytest
+
+from generate_unity_project import load_addon_module
+
+
+@pytest.fixture
+def asset_descriptor(logger):
+    asset_descriptor = load_addon_module('asset_descriptor')
+    asset_descriptor.__logger__ = logger
+    return asset_descriptor
+
+
+@pytest.fixture
+def import_game_data(logger):
+    import_game_data = load_addon_module('import_game_data')
+    import_game_data.__logger__ = logger
+    return import_game_data
+
+
+def create_pack(asset_descriptor, logger, root_path, asset_metadata_list):
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, root_path)
+    asset_descriptor_manager.open_guid_database({'guid_database': {'enabled': True, 'database_path': '../asset_guid_database.sqlite3'}})
+    for asset_metadata in asset_metadata_list:
+        asset_descriptor_manager.register_asset_metadata(asset_metadata)
+    asset_descriptor_manager.update_guid_database()
+    return asset_descriptor_manager
+
+
+def test_collect_material_instances_of_two_packs(asset_descriptor, import_game_data, logger, tmp_path):
+    AssetMetadata = asset_descriptor.AssetMetadata
+    pack_b = create_pack(asset_descriptor, logger, tmp_path / 'pack_b', [
+        AssetMetadata(asset_type='MATERIAL', asset_path='shaders/standard_b', filepath=tmp_path / 'pack_b/standard.shader'),
+        AssetMetadata(asset_type='MATERIAL_INSTANCE', asset_path='materials/rock', filepath=tmp_path / 'pack_b/rock.mat', guid='b0', data={'MATERIAL': 'shaders/standard_b'}),
+    ])
+    pack_b.close()
+
+    model = AssetMetadata(
+        asset_type='MODEL',
+        asset_path='models/house',
+        filepath=tmp_path / 'pack_a/house.prefab',
+        guid='a1',
+        data={'MATERIAL_INSTANCE': [['materials/wood', '', 'materials/rock', 'materials/missing']], 'MESH': 'meshes/house'}
+    )
+    pack_a = create_pack(asset_descriptor, logger, tmp_path / 'pack_a', [
+        AssetMetadata(asset_type='MATERIAL', asset_path='shaders/standard_a', filepath=tmp_path / 'pack_a/standard.shader'),
+        AssetMetadata(asset_type='MATERIAL_INSTANCE', asset_path='materials/wood', filepath=tmp_path / 'pack_a/wood.mat', guid='a0', data={'MATERIAL': 'shaders/standard_a'}),
+        model,
+    ])
+
+    # the importer only needs the asset descriptor manager to collect the materials
+    asset_import_manager = object.__new__(import_game_data.AssetImportManager)
+    asset_import_manager._asset_descriptor_manager = pack_a
+    (material_instance_group, material_path_group) = asset_import_manager.collect_material_instances(model)
+
+    assert [[material_instance.get_asset_path() if material_instance else None for material_instance in material_instances] for material_instances in material_instance_group] == [['materials/wood', None, 'materials/rock', None]]
+    assert material_instance_group[0][2].get_data('MATERIAL') == 'shaders/standard_b'
+    assert material_path_group == [['shaders/standard_a', '', 'shaders/standard_b', '']]
+    pack_a.close()
@@ -0,0 +1,209 @@
+from pathlib import Path
+
+import pytest
+
+from generate_unity_project import load_addon_module
+
+YAML_CORPUS_PATH = Path(__file__).parent / 'yaml_corpus'
+
+
+def guid(index):
+    return f'{index:032x}'
+
+
+@pytest.fixture
+def unity_asset_parser():
+    return load_addon_module('unity_asset_parser')
+
+
+@pytest.fixture
+def asset_descriptor_manager(logger, tmp_path, unity_asset_parser):
+    asset_descriptor = load_addon_module('asset_descriptor')
+    asset_descriptor_manager = asset_descriptor.AssetDescriptorManager(logger, tmp_path)
+    unity_asset_parser.__resolved_prefabs__.clear()
+    return asset_descriptor_manager
+
+
+def register_asset(asset_descriptor_manager, asset_type, asset_path, guid, filename=''):
+    asset_descriptor = load_addon_module('asset_descriptor')
+    asset_metadata = asset_descriptor.AssetMetadata(
+        asset_type=asset_type,
+        asset_path=asset_path,
+        filepath=YAML_CORPUS_PATH / filename if filename else Path(asset_descriptor_manager.get_root_path(), asset_path),
+        guid=guid,
+        mtime=1.0
+    )
+    asset_descriptor_manager.register_asset_metadata(asset_metadata)
+    return asset_metadata
+
+
+def test_prefab_of_a_model_file_has_no_unresolved_guid(unity_asset_parser, asset_descriptor_manager):
+    # the source of prefab_instance.prefab is a model file, which is registered as a MESH
+    register_asset(asset_descriptor_manager, 'MESH', 'meshes/model_5', guid(5))
+    register_asset(asset_descriptor_manager, 'MATERIAL_INSTANCE', 'materials/material_6', guid(6))
+    prefab = register_asset(asset_descriptor_manager, 'MODEL', 'models/prefab_instance', guid(0xa1), 'prefab_instance.prefab')
+
+    (asset_data, unresolved_guids) = unity_asset_parser.UnityAssetParser.parse_asset_data({}, 'MODEL', prefab.get_filepath(), guid=prefab.get_guid())
+    assert asset_data == {'MATERIAL_INSTANCE': [['materials/material_6']], 'MESH': 'meshes/model_5'}
+    assert unresolved_guids == []
+
+
+def test_prefab_of_an_unregistered_source_records_the_guid(unity_asset_parser, asset_descriptor_manager):
+    register_asset(asset_descriptor_manager, 'MATERIAL_INSTANCE', 'materials/material_6', guid(6))
+    prefab = register_asset(asset_descriptor_manager, 'MODEL', 'models/prefab_instance', guid(0xa1), 'prefab_instance.prefab')
+
+    (asset_data, unresolved_guids) = unity_asset_parser.UnityAssetParser.parse_asset_data({}, 'MODEL', prefab.get_filepath(), guid=prefab.get_guid())
+    assert asset_data['MESH'] == ''
+    assert sorted(unresolved_guids) == [('MESH', guid(5)), ('MODEL', guid(5))]
+
+
+def test_material_slots_keep_their_index(unity_asset_parser, asset_descriptor_manager):
+    # stripped.prefab grows the material array of its model file to 2 slots and only sets the second one
+    register_asset(asset_descriptor_manager, 'MESH', 'meshes/model', '0123456789abcdef0123456789abcdef')
+    register_asset(asset_descriptor_manager, 'MATERIAL_INSTANCE', 'materials/material_1', 'fedcba9876543210fedcba9876543210')
+    prefab = register_asset(asset_descriptor_manager, 'MODEL', 'models/stripped', guid(0xa2), 'stripped.prefab')
+
+    (asset_data, unresolved_guids) = unity_asset_parser.UnityAssetParser.parse_asset_data({}, 'MODEL', prefab.get_filepath(), guid=prefab.get_guid())
+    assert asset_data['MATERIAL_INSTANCE'] == [['', 'materials/material_1']]
+    assert unity_asset_parser.UnityAssetParser.get_asset_dependencies('MODEL', asset_data, unresolved_guids) == [('MESH', 'meshes/model'), ('MATERIAL_INSTANCE', 'materials/material_1')]
+
+
+@pytest.fixture(params=['numpy', 'python'])
+def transform_backend(request, unity_asset_parser, monkeypatch):
+    if 'python' == request.param:
+        monkeypatch.setattr(unity_asset_parser, 'numpy', None)
+    elif unity_asset_parser.numpy is None:
+        pytest.skip('numpy is not installed')
+    return request.param
+
+
+def assert_vectors_equal(actual, expected):
+    assert [round(value, 4) + 0.0 for value in actual] == [float(value) for value in expected]
+
+
+@pytest.mark.parametrize('environment_num_workers, num_workers', [('3', 3), ('', 2), ('four', 2), ('0', 5)])
+def test_num_workers_from_the_environment(unity_asset_parser, logger, monkeypatch, environment_num_workers, num_workers):
+    monkeypatch.setattr(unity_asset_parser, '__logger__', logger, raising=False)
+    monkeypatch.setattr(unity_asset_parser.os, 'cpu_count', lambda: 5)
+    monkeypatch.setenv(unity_asset_parser.NUM_WORKERS_ENVIRONMENT_NAME, environment_num_workers)
+    assert num_workers == unity_asset_parser.UnityAssetParser.get_num_workers({'num_workers': 2})
+
+
+def test_transform_hierarchy_composes_world_transforms(unity_asset_parser, transform_backend):
+    half = 0.5 ** 0.5
+    hierarchy = unity_asset_parser.UnityTransformHierarchy()
+    # added before its parent, the levels do not depend on the document order
+    hierarchy.add_transform(3, 2, position=(0.0, 0.0, 1.0))
+    hierarchy.add_transform(2, 1, position=(1.0, 0.0, 0.0))
+    hierarchy.add_transform(1, 0, position=(1.0, 0.0, 0.0), rotation=(0.0, half, 0.0, half), scale=(2.0, 2.0, 2.0), euler_hint=(0.0, 90.0, 0.0))
+
+    assert hierarchy.get_depths() == {1: 0, 2: 1, 3: 2}
+    ((root_position, root_euler, root_scale), (position, euler, scale), (grandchild_position, grandchild_euler, grandchild_scale)) = hierarchy.get_world_transforms([1, 2, 3])
+    # a root keeps its local values and euler hint
+    assert (root_position, root_euler, root_scale) == ([1.0, 0.0, 0.0], [0.0, 90.0, 0.0], [2.0, 2.0, 2.0])
+    # the parent rotates x to -z and scales it by 2
+    assert_vectors_equal(position, [1.0, 0.0, -2.0])
+    assert_vectors_equal(euler, [0.0, 90.0, 0.0])
+    assert_vectors_equal(scale, [2.0, 2.0, 2.0])
+    assert_vectors_equal(grandchild_position, [3.0, 0.0, -2.0])
+    assert_vectors_equal(grandchild_euler, [0.0, 90.0, 0.0])
+    assert_vectors_equal(grandchild_scale, [2.0, 2.0, 2.0])
+
+
+def test_transform_hierarchy_breaks_cycles(unity_asset_parser, transform_backend):
+    hierarchy = unity_asset_parser.UnityTransformHierarchy()
+    hierarchy.add_transform(1, 2, position=(1.0, 0.0, 0.0))
+    hierarchy.add_transform(2, 1, position=(0.0, 1.0, 0.0))
+    hierarchy.add_transform(3, 2, position=(0.0, 0.0, 1.0))
+
+    depths = hierarchy.get_depths()
+    # the first transform of the cycle becomes a root, every other transform is one level below its parent
+    assert depths == {1: 1, 2: 0, 3: 1} or depths == {1: 0, 2: 1, 3: 2}
+    for (file_id, depth) in depths.items():
+        if 0 < depth:
+            assert depths[hierarchy._parent_file_ids[file_id]] == depth - 1
+    assert 3 == len(hierarchy.get_world_transforms([1, 2, 3]))
+
+
+@pytest.mark.parametrize('euler', [(0.0, 90.0, 0.0), (30.0, 45.0, 60.0), (-20.0, 170.0, 10.0)])
+def test_quaternion_from_euler_round_trip(unity_asset_parser, euler):
+    UnityTransformHierarchy = unity_asset_parser.UnityTransformHierarchy
+    rotation = UnityTransformHierarchy.quaternion_from_euler(euler)
+    assert abs(sum([value * value for value in rotation]) - 1.0) < 1e-9
+    (position, decomposed_euler, scale) = UnityTransformHierarchy.decompose_matrix(UnityTransformHierarchy.compose_matrix((0.0, 0.0, 0.0), rotation, (1.0, 1.0, 1.0)))
+    assert_vectors_equal(decomposed_euler, euler)
+
+
+def test_process_model_infos_of_scene(unity_asset_parser, asset_descriptor_manager, transform_backend):
+    for index in range(4):
+        register_asset(asset_descriptor_manager, 'MODEL', f'models/prefab_{index}', guid(index))
+        register_asset(asset_descriptor_manager, 'MESH', f'meshes/mesh_{index}', guid(index))
+    yaml_documents = unity_asset_parser.UnityYAMLFile(YAML_CORPUS_PATH / 'scene.unity').load_yaml_documents(type_names=['MeshFilter', 'PrefabInstance', 'Transform'])
+    model_infos = list(unity_asset_parser.UnityAssetParser.process_model_infos(yaml_documents))
+
+    # prefab instances and plain game objects in document order
+    assert [(model_info['asset_type'], model_info['asset_path']) for model_info in model_infos] == [
+        (asset_type, f'{directory}/{name}_{index}') for index in range(4) for (asset_type, directory, name) in [('MODEL', 'models', 'prefab'), ('MESH', 'meshes', 'mesh')]
+    ]
+    # unity y-up is swizzled to z-up, the euler hint of a prefab instance is kept and the mirrored scale is made positive
+    prefab_instance = model_infos[2]
+    assert_vectors_equal(prefab_instance['position'], [0.5, -1.0, 0.0])
+    assert_vectors_equal(prefab_instance['rotation'], [0.0, 0.0, 90.0])
+    assert_vectors_equal(prefab_instance['scale'], [1.0, 1.0, 1.0])
+    game_object = model_infos[3]
+    assert_vectors_equal(game_object['position'], [1.0, 0.0, 0.0])
+    assert_vectors_equal(game_object['rotation'], [0.0, 0.0, 0.0])
+    assert_vectors_equal(game_object['scale'], [1.0, 1.0, 1.0])
+
+
+def test_prefab_instance_rotation_from_euler_hint(unity_asset_parser):
+    yaml_documents = unity_asset_parser.UnityYAMLFile(YAML_CORPUS_PATH / 'prefab_instance.prefab').load_yaml_documents(type_names=['PrefabInstance'])
+    (position, rotation, scale, euler_hint) = unity_asset_parser.UnityAssetParser.process_prefab_instance_transform(yaml_documents[0][1])
+    half = 0.5 ** 0.5
+    assert (position, scale, euler_hint) == ([2.5, 0.0, -5.0], [-1.0, 1.0, 1.0], [0.0, 90.0, 0.0])
+    assert_vectors_equal(rotation, [0.0, round(half, 4), 0.0, round(half, 4)])
+
+
+def test_variant_chain_resolves_overrides(unity_asset_parser, asset_descriptor_manager):
+    # prefab_variant.prefab -> prefab_instance.prefab -> prefab.prefab, and a second prefab instance of a model file
+    for index in [6, 8, 9, 0xb]:
+        register_asset(asset_descriptor_manager, 'MATERIAL_INSTANCE', f'materials/material_{index:x}', guid(index))
+    for index in [7, 0xc, 0xd]:
+        register_asset(asset_descriptor_manager, 'MESH', f'meshes/mesh_{index:x}', guid(index))
+    register_asset(asset_descriptor_manager, 'MODEL', 'models/prefab', guid(5), 'prefab.prefab')
+    prefab_instance = register_asset(asset_descriptor_manager, 'MODEL', 'models/prefab_instance', guid(0xa1), 'prefab_instance.prefab')
+    prefab_variant = register_asset(asset_descriptor_manager, 'MODEL', 'models/prefab_variant', guid(0xa3), 'prefab_variant.prefab')
+    UnityAssetParser = unity_asset_parser.UnityAssetParser
+
+    # the renderers of a source prefab are identified by (prefab instance fileID ^ source fileID)
+    resolved_prefab_instance = UnityAssetParser.resolve_prefab(prefab_instance.get_guid(), prefab_instance.get_filepath())
+    assert resolved_prefab_instance.get_material_guids_by_renderer() == {100100005 ^ 703: [guid(8), guid(9)], 100100005 ^ 2300000: [guid(6)]}
+    assert (resolved_prefab_instance.get_mesh_guid(), resolved_prefab_instance.get_source_prefab_guid()) == (guid(7), guid(5))
+
+    resolved_prefab_variant = UnityAssetParser.resolve_prefab(prefab_variant.get_guid(), prefab_variant.get_filepath())
+    assert resolved_prefab_variant.get_material_guids_by_renderer() == {
+        # the size grows the slots to 3 and data[0] overrides the first material of the base
+        200 ^ 100100005 ^ 703: [guid(0xb), guid(9), None],
+        200 ^ 100100005 ^ 2300000: [guid(6)],
+        300 ^ 2300000: [guid(8)],
+    }
+    # the mesh and the base prefab come from the first prefab instance
+    assert (resolved_prefab_variant.get_mesh_guid(), resolved_prefab_variant.get_source_prefab_guid()) == (guid(0xc), guid(0xa1))
+    assert resolved_prefab_variant.get_unresolved_guids() == []
+
+    (asset_data, unresolved_guids) = UnityAssetParser.parse_asset_data({}, 'MODEL', prefab_variant.get_filepath(), guid=prefab_variant.get_guid())
+    assert asset_data == {
+        'MATERIAL_INSTANCE': [['materials/material_b', 'materials/material_9', ''], ['materials/material_6'], ['materials/material_8']],
+        'MESH': 'meshes/mesh_c',
+        'MODEL': 'models/prefab_instance',
+    }
+    assert unresolved_guids == []
+
+
+def test_variant_of_unregistered_prefab_records_the_guid(unity_asset_parser, asset_descriptor_manager):
+    register_asset(asset_descriptor_manager, 'MESH', 'meshes/mesh_d', guid(0xd))
+    prefab_variant = register_asset(asset_descriptor_manager, 'MODEL', 'models/prefab_variant', guid(0xa3), 'prefab_variant.prefab')
+
+    resolved_prefab_variant = unity_asset_parser.UnityAssetParser.resolve_prefab(prefab_variant.get_guid(), prefab_variant.get_filepath())
+    assert resolved_prefab_variant.get_source_prefab_guid() == ''
+    assert resolved_prefab_variant.get_unresolved_guids() == [('MODEL', guid(0xa1))]
@@ -0,0 +1,54 @@
+import pytest
+
+from generate_unity_project import load_addon_module
+
+
+@pytest.fixture
+def utilities():
+    return load_addon_module('utilities')
+
+
+def test_stat_cache_serves_listings_until_invalidated(utilities, tmp_path):
+    filepath = tmp_path / 'texture.png'
+    with utilities.stat_cache_scope() as stat_cache:
+        assert not utilities.exists(filepath)
+        filepath.write_bytes(b'png')
+        # the listing of the directory is cached for the run
+        assert not utilities.exists(filepath)
+        utilities.invalidate_stat_cache(filepath)
+        assert utilities.exists(filepath)
+        assert utilities.get_mtime(filepath) == filepath.stat().st_mtime
+        assert stat_cache.get_hit_counts()['scandirs'] == 2
+    # without a scope every lookup goes to the file system
+    filepath.unlink()
+    assert not utilities.exists(filepath)
+
+
+def test_copy_invalidates_stat_cache(utilities, tmp_path):
+    src_filepath = tmp_path / 'src' / 'texture.png'
+    src_filepath.parent.mkdir()
+    src_filepath.write_bytes(b'png')
+    dst_filepath = tmp_path / 'library' / 'textures' / 'texture.png'
+    with utilities.stat_cache_scope():
+        assert not utilities.exists(dst_filepath.parent)
+        assert not utilities.exists(dst_filepath)
+        utilities.copy(src_filepath, dst_filepath)
+        # the created directories and the copied file are visible in the same scope
+        assert utilities.exists(dst_filepath.parent)
+        assert utilities.exists(dst_filepath)
+        assert [dir_entry.name for dir_entry in utilities.scandir(dst_filepath.parent)] == ['texture.png']
+
+
+def test_stat_cache_compares_names_with_normcase(utilities, tmp_path, monkeypatch):
+    # a case-insensitive file system, as normcase is on windows
+    monkeypatch.setattr(utilities.os.path, 'normcase', lambda path: path.lower())
+    (tmp_path / 'Textures').mkdir()
+    (tmp_path / 'Textures' / 'Texture.PNG').write_bytes(b'png')
+    with utilities.stat_cache_scope() as stat_cache:
+        assert utilities.exists(tmp_path / 'Textures' / 'texture.png')
+        assert utilities.exists(tmp_path / 'Textures' / 'TEXTURE.png')
+        assert utilities.get_stat(tmp_path / 'Textures' / 'texture.PNG') is not None
+        assert not utilities.exists(tmp_path / 'Textures' / 'texture.jpg')
+        # the directory is listed once, whatever the case of its path
+        assert 1 == len(utilities.scandir(tmp_path / 'textures'))
+        assert stat_cache.get_hit_counts()['scandirs'] == 1
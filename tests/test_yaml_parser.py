@@ -0,0 +1,84 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+
+YAML_CORPUS_PATH = Path(__file__).parent / 'yaml_corpus'
+YAML_CORPUS_FILEPATHS = sorted([filepath for filepath in YAML_CORPUS_PATH.iterdir() if not filepath.name.endswith('.expected.json')])
+# edge_cases.yaml holds indentation errors that only the python parser accepts
+UNITY_YAML_CORPUS_FILEPATHS = [filepath for filepath in YAML_CORPUS_FILEPATHS if filepath.suffix != '.yaml']
+
+
+def dump_tree(yaml_parser, yaml_node):
+    """
+    the layout of the .expected.json files, which were written by the previous parser (lines.pop(0) / lines.insert(0, line)).
+    a YAMLGroup is a list of nodes, values are the raw text of the line.
+    """
+    children = []
+    for child in yaml_node.get_children():
+        if isinstance(child, yaml_parser.YAMLGroup):
+            children.append([dump_tree(yaml_parser, node) for node in child.get_nodes()])
+        else:
+            children.append(dump_tree(yaml_parser, child))
+    return {'name': yaml_node.get_name(), 'value': yaml_node.get_raw_value(), 'prefix': yaml_node.get_prefix(), 'depth': yaml_node._depth, 'children': children}
+
+
+@pytest.mark.parametrize('filepath', YAML_CORPUS_FILEPATHS, ids=[filepath.name for filepath in YAML_CORPUS_FILEPATHS])
+def test_build_yaml_matches_previous_parser(yaml_parser, filepath):
+    yaml = yaml_parser.YAML(name='YAML', contents=filepath.read_text(encoding='utf-8'))
+    expected_tree = json.loads(Path(f'{filepath.as_posix()}.expected.json').read_text())
+    assert dump_tree(yaml_parser, yaml) == expected_tree
+
+
+@pytest.mark.parametrize('filepath', UNITY_YAML_CORPUS_FILEPATHS, ids=[filepath.name for filepath in UNITY_YAML_CORPUS_FILEPATHS])
+def test_libyaml_backend_conformance(yaml_parser, filepath):
+    if not yaml_parser.LibYAMLBackend.is_available():
+        pytest.skip('PyYAML is not built with libyaml')
+    contents = filepath.read_text(encoding='utf-8')
+    python_yaml = yaml_parser.PythonYAMLBackend().parse(contents)
+    libyaml_yaml = yaml_parser.LibYAMLBackend().parse(contents)
+    assert dump_tree(yaml_parser, libyaml_yaml) == dump_tree(yaml_parser, python_yaml)
+    assert list(libyaml_yaml.iter_dump()) == list(python_yaml.iter_dump())
+
+
+@pytest.mark.parametrize('filepath', UNITY_YAML_CORPUS_FILEPATHS, ids=[filepath.name for filepath in UNITY_YAML_CORPUS_FILEPATHS])
+def test_dump_round_trip(yaml_parser, filepath, tmp_path):
+    contents = filepath.read_text(encoding='utf-8')
+    yaml = yaml_parser.YAML(name='YAML', contents=contents)
+    dump = yaml.dump()
+    # the document headers are not part of the tree, every other line is written back without trailing spaces
+    assert dump.split('\n') == [line.rstrip() for line in contents.split('\n') if line and not yaml_parser.re_ignore.match(line)]
+
+    f = io.StringIO()
+    yaml.write_dump(f)
+    assert f.getvalue() == dump
+
+    dump_filepath = tmp_path / filepath.name
+    yaml.dump_to(dump_filepath)
+    assert dump_filepath.read_text(encoding='utf-8') == dump
+    assert dump_tree(yaml_parser, yaml_parser.YAML.load_yaml(dump_filepath)) == dump_tree(yaml_parser, yaml)
+
+
+def test_parse_cache_bounds_entries_of_unsaved_runs(yaml_parser, tmp_path):
+    cache_path = tmp_path / '.yaml_parse_cache'
+    yaml_parser.__parse_cache__ = yaml_parser.YAMLParseCache(cache_path)
+    try:
+        for filepath in YAML_CORPUS_FILEPATHS:
+            assert yaml_parser.YAML.load_yaml(filepath) is not None
+    finally:
+        yaml_parser.__parse_cache__ = None
+    # the run never reached save, so index.json was not written
+    entry_sizes = dict([(entry_filepath.name, entry_filepath.stat().st_size) for entry_filepath in cache_path.iterdir()])
+    assert not (cache_path / 'index.json').exists()
+    assert len(entry_sizes) == len(YAML_CORPUS_FILEPATHS)
+
+    parse_cache = yaml_parser.YAMLParseCache(cache_path)
+    assert parse_cache.get(YAML_CORPUS_FILEPATHS[0], 'YAML') is not None
+    assert parse_cache.get_num_hits() == 1
+
+    max_size = sum(entry_sizes.values()) // 2
+    parse_cache = yaml_parser.YAMLParseCache(cache_path, max_size=max_size)
+    remaining_entry_sizes = [entry_filepath.stat().st_size for entry_filepath in cache_path.iterdir()]
+    assert 0 < len(remaining_entry_sizes) < len(entry_sizes)
+    assert sum(remaining_entry_sizes) <= max_size
@@ -1,19 +1,27 @@
+import concurrent.futures
 import copy
-import re
+import math
+import multiprocessing
+import os
 from pathlib import Path
 
 from . import utilities
 from . import yaml_parser
-from .asset_descriptor import MODEL_INFO_TEMPLATE, AssetMetadata, AssetTypes, AssetParser
-from .yaml_parser import YAML
+from .asset_descriptor import MODEL_INFO_TEMPLATE, UNRESOLVED_GUID, AssetMetadata, AssetTypes, AssetParser, SceneModelInfos, numpy
+from .yaml_parser import YAMLParseCache, UnityYAMLFile
 
 
 global __logger__
 global __asset_descriptor_manager__
 global __asset_parser__
 
-re_color = re.compile(r'{(.+?)}')
-re_guid = re.compile('guid: ([a-fA-F0-9]+)')
+# UnityResolvedPrefab by prefab guid, kept for a run of UnityAssetParser.process
+__resolved_prefabs__ = {}
+__resolving_prefab_guids__ = set()
+# (asset_type, guid) which did not resolve while parsing an asset, see UnityAssetParser.resolve_guid
+__unresolved_guids__ = []
+
+NUM_WORKERS_ENVIRONMENT_NAME = 'RUST_ENGINE_3D_ASSET_MANAGER_NUM_WORKERS'
 
 class UnityAssetParser(AssetParser):
     def __init__(self, asset_descriptor_manager, logger):
@@ -28,44 +36,122 @@ class UnityAssetParser(AssetParser):
 
     @staticmethod
     def extract_guid(filepath: Path):
-        if filepath.exists():
+        if utilities.exists(filepath):
             meta_filepath = filepath.with_suffix(f'{filepath.suffix}.meta')
-            metadata = YAML.load_yaml(meta_filepath)
-            return metadata.get_child('guid').get_value()
+            guid = yaml_parser.extract_yaml_values(meta_filepath, ['guid']).get('guid', '') if utilities.exists(meta_filepath) else ''
+            if not guid:
+                __logger__.error(f'extract_guid - guid not found: {meta_filepath}')
+            return guid
         return ''
 
     @staticmethod
-    def extract_float_array(value):
-        return [eval(value) for key, value in value.items()]
+    def resolve_guid(asset_type, guid):
+        asset_metadata = __asset_descriptor_manager__.get_asset_metadata(asset_type, guid=guid)
+        if asset_metadata is None and guid:
+            __unresolved_guids__.append((asset_type, guid))
+        return asset_metadata
 
-    def process_asset_data(self, asset_descriptor_data, asset_metadata):
-        __logger__.debug(f'>>> process_asset_data: {asset_metadata.get_asset_path()}')
-        match(asset_metadata.get_asset_type()):
+    @staticmethod
+    def parse_asset_data(asset_descriptor_data, asset_type, filepath, guid=''):
+        """
+        returns the asset data and the (asset_type, guid) of the references which did not resolve.
+        """
+        del __unresolved_guids__[:]
+        asset_data = {}
+        match(asset_type):
             case AssetTypes.MATERIAL:
                 pass
             case AssetTypes.MATERIAL_INSTANCE:
-                yaml_data = YAML.load_yaml(asset_metadata.get_filepath())
-                parameters = self.process_material_and_parameters(asset_descriptor_data, yaml_data)
-                for parameter_type, parameter_value in parameters.items():
-                    asset_metadata.set_data(parameter_type, parameter_value)
+                yaml_data = UnityYAMLFile(filepath).load_yaml(type_names=['Material'])
+                asset_data.update(UnityAssetParser.process_material_and_parameters(asset_descriptor_data, yaml_data))
             case AssetTypes.MESH:
                 pass
             case AssetTypes.MODEL:
-                yaml_data = YAML.load_yaml(asset_metadata.get_filepath())
-                material_instance_asset_paths = self.process_material_instances(yaml_data)
-                mesh_asset_path = self.process_mesh(yaml_data)
-                asset_metadata.set_data(AssetTypes.MATERIAL_INSTANCE, material_instance_asset_paths)
-                asset_metadata.set_data(AssetTypes.MESH, mesh_asset_path)
+                resolved_prefab = UnityAssetParser.resolve_prefab(guid, filepath)
+                __unresolved_guids__.extend(resolved_prefab.get_unresolved_guids())
+                asset_data[AssetTypes.MATERIAL_INSTANCE] = UnityAssetParser.process_material_instances(resolved_prefab)
+                asset_data[AssetTypes.MESH] = UnityAssetParser.process_mesh(resolved_prefab)
+                if resolved_prefab.get_source_prefab_guid():
+                    # variants are re-processed with their base prefab
+                    asset_data[AssetTypes.MODEL] = __asset_descriptor_manager__.get_asset_metadata(AssetTypes.MODEL, guid=resolved_prefab.get_source_prefab_guid()).get_asset_path()
             case AssetTypes.SCENE:
-                yaml_data = YAML.load_yaml(asset_metadata.get_filepath())
-                model_infos = self.process_model_infos(yaml_data)
-                asset_metadata.set_data(AssetTypes.MODEL, model_infos)
+                yaml_documents = UnityYAMLFile(filepath).load_yaml_documents(type_names=['MeshFilter', 'PrefabInstance', 'Transform'])
+                asset_data[AssetTypes.MODEL] = UnityAssetParser.process_model_infos(yaml_documents)
             case AssetTypes.TEXTURE:
                 pass
             case _:
-                msg = f'Unknown asset type: {asset_metadata.get_asset_type()}'
+                msg = f'Unknown asset type: {asset_type}'
                 __logger__.error(msg)
                 raise ValueError(msg)
+        return asset_data, list(dict.fromkeys(__unresolved_guids__).keys())
+
+    @staticmethod
+    def get_asset_dependencies(asset_type, asset_data, unresolved_guids=()):
+        dependencies = []
+        match(asset_type):
+            case AssetTypes.MATERIAL_INSTANCE:
+                dependencies.append((AssetTypes.MATERIAL, asset_data[AssetTypes.MATERIAL]))
+                dependencies.extend([(AssetTypes.TEXTURE, texture_asset_path) for texture_asset_path in asset_data[AssetTypes.TEXTURE].values()])
+            case AssetTypes.MODEL:
+                dependencies.append((AssetTypes.MESH, asset_data[AssetTypes.MESH]))
+                dependencies.extend([(AssetTypes.MATERIAL_INSTANCE, asset_path) for asset_paths in asset_data[AssetTypes.MATERIAL_INSTANCE] for asset_path in asset_paths])
+                if AssetTypes.MODEL in asset_data:
+                    dependencies.append((AssetTypes.MODEL, asset_data[AssetTypes.MODEL]))
+            case AssetTypes.SCENE:
+                model_infos = asset_data[AssetTypes.MODEL]
+                if isinstance(model_infos, SceneModelInfos):
+                    dependencies.extend(model_infos.get_assets())
+                else:
+                    dependencies.extend([(model_info['asset_type'], model_info['asset_path']) for model_info in model_infos])
+        # unique, in order of appearance
+        dependencies = [dependency for dependency in dict.fromkeys(dependencies).keys() if dependency[1]]
+        # the asset is processed again when one of these guids is registered
+        dependencies.extend([(UNRESOLVED_GUID, unresolved_asset_type, unresolved_guid) for (unresolved_asset_type, unresolved_guid) in unresolved_guids])
+        return dependencies
+
+    def apply_asset_data(self, asset_metadata, asset_data, unresolved_guids=()):
+        for (key, value) in asset_data.items():
+            asset_metadata.set_data(key, value)
+        asset_dependencies = self.get_asset_dependencies(asset_metadata.get_asset_type(), asset_data, unresolved_guids)
+        __asset_descriptor_manager__.set_asset_dependencies(asset_metadata, asset_dependencies)
+
+    def process_asset_data(self, asset_descriptor_data, asset_metadata):
+        __logger__.debug(f'>>> process_asset_data: {asset_metadata.get_asset_path()}')
+        (asset_data, unresolved_guids) = self.parse_asset_data(asset_descriptor_data, asset_metadata.get_asset_type(), asset_metadata.get_filepath(), asset_metadata.get_guid())
+        self.apply_asset_data(asset_metadata, asset_data, unresolved_guids)
+
+    def process_asset_data_list(self, asset_descriptor_data, asset_metadata_list):
+        parallel_asset_types = [AssetTypes.MATERIAL_INSTANCE, AssetTypes.MODEL, AssetTypes.SCENE]
+        parallel_asset_metadata_list = [asset_metadata for asset_metadata in asset_metadata_list if asset_metadata.get_asset_type() in parallel_asset_types]
+        num_workers = self.get_num_workers(asset_descriptor_data)
+        use_worker_pool = asset_descriptor_data.get('parallel_process_asset_data', False) and 1 < num_workers and 1 < len(parallel_asset_metadata_list)
+        # the workers inherit the parser state by fork, see get_fork_context
+        mp_context = self.get_fork_context() if use_worker_pool else None
+        if mp_context is None:
+            if use_worker_pool:
+                __logger__.info('process_asset_data_list: fork is not available, process the assets serially')
+            for asset_metadata in asset_metadata_list:
+                self.process_asset_data(asset_descriptor_data, asset_metadata)
+            return
+
+        # workers parse and resolve against a read-only snapshot in separate processes, the results are merged in order.
+        __logger__.info(f'process_asset_data_list: {len(parallel_asset_metadata_list)} assets, {num_workers} workers')
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_workers,
+            mp_context=mp_context,
+            initializer=initialize_asset_data_worker,
+            initargs=(__asset_descriptor_manager__.create_snapshot(), asset_descriptor_data)
+        ) as worker_pool:
+            asset_data_list = worker_pool.map(
+                process_asset_data_worker,
+                [asset_metadata.get_asset_type() for asset_metadata in parallel_asset_metadata_list],
+                [asset_metadata.get_filepath() for asset_metadata in parallel_asset_metadata_list],
+                [asset_metadata.get_guid() for asset_metadata in parallel_asset_metadata_list],
+                chunksize=16
+            )
+            for (asset_metadata, (asset_data, unresolved_guids)) in zip(parallel_asset_metadata_list, asset_data_list):
+                __logger__.debug(f'>>> process_asset_data: {asset_metadata.get_asset_path()}')
+                self.apply_asset_data(asset_metadata, asset_data, unresolved_guids)
 
     @staticmethod
     def process_material_and_parameters(asset_descriptor_data, yaml_data):
@@ -83,7 +169,7 @@ class UnityAssetParser(AssetParser):
             if m_TexEnv.get_name() in material_create_info['m_TexEnvs']:
                 # texture
                 texture_guid = m_TexEnv.get_child('m_Texture').get('guid')
-                texture = __asset_descriptor_manager__.get_asset_metadata(AssetTypes.TEXTURE, guid=texture_guid)
+                texture = UnityAssetParser.resolve_guid(AssetTypes.TEXTURE, texture_guid)
                 parameters[AssetTypes.TEXTURE][m_TexEnv.get_name()] = texture.get_asset_path() if texture else ''
                 # scale
                 scale = m_TexEnv.get_child('m_Scale')
@@ -96,140 +182,453 @@ class UnityAssetParser(AssetParser):
         for m_ColorGroup in m_Colors:
             m_Color = m_ColorGroup.get_node(0)
             if m_Color.get_name() in material_create_info['m_Colors']:
-                parameters[AssetTypes.COLOR][m_Color.get_name()] = UnityAssetParser.extract_float_array(m_Color.get_value())
+                parameters[AssetTypes.COLOR][m_Color.get_name()] = list(m_Color.get_color())
 
         m_Floats = yaml_data.get_child('Material').get_child('m_SavedProperties').get_child('m_Floats').get_children()
         for m_FloatGroup in m_Floats:
             m_Float = m_FloatGroup.get_node(0)
             if m_Float.get_name() in material_create_info['m_Floats']:
-                parameters[AssetTypes.VALUE][m_Float.get_name()] = float(m_Float.get_value())
+                parameters[AssetTypes.VALUE][m_Float.get_name()] = m_Float.get_float()
 
         return parameters
 
     @staticmethod
-    def process_material_instances(yaml_data):
-        material_guid_groups = []
-        MeshRenderers = yaml_data.get_children('MeshRenderer')
-        PrefabInstances = yaml_data.get_children('PrefabInstance')
-        if MeshRenderers:
-            for MeshRenderer in MeshRenderers:
-                material_guid_groups.append([])
-                material_guids = material_guid_groups[-1]
-                for material_group in MeshRenderer.get_child('m_Materials').get_children():
-                    material = material_group.get_node(0)
-                    guid = material.get('guid')
-                    if guid is None:
-                        __logger__.error(f'process_material_instances - MeshRenderer.m_Materials.guid: {guid}, value: {material}')
-                    material_guids.append(guid)
-        elif PrefabInstances:
-            for PrefabInstance in PrefabInstances:
-                for modification_group in PrefabInstance.get_child('m_Modification').get_child('m_Modifications').get_children():
-                    if modification_group.find_node('propertyPath').get_value().startswith('m_Materials'):
-                        guid = modification_group.find_node('objectReference').get('guid')
-                        if guid is None:
-                            __logger__.error(f'process_material_instances - PrefabInstance.m_Modification.m_Modifications.objectReference.guid: {guid}, value: {modification.get_child("objectReference")}')
-                        material_guid_groups.append([])
-                        material_guids = material_guid_groups[-1]
-                        material_guids.append(guid)
-        else:
-            msg = f'Unknown yaml data: {yaml_data}'
+    def resolve_prefab(guid, filepath):
+        """
+        resolves the mesh and material slots of a prefab, following the m_SourcePrefab of variants and nested prefabs.
+        results are memoized by prefab guid for the run, a variant of the same base resolves the base once.
+        """
+        resolved_prefab = __resolved_prefabs__.get(guid) if guid else None
+        if resolved_prefab is None:
+            if guid in __resolving_prefab_guids__:
+                msg = f'resolve_prefab - cyclic m_SourcePrefab: {guid}, {filepath}'
+                __logger__.error(msg)
+                raise ValueError(msg)
+
+            if guid:
+                __resolving_prefab_guids__.add(guid)
+            try:
+                yaml_documents = UnityYAMLFile(filepath).load_yaml_documents(type_names=['MeshFilter', 'MeshRenderer', 'PrefabInstance'])
+                resolved_prefab = UnityAssetParser.resolve_prefab_documents(yaml_documents, filepath)
+            finally:
+                __resolving_prefab_guids__.discard(guid)
+
+            if guid:
+                __resolved_prefabs__[guid] = resolved_prefab
+        return resolved_prefab
+
+    @staticmethod
+    def resolve_prefab_documents(yaml_documents, filepath):
+        mesh_guid = ''
+        material_guids_by_renderer = {}
+        PrefabInstances = []
+        for (document, yaml_node) in yaml_documents:
+            match yaml_node.get_name():
+                case 'MeshFilter':
+                    m_Mesh = yaml_node.get_child('m_Mesh')
+                    if m_Mesh is not None and not mesh_guid:
+                        mesh_guid = m_Mesh.get('guid')
+                case 'MeshRenderer':
+                    # the renderers of a nested prefab are stripped and have no m_Materials
+                    m_Materials = yaml_node.get_child('m_Materials')
+                    if m_Materials is not None:
+                        material_guids = []
+                        for material_group in m_Materials.get_children():
+                            material = material_group.get_node(0)
+                            guid = material.get('guid')
+                            if guid is None:
+                                __logger__.error(f'resolve_prefab - MeshRenderer.m_Materials.guid: {guid}, value: {material.get_raw_value()}')
+                            material_guids.append(guid)
+                        material_guids_by_renderer[document.get_file_id()] = material_guids
+                case 'PrefabInstance':
+                    PrefabInstances.append((document.get_file_id(), yaml_node))
+
+        if mesh_guid or material_guids_by_renderer:
+            return UnityResolvedPrefab(mesh_guid=mesh_guid, material_guids_by_renderer=material_guids_by_renderer)
+
+        if not PrefabInstances:
+            msg = f'Unknown yaml data: {filepath}'
             __logger__.error(msg)
             raise ValueError(msg)
 
+        # prefab variant: every prefab instance is resolved through its own source prefab or source model file.
+        # the first prefab instance is the base prefab of the variant and gives its mesh.
+        mesh_guid = ''
+        source_prefab_guid = ''
+        unresolved_guids = []
+        for (index, (prefab_instance_file_id, PrefabInstance)) in enumerate(PrefabInstances):
+            instance_prefab = UnityAssetParser.resolve_prefab_instance(prefab_instance_file_id, PrefabInstance)
+            if 0 == index:
+                mesh_guid = instance_prefab.get_mesh_guid()
+                source_prefab_guid = instance_prefab.get_source_prefab_guid()
+            material_guids_by_renderer.update(instance_prefab.get_material_guids_by_renderer())
+            unresolved_guids.extend([unresolved_guid for unresolved_guid in instance_prefab.get_unresolved_guids() if unresolved_guid not in unresolved_guids])
+
+        return UnityResolvedPrefab(
+            mesh_guid=mesh_guid,
+            material_guids_by_renderer=material_guids_by_renderer,
+            source_prefab_guid=source_prefab_guid,
+            unresolved_guids=unresolved_guids
+        )
+
+    @staticmethod
+    def resolve_prefab_instance(prefab_instance_file_id, PrefabInstance):
+        """
+        returns the source prefab or the source model file of a prefab instance with its modifications applied.
+        the renderers are keyed by their fileID in the prefab which contains the prefab instance.
+        """
+        source_guid = PrefabInstance.get_child('m_SourcePrefab').get('guid')
+        source_prefab = __asset_descriptor_manager__.get_asset_metadata(AssetTypes.MODEL, guid=source_guid)
+        if source_prefab is not None and source_prefab.get_filepath() is not None:
+            base_prefab = UnityAssetParser.resolve_prefab(source_guid, source_prefab.get_filepath())
+            mesh_guid = base_prefab.get_mesh_guid()
+            material_guids_by_renderer = dict([(file_id, list(material_guids)) for (file_id, material_guids) in base_prefab.get_material_guids_by_renderer().items()])
+            unresolved_guids = base_prefab.get_unresolved_guids()
+        else:
+            # the source model file, which is registered as a MESH, or a source prefab which is not registered yet
+            source_prefab = None
+            mesh_guid = source_guid
+            material_guids_by_renderer = {}
+            is_registered = not source_guid or __asset_descriptor_manager__.get_asset_metadata(AssetTypes.MESH, guid=source_guid) is not None
+            unresolved_guids = [] if is_registered else [(AssetTypes.MODEL, source_guid)]
+
+        for modification_group in PrefabInstance.get_child('m_Modification').get_child('m_Modifications').get_children():
+            propertyPath = modification_group.find_node('propertyPath').get_value()
+            if propertyPath.startswith('m_Materials'):
+                target_file_id = modification_group.find_node('target').get_reference().get_file_id()
+                material_guids = material_guids_by_renderer.setdefault(target_file_id, [])
+                if 'm_Materials.Array.size' == propertyPath:
+                    size = int(modification_group.find_node('value').get_float())
+                    del material_guids[size:]
+                    material_guids.extend([None] * (size - len(material_guids)))
+                elif propertyPath.startswith('m_Materials.Array.data['):
+                    slot_index = int(propertyPath[len('m_Materials.Array.data['):].rstrip(']'))
+                    guid = modification_group.find_node('objectReference').get('guid')
+                    if guid is None:
+                        __logger__.error(f'resolve_prefab - PrefabInstance.m_Modification.m_Modifications.objectReference.guid: {guid}, propertyPath: {propertyPath}')
+                    material_guids.extend([None] * (slot_index + 1 - len(material_guids)))
+                    material_guids[slot_index] = guid
+            elif 'm_Mesh' == propertyPath:
+                guid = modification_group.find_node('objectReference').get('guid')
+                if guid:
+                    mesh_guid = guid
+
+        # objects of a prefab instance are identified in the variant by (prefab instance fileID ^ source fileID)
+        return UnityResolvedPrefab(
+            mesh_guid=mesh_guid,
+            material_guids_by_renderer=dict([
+                ((prefab_instance_file_id ^ file_id) & 0x7fffffffffffffff, material_guids) for (file_id, material_guids) in material_guids_by_renderer.items()
+            ]),
+            source_prefab_guid=source_guid if source_prefab is not None else '',
+            unresolved_guids=unresolved_guids
+        )
+
+    @staticmethod
+    def process_material_instances(resolved_prefab):
+        """
+        one asset path per material slot, the materials are assigned by slot index.
+        an empty slot or a guid which does not resolve keeps its index with an empty asset path.
+        """
         material_path_groups = []
-        for material_guids in material_guid_groups:
+        for material_guids in resolved_prefab.get_material_guids_by_renderer().values():
             material_path_groups.append([])
             material_paths = material_path_groups[-1]
             for guid in material_guids:
-                asset_metadata = __asset_descriptor_manager__.get_asset_metadata(AssetTypes.MATERIAL_INSTANCE, guid=guid)
+                asset_metadata = UnityAssetParser.resolve_guid(AssetTypes.MATERIAL_INSTANCE, guid) if guid else None
                 if asset_metadata:
                     material_paths.append(asset_metadata.get_asset_path())
                 else:
-                    __logger__.error(f'process_material_instances - guid: {guid}')
+                    if guid:
+                        __logger__.error(f'process_material_instances - guid: {guid}')
+                    material_paths.append('')
         return material_path_groups
 
     @staticmethod
-    def process_mesh(yaml_data):
-        MeshFilter = yaml_data.get_child('MeshFilter')
-        PrefabInstance = yaml_data.get_child('PrefabInstance')
-        if MeshFilter:
-            mesh_guid = MeshFilter.get_child('m_Mesh').get('guid')
-        elif PrefabInstance:
-            mesh_guid = PrefabInstance.get_child('m_SourcePrefab').get('guid')
-        else:
-            msg = f'Unknown yaml data: {yaml_data}'
-            __logger__.error(msg)
-            raise ValueError(msg)
-        return __asset_descriptor_manager__.get_asset_metadata(AssetTypes.MESH, guid=mesh_guid).get_asset_path()
+    def process_mesh(resolved_prefab):
+        mesh_guid = resolved_prefab.get_mesh_guid()
+        asset_metadata = UnityAssetParser.resolve_guid(AssetTypes.MESH, mesh_guid)
+        if asset_metadata is None:
+            __logger__.error(f'process_mesh - guid: {mesh_guid}')
+            return ''
+        return asset_metadata.get_asset_path()
 
     @staticmethod
-    def process_model_infos(yaml_data):
+    def process_prefab_instance_transform(PrefabInstance):
+        """
+        returns the local position, rotation quaternion, scale and euler hint of the root transform of a prefab instance.
+        the root transform is the target of the first transform modification.
+        """
+        transform = {'m_LocalPosition': [0.0, 0.0, 0.0], 'm_LocalRotation': [0.0, 0.0, 0.0, 1.0], 'm_LocalScale': [1.0, 1.0, 1.0], 'm_LocalEulerAnglesHint': None}
+        component_indices = {'x': 0, 'y': 1, 'z': 2, 'w': 3}
+        has_rotation = False
+        root_target_file_id = None
+        for modification_group in PrefabInstance.get_child('m_Modification').get_child('m_Modifications').get_children():
+            propertyPath = modification_group.find_node('propertyPath').get_value()
+            tokens = propertyPath.split('.')
+            if len(tokens) == 2 and tokens[0] in transform and tokens[1] in component_indices:
+                target_file_id = modification_group.find_node('target').get_reference().get_file_id()
+                if root_target_file_id is None:
+                    root_target_file_id = target_file_id
+                elif root_target_file_id != target_file_id:
+                    continue
+
+                value = modification_group.find_node('value').get_float()
+                if 'm_LocalEulerAnglesHint' == tokens[0] and transform[tokens[0]] is None:
+                    transform[tokens[0]] = [0.0, 0.0, 0.0]
+                elif 'm_LocalRotation' == tokens[0]:
+                    has_rotation = True
+                transform[tokens[0]][component_indices[tokens[1]]] = value
+
+        euler_hint = transform['m_LocalEulerAnglesHint']
+        rotation = transform['m_LocalRotation']
+        if not has_rotation and euler_hint is not None:
+            rotation = UnityTransformHierarchy.quaternion_from_euler(euler_hint)
+        return transform['m_LocalPosition'], rotation, transform['m_LocalScale'], euler_hint
+
+    @staticmethod
+    def process_model_infos(yaml_documents):
+        """
+        resolves the world transforms of the PrefabInstance documents and the plain GameObjects with a MeshFilter of a scene.
+        yaml_documents: UnityYAMLFile.load_yaml_documents(type_names=['MeshFilter', 'PrefabInstance', 'Transform'])
+        """
+        hierarchy = UnityTransformHierarchy()
+        transform_file_ids_by_game_object = {}
+        # (asset_type, asset_path, fileID of the transform or the GameObject of a MeshFilter) in document order
+        instances = []
+        for (document, yaml_node) in yaml_documents:
+            file_id = document.get_file_id()
+            match yaml_node.get_name():
+                case 'Transform':
+                    m_GameObject = yaml_node.get_child('m_GameObject')
+                    if m_GameObject is not None:
+                        transform_file_ids_by_game_object[m_GameObject.get_reference().get_file_id()] = file_id
+
+                    m_Father = yaml_node.get_child('m_Father')
+                    m_PrefabInstance = yaml_node.get_child('m_PrefabInstance')
+                    if m_Father is None and m_PrefabInstance is not None:
+                        # stripped transform of a prefab instance, its children are placed under the prefab instance
+                        hierarchy.add_transform(file_id, m_PrefabInstance.get_reference().get_file_id())
+                    else:
+                        m_LocalEulerAnglesHint = yaml_node.get_child('m_LocalEulerAnglesHint')
+                        hierarchy.add_transform(
+                            file_id,
+                            m_Father.get_reference().get_file_id() if m_Father is not None else 0,
+                            position=yaml_node.get_child('m_LocalPosition').get_vector(),
+                            rotation=yaml_node.get_child('m_LocalRotation').get_vector(),
+                            scale=yaml_node.get_child('m_LocalScale').get_vector(),
+                            euler_hint=m_LocalEulerAnglesHint.get_vector() if m_LocalEulerAnglesHint is not None else None
+                        )
+                case 'PrefabInstance':
+                    model_guid = yaml_node.get_child('m_SourcePrefab').get('guid')
+                    asset_metadata = UnityAssetParser.resolve_guid(AssetTypes.MODEL, model_guid)
+                    if asset_metadata is None:
+                        __logger__.debug(f'process_model_infos - invalid guid: {model_guid}')
+                        continue
+
+                    m_TransformParent = yaml_node.get_child('m_Modification').get_child('m_TransformParent')
+                    position, rotation, scale, euler_hint = UnityAssetParser.process_prefab_instance_transform(yaml_node)
+                    hierarchy.add_transform(
+                        file_id,
+                        m_TransformParent.get_reference().get_file_id() if m_TransformParent is not None else 0,
+                        position=position,
+                        rotation=rotation,
+                        scale=scale,
+                        euler_hint=euler_hint
+                    )
+                    instances.append((AssetTypes.MODEL, asset_metadata.get_asset_path(), file_id))
+                case 'MeshFilter':
+                    # the MeshFilter of a prefab instance is stripped and has no m_Mesh
+                    m_Mesh = yaml_node.get_child('m_Mesh')
+                    if m_Mesh is None:
+                        continue
+
+                    mesh_guid = m_Mesh.get('guid')
+                    asset_metadata = UnityAssetParser.resolve_guid(AssetTypes.MESH, mesh_guid)
+                    if asset_metadata is None:
+                        __logger__.debug(f'process_model_infos - invalid mesh guid: {mesh_guid}')
+                        continue
+                    instances.append((AssetTypes.MESH, asset_metadata.get_asset_path(), yaml_node.get_child('m_GameObject').get_reference().get_file_id()))
+
+        transform_file_ids = []
+        asset_indices_by_asset = {}
+        asset_indices = []
+        for (asset_type, asset_path, file_id) in instances:
+            if AssetTypes.MESH == asset_type:
+                file_id = transform_file_ids_by_game_object.get(file_id)
+                if file_id is None:
+                    __logger__.debug(f'process_model_infos - no transform of mesh: {asset_path}')
+                    continue
+            transform_file_ids.append(file_id)
+            asset_indices.append(asset_indices_by_asset.setdefault((asset_type, asset_path), len(asset_indices_by_asset)))
+
+        # position, rotation, scale of MODEL_INFO_TEMPLATE in a row, unity y-up to blender z-up
+        transforms = []
+        for (position, rotation, scale) in hierarchy.get_world_transforms(transform_file_ids):
+            transforms.append([
+                position[0], position[2], position[1],
+                rotation[0], rotation[2], rotation[1],
+                abs(scale[0]), abs(scale[2]), abs(scale[1])
+            ])
+
+        if numpy is not None:
+            return SceneModelInfos.create(asset_indices_by_asset.keys(), asset_indices, transforms)
+
+        # without numpy the scene keeps a MODEL_INFO_TEMPLATE dict per instance
+        assets = list(asset_indices_by_asset.keys())
         model_infos = []
-        PrefabInstances = yaml_data.get_children('PrefabInstance')
-        for PrefabInstance in PrefabInstances:
+        for (asset_index, transform) in zip(asset_indices, transforms):
             model_info = copy.deepcopy(MODEL_INFO_TEMPLATE)
-            model_guid = PrefabInstance.get_child('m_SourcePrefab').get('guid')
-            asset_metadata = __asset_descriptor_manager__.get_asset_metadata(AssetTypes.MODEL, guid=model_guid)
-            if asset_metadata is None:
-                __logger__.debug(f'process_model_infos - invalid guid: {model_guid}')
-                continue
-
-            model_info['asset_path'] = asset_metadata.get_asset_path()
-            transform_components = {'m_LocalPosition': 'position', 'm_LocalEulerAnglesHint': 'rotation', 'm_LocalScale': 'scale'}
-            # unity y-up to blender z-up
-            swizzle_map = {'x': 0, 'y': 2, 'z': 1}
-
-            for modification_group in PrefabInstance.get_child('m_Modification').get_child('m_Modifications').get_children():
-                target = modification_group.find_node('target').get_value()
-                propertyPath = modification_group.find_node('propertyPath').get_value()
-                value = modification_group.find_node('value').get_value()
-                tokens = propertyPath.split('.')
-                if len(tokens) == 2:
-                    component_name = transform_components.get(tokens[0], '')
-                    swizzle = swizzle_map.get(tokens[1], 0)
-                    value = float(value)
-                    if component_name:
-                        if ('position' == component_name or 'rotation' == component_name) and value == 0.0:
-                            continue
-                        elif 'scale' == component_name:
-                            value = abs(value)
-                            if value == 1.0:
-                                continue
-                        model_info[component_name][swizzle] = value
+            model_info['asset_type'], model_info['asset_path'] = assets[asset_index]
+            model_info['position'] = transform[0:3]
+            model_info['rotation'] = transform[3:6]
+            model_info['scale'] = transform[6:9]
             model_infos.append(model_info)
         return model_infos
 
+    def open_parse_cache(self, asset_descriptor_data):
+        parse_cache_info = asset_descriptor_data.get('yaml_parse_cache', {})
+        if parse_cache_info.get('enabled', False):
+            cache_path = __asset_descriptor_manager__.get_root_path() / parse_cache_info.get('cache_path', '.yaml_parse_cache')
+            yaml_parser.__parse_cache__ = YAMLParseCache(cache_path, max_size=parse_cache_info.get('max_size', 256 * 1024 * 1024))
+
+    def close_parse_cache(self):
+        if yaml_parser.__parse_cache__ is not None:
+            yaml_parser.__parse_cache__.save()
+            yaml_parser.__parse_cache__ = None
+
     def process(self, asset_descriptor_data):
         __logger__.info(f'AssetDescriptor::process')
-        root_path = __asset_descriptor_manager__.get_root_path()
-        new_asset_metadata_list_by_types = {}
-        for asset_type in AssetTypes.get_types():
-            asset_metadata_list = []
-            new_asset_metadata_list_by_types[asset_type] = asset_metadata_list
+        __resolved_prefabs__.clear()
+        try:
+            yaml_parser.set_backend(asset_descriptor_data.get('yaml_backend', yaml_parser.PythonYAMLBackend.name))
+            self.open_parse_cache(asset_descriptor_data)
+            self.process_assets(asset_descriptor_data)
+        finally:
+            self.close_parse_cache()
 
-            # parsing: asset_path_infos
+    @staticmethod
+    def get_num_workers(asset_descriptor_data):
+        num_workers = asset_descriptor_data.get('num_workers', 0)
+        environment_num_workers = os.environ.get(NUM_WORKERS_ENVIRONMENT_NAME)
+        if environment_num_workers:
+            try:
+                num_workers = int(environment_num_workers)
+            except ValueError:
+                __logger__.warning(f'get_num_workers - invalid {NUM_WORKERS_ENVIRONMENT_NAME}: {environment_num_workers!r}, fallback to num_workers: {num_workers}')
+        num_workers = int(num_workers)
+        return num_workers if 0 < num_workers else (os.cpu_count() or 1)
+
+    @staticmethod
+    def get_fork_context():
+        # workers inherit the logger and the parser state by fork, spawn and forkserver start without them
+        # and cannot start blender's python. fork is not available on windows.
+        if 'fork' in multiprocessing.get_all_start_methods():
+            return multiprocessing.get_context('fork')
+        return None
+
+    @staticmethod
+    def create_worker_pool(asset_descriptor_data, num_workers):
+        if asset_descriptor_data.get('worker_pool', 'thread') == 'process':
+            mp_context = UnityAssetParser.get_fork_context()
+            if mp_context is not None:
+                return concurrent.futures.ProcessPoolExecutor(max_workers=num_workers, mp_context=mp_context)
+            __logger__.info('create_worker_pool: fork is not available, fallback to a thread pool')
+        return concurrent.futures.ThreadPoolExecutor(max_workers=num_workers)
+
+    @staticmethod
+    def extract_guid_and_fingerprint(filepath):
+        return UnityAssetParser.extract_guid(filepath), utilities.get_fingerprint(filepath)
+
+    def extract_guids_and_fingerprints(self, asset_descriptor_data, filepaths):
+        num_workers = self.get_num_workers(asset_descriptor_data)
+        if num_workers <= 1 or len(filepaths) <= 1:
+            return [self.extract_guid_and_fingerprint(filepath) for filepath in filepaths]
+
+        __logger__.info(f'extract_guids_and_fingerprints: {len(filepaths)} files, {num_workers} workers')
+        with self.create_worker_pool(asset_descriptor_data, num_workers) as worker_pool:
+            return list(worker_pool.map(UnityAssetParser.extract_guid_and_fingerprint, filepaths, chunksize=256))
+
+    @staticmethod
+    def scan_asset_files(root_path, asset_descriptor_data):
+        """
+        walks every distinct import directory once with utilities.scandir and dispatches the files by suffix.
+        returns (asset_type, asset_path, filepath) in the order of asset types, asset_path_infos, suffixes and directory walk,
+        which is the order of one rglob per asset_path_info and suffix.
+        """
+        scan_results = []
+        scan_entries_by_directory = {}
+        for asset_type in AssetTypes.get_types():
             descriptor_data = asset_descriptor_data.get(asset_type, {})
             for asset_path_info in descriptor_data.get('asset_path_infos', []):
                 asset_directory_path = root_path / asset_path_info.get('import_path', '')
                 asset_catalog_name = asset_path_info.get('asset_catalog_name', '')
-                for ext in descriptor_data.get('suffixes', []):
-                    for filepath in asset_directory_path.rglob(f'*{ext}'):
-                        relative_filepath = filepath.relative_to(asset_directory_path)
-                        asset_path = Path(asset_catalog_name, relative_filepath.with_suffix('')).as_posix()
-                        asset_metadata = __asset_descriptor_manager__.get_asset_metadata(asset_type=asset_type, asset_path=asset_path)
-                        if asset_metadata is None:
-                            asset_metadata = AssetMetadata(
-                                asset_type=asset_type,
-                                asset_path=asset_path,
-                                filepath=filepath,
-                                guid=self.extract_guid(filepath),
-                                mtime=utilities.get_mtime(filepath)
-                            )
-                            asset_metadata_list.append(asset_metadata)
-                            __asset_descriptor_manager__.register_asset_metadata(asset_metadata)
-                            __logger__.info(f'register_asset_metadata: {asset_metadata.get_guid()}, {asset_metadata.get_asset_type()}, {asset_metadata.get_asset_path()}')
+                for suffix in descriptor_data.get('suffixes', []):
+                    filepaths = []
+                    scan_results.append((asset_type, asset_directory_path, asset_catalog_name, filepaths))
+                    scan_entries_by_directory.setdefault(os.path.normpath(asset_directory_path), []).append((suffix, filepaths))
+
+        def walk(directory, scan_entries):
+            scan_entries = scan_entries + scan_entries_by_directory.get(directory, [])
+            # the listing also answers the exists and mtime lookups of the files found here
+            sub_directories = []
+            for dir_entry in utilities.scandir(directory):
+                if dir_entry.is_dir():
+                    if not dir_entry.is_symlink():
+                        sub_directories.append(dir_entry.path)
+                else:
+                    for (suffix, filepaths) in scan_entries:
+                        if dir_entry.name.endswith(suffix):
+                            filepaths.append(dir_entry.path)
+
+            for sub_directory in sub_directories:
+                walk(sub_directory, scan_entries)
+
+        # nested import directories are dispatched while walking their ancestor
+        for directory in scan_entries_by_directory.keys():
+            if not any([directory.startswith(os.path.join(other_directory, '')) for other_directory in scan_entries_by_directory.keys() if other_directory != directory]):
+                walk(directory, [])
+
+        for (asset_type, asset_directory_path, asset_catalog_name, filepaths) in scan_results:
+            for filepath in filepaths:
+                filepath = Path(filepath)
+                relative_filepath = filepath.relative_to(asset_directory_path)
+                yield asset_type, Path(asset_catalog_name, relative_filepath.with_suffix('')).as_posix(), filepath
+
+    def process_assets(self, asset_descriptor_data):
+        root_path = __asset_descriptor_manager__.get_root_path()
+
+        # discovery: collect the files of the assets which are not registered yet
+        new_asset_files_by_types = dict([(asset_type, {}) for asset_type in AssetTypes.get_types()])
+        for (asset_type, asset_path, filepath) in self.scan_asset_files(root_path, asset_descriptor_data):
+            new_asset_files = new_asset_files_by_types[asset_type]
+            if asset_path not in new_asset_files and __asset_descriptor_manager__.get_asset_metadata(asset_type=asset_type, asset_path=asset_path) is None:
+                new_asset_files[asset_path] = filepath
+
+        # extract guids and content fingerprints of the new files with the worker pool
+        filepaths = [filepath for new_asset_files in new_asset_files_by_types.values() for filepath in new_asset_files.values()]
+        guids_and_fingerprints = iter(self.extract_guids_and_fingerprints(asset_descriptor_data, filepaths))
+
+        # register in discovery order
+        new_asset_metadata_list_by_types = {}
+        for (asset_type, new_asset_files) in new_asset_files_by_types.items():
+            asset_metadata_list = []
+            new_asset_metadata_list_by_types[asset_type] = asset_metadata_list
+            for (asset_path, filepath) in new_asset_files.items():
+                (guid, fingerprint) = next(guids_and_fingerprints)
+                asset_metadata = AssetMetadata(
+                    asset_type=asset_type,
+                    asset_path=asset_path,
+                    filepath=filepath,
+                    guid=guid
+                )
+                asset_metadata.update_fingerprint(fingerprint)
+                asset_metadata_list.append(asset_metadata)
+                __asset_descriptor_manager__.register_asset_metadata(asset_metadata)
+                __logger__.info(f'register_asset_metadata: {asset_metadata.get_guid()}, {asset_metadata.get_asset_type()}, {asset_metadata.get_asset_path()}')
+
             # MATERIAL: material_create_infos
             if AssetTypes.MATERIAL == asset_type:
+                descriptor_data = asset_descriptor_data.get(asset_type, {})
                 for (material_guid, material_create_info) in descriptor_data.get('material_create_infos', {}).items():
                     filepath = Path(__asset_descriptor_manager__.get_asset_descriptor_filepath())
                     asset_path = material_create_info['asset_path']
@@ -239,15 +638,250 @@ class UnityAssetParser(AssetParser):
                             asset_type=asset_type,
                             asset_path=asset_path,
                             filepath=filepath,
-                            guid=material_guid,
-                            mtime=utilities.get_mtime(filepath),
+                            guid=material_guid
                         )
+                        asset_metadata.update_fingerprint()
                         asset_metadata_list.append(asset_metadata)
                         __asset_descriptor_manager__.register_asset_metadata(asset_metadata)
                         __logger__.debug(f'register_asset_metadata: {asset_metadata.get_guid()}, {asset_metadata.get_asset_type()}, {asset_metadata.get_asset_path()}')
 
+        # the assets which referenced one of the new guids before it was registered are processed again with it
+        new_asset_metadata_list = [asset_metadata for asset_metadata_list in new_asset_metadata_list_by_types.values() for asset_metadata in asset_metadata_list]
+        for invalidated_asset_metadata in __asset_descriptor_manager__.invalidate_unresolved_guid_dependents(new_asset_metadata_list):
+            asset_metadata = AssetMetadata(
+                asset_type=invalidated_asset_metadata.get_asset_type(),
+                asset_path=invalidated_asset_metadata.get_asset_path(),
+                filepath=invalidated_asset_metadata.get_filepath_posix(),
+                guid=invalidated_asset_metadata.get_guid(),
+                mtime=invalidated_asset_metadata.get_mtime(),
+                size=invalidated_asset_metadata.get_size(),
+                fingerprint=invalidated_asset_metadata.get_fingerprint()
+            )
+            new_asset_metadata_list_by_types[asset_metadata.get_asset_type()].append(asset_metadata)
+            __asset_descriptor_manager__.register_asset_metadata(asset_metadata)
+
         # process_asset_data
-        for asset_metadata_list in new_asset_metadata_list_by_types.values():
-            for asset_metadata in asset_metadata_list:
-                self.process_asset_data(asset_descriptor_data, asset_metadata)
+        self.process_asset_data_list(asset_descriptor_data, [
+            asset_metadata for asset_metadata_list in new_asset_metadata_list_by_types.values() for asset_metadata in asset_metadata_list
+        ])
+
+
+class UnityResolvedPrefab:
+    """
+    mesh guid and material guids of each MeshRenderer of a prefab, the renderers are keyed by their fileID in the prefab.
+    """
+    def __init__(self, mesh_guid='', material_guids_by_renderer=None, source_prefab_guid='', unresolved_guids=None):
+        self._mesh_guid = mesh_guid
+        self._material_guids_by_renderer = material_guids_by_renderer or {}
+        # the base prefab of a variant
+        self._source_prefab_guid = source_prefab_guid
+        # (asset_type, guid) of the source prefabs along the chain which are not registered yet
+        self._unresolved_guids = unresolved_guids or []
+
+    def get_source_prefab_guid(self):
+        return self._source_prefab_guid
+
+    def get_unresolved_guids(self):
+        return self._unresolved_guids
+
+    def get_mesh_guid(self):
+        return self._mesh_guid
+
+    def get_material_guids_by_renderer(self):
+        return self._material_guids_by_renderer
+
+
+class UnityTransformHierarchy:
+    """
+    local transforms of a unity scene by fileID, linked to their parents by m_Father.
+    the world matrices are composed once per depth level of the hierarchy and memoized, with numpy in batches of a level.
+    rotations are quaternions (x, y, z, w), euler angles are in degrees in the unity order (z, x, y).
+    """
+    def __init__(self):
+        self._parent_file_ids = {}
+        self._local_transforms = {}
+        self._depths = None
+        self._world_matrices = None
+
+    def add_transform(self, file_id, parent_file_id, position=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0, 1.0), scale=(1.0, 1.0, 1.0), euler_hint=None):
+        self._parent_file_ids[file_id] = parent_file_id
+        self._local_transforms[file_id] = (tuple(position), tuple(rotation), tuple(scale), euler_hint)
+        self._depths = None
+        self._world_matrices = None
+
+    def get_num_transforms(self):
+        return len(self._local_transforms)
+
+    def get_depths(self):
+        # walks up the m_Father links once per transform, depths found on the way are reused by the next walks.
+        if self._depths is None:
+            depths = {}
+            for file_id in self._parent_file_ids:
+                chain = []
+                chain_file_ids = set()
+                parent_file_id = file_id
+                while parent_file_id in self._parent_file_ids and parent_file_id not in depths:
+                    if parent_file_id in chain_file_ids:
+                        __logger__.error(f'UnityTransformHierarchy - cyclic m_Father: {parent_file_id}')
+                        break
+                    chain.append(parent_file_id)
+                    chain_file_ids.add(parent_file_id)
+                    parent_file_id = self._parent_file_ids[parent_file_id]
+
+                # the first transform of a broken cycle becomes a root
+                depth = depths.get(parent_file_id, -1) if parent_file_id not in chain_file_ids else -1
+                for chain_file_id in reversed(chain):
+                    depth += 1
+                    depths[chain_file_id] = depth
+            self._depths = depths
+        return self._depths
+
+    def get_levels(self):
+        levels = []
+        for (file_id, depth) in self.get_depths().items():
+            while len(levels) <= depth:
+                levels.append([])
+            levels[depth].append(file_id)
+        return levels
+
+    def get_world_matrices(self):
+        if self._world_matrices is None:
+            levels = self.get_levels()
+            if numpy is not None:
+                file_ids = [file_id for level in levels for file_id in level]
+                indices = dict([(file_id, index) for (index, file_id) in enumerate(file_ids)])
+                local_matrices = self.compose_matrices_batch(
+                    numpy.array([self._local_transforms[file_id][0] for file_id in file_ids], dtype=numpy.float64).reshape(-1, 3),
+                    numpy.array([self._local_transforms[file_id][1] for file_id in file_ids], dtype=numpy.float64).reshape(-1, 4),
+                    numpy.array([self._local_transforms[file_id][2] for file_id in file_ids], dtype=numpy.float64).reshape(-1, 3)
+                )
+                world_matrices = local_matrices.copy()
+                begin = len(levels[0]) if levels else 0
+                for level in levels[1:]:
+                    end = begin + len(level)
+                    parent_indices = numpy.array([indices[self._parent_file_ids[file_id]] for file_id in level], dtype=numpy.int64)
+                    world_matrices[begin:end] = numpy.matmul(world_matrices[parent_indices], local_matrices[begin:end])
+                    begin = end
+                self._world_matrices = (indices, world_matrices)
+            else:
+                world_matrices = {}
+                for (depth, level) in enumerate(levels):
+                    for file_id in level:
+                        (position, rotation, scale, euler_hint) = self._local_transforms[file_id]
+                        local_matrix = self.compose_matrix(position, rotation, scale)
+                        world_matrices[file_id] = local_matrix if 0 == depth else self.multiply_matrix(world_matrices[self._parent_file_ids[file_id]], local_matrix)
+                self._world_matrices = (None, world_matrices)
+        return self._world_matrices
+
+    def get_world_transforms(self, file_ids):
+        """
+        returns (position, euler, scale) of each transform. roots keep their local values and euler hint as written in the scene.
+        """
+        depths = self.get_depths()
+        world_transforms = [None] * len(file_ids)
+        child_indices = []
+        for (index, file_id) in enumerate(file_ids):
+            if 0 == depths[file_id]:
+                (position, rotation, scale, euler_hint) = self._local_transforms[file_id]
+                euler = euler_hint if euler_hint is not None else self.decompose_matrix(self.compose_matrix(position, rotation, (1.0, 1.0, 1.0)))[1]
+                world_transforms[index] = (list(position), list(euler), list(scale))
+            else:
+                child_indices.append(index)
+
+        if child_indices:
+            (indices, world_matrices) = self.get_world_matrices()
+            if indices is not None:
+                matrices = world_matrices[numpy.array([indices[file_ids[index]] for index in child_indices], dtype=numpy.int64)]
+                (positions, eulers, scales) = self.decompose_matrices_batch(matrices)
+                for (index, position, euler, scale) in zip(child_indices, positions.tolist(), eulers.tolist(), scales.tolist()):
+                    world_transforms[index] = (position, euler, scale)
+            else:
+                for index in child_indices:
+                    world_transforms[index] = self.decompose_matrix(world_matrices[file_ids[index]])
+        return world_transforms
+
+    @staticmethod
+    def quaternion_from_euler(euler):
+        # unity rotates around z, then x, then y: q = qy * qx * qz
+        (hx, hy, hz) = [math.radians(angle) * 0.5 for angle in euler[:3]]
+        (sx, cx, sy, cy, sz, cz) = (math.sin(hx), math.cos(hx), math.sin(hy), math.cos(hy), math.sin(hz), math.cos(hz))
+        return [
+            cy * sx * cz + sy * cx * sz,
+            sy * cx * cz - cy * sx * sz,
+            cy * cx * sz - sy * sx * cz,
+            cy * cx * cz + sy * sx * sz
+        ]
+
+    @staticmethod
+    def compose_matrix(position, rotation, scale):
+        (x, y, z, w) = rotation
+        length = math.sqrt(x * x + y * y + z * z + w * w) or 1.0
+        (x, y, z, w) = (x / length, y / length, z / length, w / length)
+        (sx, sy, sz) = scale
+        return [
+            [(1.0 - 2.0 * (y * y + z * z)) * sx, 2.0 * (x * y - z * w) * sy, 2.0 * (x * z + y * w) * sz, position[0]],
+            [2.0 * (x * y + z * w) * sx, (1.0 - 2.0 * (x * x + z * z)) * sy, 2.0 * (y * z - x * w) * sz, position[1]],
+            [2.0 * (x * z - y * w) * sx, 2.0 * (y * z + x * w) * sy, (1.0 - 2.0 * (x * x + y * y)) * sz, position[2]],
+            [0.0, 0.0, 0.0, 1.0]
+        ]
+
+    @staticmethod
+    def multiply_matrix(a, b):
+        return [[sum([a[row][k] * b[k][column] for k in range(4)]) for column in range(4)] for row in range(4)]
+
+    @staticmethod
+    def decompose_matrix(matrix):
+        position = [matrix[0][3], matrix[1][3], matrix[2][3]]
+        scale = [math.sqrt(sum([matrix[row][column] ** 2 for row in range(3)])) for column in range(3)]
+        r = [[matrix[row][column] / (scale[column] or 1.0) for column in range(3)] for row in range(3)]
+        if 0.9999 < abs(r[1][2]):
+            # gimbal lock, the rotation around z is folded into y
+            euler = [math.degrees(math.copysign(math.pi * 0.5, -r[1][2])), math.degrees(math.atan2(-r[2][0], r[0][0])), 0.0]
+        else:
+            euler = [math.degrees(math.asin(-r[1][2])), math.degrees(math.atan2(r[0][2], r[2][2])), math.degrees(math.atan2(r[1][0], r[1][1]))]
+        return position, euler, scale
+
+    @staticmethod
+    def compose_matrices_batch(positions, rotations, scales):
+        lengths = numpy.linalg.norm(rotations, axis=1)
+        rotations = rotations / numpy.where(lengths == 0.0, 1.0, lengths)[:, None]
+        (x, y, z, w) = (rotations[:, 0], rotations[:, 1], rotations[:, 2], rotations[:, 3])
+        matrices = numpy.zeros((len(positions), 4, 4), dtype=numpy.float64)
+        matrices[:, 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+        matrices[:, 0, 1] = 2.0 * (x * y - z * w)
+        matrices[:, 0, 2] = 2.0 * (x * z + y * w)
+        matrices[:, 1, 0] = 2.0 * (x * y + z * w)
+        matrices[:, 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+        matrices[:, 1, 2] = 2.0 * (y * z - x * w)
+        matrices[:, 2, 0] = 2.0 * (x * z - y * w)
+        matrices[:, 2, 1] = 2.0 * (y * z + x * w)
+        matrices[:, 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+        matrices[:, :3, :3] *= scales[:, None, :]
+        matrices[:, :3, 3] = positions
+        matrices[:, 3, 3] = 1.0
+        return matrices
+
+    @staticmethod
+    def decompose_matrices_batch(matrices):
+        positions = matrices[:, :3, 3]
+        scales = numpy.linalg.norm(matrices[:, :3, :3], axis=1)
+        r = matrices[:, :3, :3] / numpy.where(scales == 0.0, 1.0, scales)[:, None, :]
+        gimbal_lock = 0.9999 < numpy.abs(r[:, 1, 2])
+        eulers = numpy.empty((len(matrices), 3), dtype=numpy.float64)
+        eulers[:, 0] = numpy.arcsin(numpy.clip(-r[:, 1, 2], -1.0, 1.0))
+        eulers[:, 1] = numpy.where(gimbal_lock, numpy.arctan2(-r[:, 2, 0], r[:, 0, 0]), numpy.arctan2(r[:, 0, 2], r[:, 2, 2]))
+        eulers[:, 2] = numpy.where(gimbal_lock, 0.0, numpy.arctan2(r[:, 1, 0], r[:, 1, 1]))
+        return positions, numpy.degrees(eulers), scales
+
+
+def initialize_asset_data_worker(asset_descriptor_snapshot, asset_descriptor_data):
+    global __asset_descriptor_manager__
+    __asset_descriptor_manager__ = asset_descriptor_snapshot
+    __asset_parser__._asset_descriptor_data = asset_descriptor_data
+    # entries written by a worker would never reach the index of the main process.
+    if yaml_parser.__parse_cache__ is not None:
+        yaml_parser.__parse_cache__.set_read_only(True)
+
 
+def process_asset_data_worker(asset_type, filepath, guid):
+    return UnityAssetParser.parse_asset_data(__asset_parser__._asset_descriptor_data, asset_type, filepath, guid)
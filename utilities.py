@@ -1,5 +1,7 @@
 import bpy
+import contextlib
 import datetime
+import hashlib
 import logging
 import os
 import shutil
@@ -46,10 +48,137 @@ def copy(src_filepath, dst_filepath):
         if src_filepath.exists():
             if not dst_filepath.parent.exists():
                 os.makedirs(dst_filepath.parent.as_posix())
+                # the listings of any of the created directories' parents may be cached
+                invalidate_stat_cache()
             shutil.copy(src_filepath, dst_filepath)
+            invalidate_stat_cache(dst_filepath)
+
+class StatCache:
+    """
+    run-scoped cache of directory listings. the first lookup in a directory lists it with os.scandir,
+    exists is answered from the listing and the stat of an entry is cached by its DirEntry,
+    which costs no extra syscall on windows and one per file elsewhere.
+    """
+    def __init__(self):
+        self._dir_entries = {}
+        self._num_lookups = 0
+        self._num_hits = 0
+        self._num_scandirs = 0
+
+    @staticmethod
+    def split(filepath):
+        return os.path.split(os.path.normpath(os.fspath(filepath)))
+
+    def get_dir_entries(self, dirpath):
+        self._num_lookups += 1
+        # names are compared with normcase, as a case-insensitive file system would on windows
+        dirpath_key = os.path.normcase(dirpath)
+        dir_entries = self._dir_entries.get(dirpath_key)
+        if dir_entries is None:
+            self._num_scandirs += 1
+            try:
+                with os.scandir(dirpath or os.curdir) as scandir_entries:
+                    dir_entries = dict([(os.path.normcase(dir_entry.name), dir_entry) for dir_entry in scandir_entries])
+            except OSError:
+                dir_entries = {}
+            self._dir_entries[dirpath_key] = dir_entries
+        else:
+            self._num_hits += 1
+        return dir_entries
+
+    def get_dir_entry(self, filepath):
+        dirpath, filename = StatCache.split(filepath)
+        return self.get_dir_entries(dirpath).get(os.path.normcase(filename))
+
+    def scandir(self, dirpath):
+        return list(self.get_dir_entries(os.path.normpath(os.fspath(dirpath))).values())
+
+    def exists(self, filepath):
+        return self.get_dir_entry(filepath) is not None
+
+    def get_stat(self, filepath):
+        dir_entry = self.get_dir_entry(filepath)
+        if dir_entry is not None:
+            try:
+                return dir_entry.stat()
+            except OSError:
+                pass
+        return None
+
+    def invalidate(self, filepath=None):
+        if filepath is None:
+            self._dir_entries.clear()
+        else:
+            self._dir_entries.pop(os.path.normcase(StatCache.split(filepath)[0]), None)
+
+    def get_hit_counts(self):
+        return {'lookups': self._num_lookups, 'hits': self._num_hits, 'scandirs': self._num_scandirs}
+
+__stat_cache__ = None
+
+@contextlib.contextmanager
+def stat_cache_scope(logger=None):
+    """
+    enables the stat cache for the duration of a run, nested scopes share the cache of the outermost one.
+    """
+    global __stat_cache__
+    if __stat_cache__ is not None:
+        yield __stat_cache__
+        return
+
+    __stat_cache__ = StatCache()
+    try:
+        yield __stat_cache__
+    finally:
+        if logger is not None:
+            logger.info(f'stat cache: {__stat_cache__.get_hit_counts()}')
+        __stat_cache__ = None
+
+def scandir(dirpath):
+    """
+    DirEntry list of a directory, an empty list if it does not exist. served from the stat cache when it is enabled.
+    """
+    if __stat_cache__ is not None:
+        return __stat_cache__.scandir(dirpath)
+    try:
+        with os.scandir(dirpath) as dir_entries:
+            return list(dir_entries)
+    except OSError:
+        return []
+
+def invalidate_stat_cache(filepath=None):
+    if __stat_cache__ is not None:
+        __stat_cache__.invalidate(filepath)
+
+def exists(filepath):
+    if __stat_cache__ is not None:
+        return __stat_cache__.exists(filepath)
+    return os.path.exists(filepath)
+
+def get_stat(filepath):
+    if __stat_cache__ is not None:
+        return __stat_cache__.get_stat(filepath)
+    try:
+        return os.stat(filepath)
+    except OSError:
+        return None
 
 def get_mtime(filepath):
-    return filepath.stat().st_mtime if filepath.exists() else 0
+    stat = get_stat(filepath)
+    return stat.st_mtime if stat is not None else 0
+
+def get_fingerprint(filepath, chunk_size=1024 * 1024):
+    """
+    BLAKE2 digest of the file contents, an empty string if the file can not be read.
+    """
+    fingerprint = hashlib.blake2b(digest_size=16)
+    try:
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                fingerprint.update(chunk)
+    except OSError:
+        return ''
+    return fingerprint.hexdigest()
 
 def clear_assets(bpy_data_type):
     assets = bpy_data_type.values()
@@ -105,6 +234,7 @@ def save_as(filepath):
     if not filepath.parent.exists():
         os.makedirs(filepath.parent.as_posix())
     bpy.ops.wm.save_as_mainfile(filepath=filepath.as_posix())
+    invalidate_stat_cache(filepath)
 
 def open_text_file_in_blender_editor(filepath):
     filepath = Path(filepath)
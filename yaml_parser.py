@@ -1,20 +1,244 @@
+from collections import OrderedDict
+import codecs
+import hashlib
+import json
+import os
+import pickle
 import re
+import sys
 from pathlib import Path
 import traceback
 
+try:
+    import yaml as pyyaml
+except ImportError:
+    pyyaml = None
+
 re_ignore = re.compile(r"(%YAML|%TAG|---).+")
 re_depth = re.compile(r"([\s-]*)?.+")
-re_dict = re.compile(r"{(.+?)}")
-re_list = re.compile(r"[(.+?)]")
+re_unity_document = re.compile(rb"^--- !u!(\d+) &(-?\d+).*$", re.M)
+re_parse_cache_entry_name = re.compile(r"^[0-9a-f]{40}$")
+
+# bump when the parsed tree or the extracted values change, so that stale parse cache entries are ignored.
+YAML_PARSER_VERSION = 2
 
 __logger__ = None
+__parse_cache__ = None
+__backend__ = None
+# detected encoding by (filepath, size), later loads of the same file decode directly without detection.
+__encodings__ = {}
+
+
+def decode_contents(filepath: Path, contents: bytes):
+    if contents.startswith(codecs.BOM_UTF8):
+        candidate_encodings = ['utf-8-sig']
+    elif contents.startswith(codecs.BOM_UTF16_LE) or contents.startswith(codecs.BOM_UTF16_BE):
+        candidate_encodings = ['utf-16']
+    else:
+        key = (Path(filepath).as_posix(), len(contents))
+        encoding = __encodings__.get(key)
+        candidate_encodings = ['utf-8', 'cp949', 'utf-16']
+        if encoding:
+            candidate_encodings.remove(encoding)
+            candidate_encodings.insert(0, encoding)
+
+    for encoding in candidate_encodings:
+        try:
+            text = contents.decode(encoding)
+            if 1 < len(candidate_encodings):
+                __encodings__[key] = encoding
+            return text, encoding
+        except UnicodeError:
+            pass
+    return None, None
+
+
+class YAMLParseCache:
+    """
+    yaml_parser.__parse_cache__ = YAMLParseCache(cache_path, max_size=256 * 1024 * 1024)
+    yaml = YAML.load_yaml(filepath) # parsed once, then loaded from the cache while the file is unchanged
+    yaml_parser.__parse_cache__.save()
+
+    Entries are keyed by filepath, size, mtime and YAML_PARSER_VERSION and evicted in least recently used order.
+    """
+    def __init__(self, cache_path, max_size=256 * 1024 * 1024):
+        self._cache_path = Path(cache_path)
+        self._index_filepath = Path(cache_path, 'index.json')
+        self._max_size = max_size
+        self._total_size = 0
+        self._entries = OrderedDict()
+        self._num_hits = 0
+        self._num_misses = 0
+        self._read_only = False
+        self.load_index()
+
+    def set_read_only(self, read_only):
+        self._read_only = read_only
+
+    def get_num_hits(self):
+        return self._num_hits
+
+    def get_num_misses(self):
+        return self._num_misses
+
+    def load_index(self):
+        self._entries.clear()
+        if self._index_filepath.exists():
+            try:
+                for entry_name, entry_size in json.loads(self._index_filepath.read_text()):
+                    if Path(self._cache_path, entry_name).exists():
+                        self._entries[entry_name] = entry_size
+            except:
+                __logger__.info(f'failed to load yaml parse cache index: {self._index_filepath}, traceback: {traceback.format_exc()}')
+                self._entries.clear()
+        self.load_orphan_entries()
+        self._total_size = sum(self._entries.values())
+        self.evict()
+
+    def load_orphan_entries(self):
+        # entries written by a run which did not reach save are missing from the index,
+        # they are added as the least recently used ones so that evict bounds them too.
+        if not self._cache_path.exists():
+            return
+        orphan_entries = []
+        for entry_filepath in self._cache_path.iterdir():
+            if re_parse_cache_entry_name.match(entry_filepath.name) and entry_filepath.name not in self._entries:
+                stat = entry_filepath.stat()
+                orphan_entries.append((stat.st_mtime, entry_filepath.name, stat.st_size))
+        if orphan_entries:
+            __logger__.info(f'yaml parse cache: {len(orphan_entries)} entries missing from the index: {self._index_filepath}')
+            entries = [(entry_name, entry_size) for (mtime, entry_name, entry_size) in sorted(orphan_entries)]
+            entries.extend(self._entries.items())
+            self._entries = OrderedDict(entries)
+
+    def save(self):
+        if not self._cache_path.exists():
+            os.makedirs(self._cache_path.as_posix())
+        self._index_filepath.write_text(json.dumps(list(self._entries.items())))
+        __logger__.info(f'yaml parse cache: {self._cache_path}, hits: {self._num_hits}, misses: {self._num_misses}, entries: {len(self._entries)}, size: {self._total_size}')
+
+    @staticmethod
+    def get_entry_name(filepath: Path, key):
+        stat = filepath.stat()
+        entry_key = f'{YAML_PARSER_VERSION}|{get_backend().name}|{filepath.as_posix()}|{stat.st_size}|{stat.st_mtime_ns}|{key}'
+        return hashlib.sha1(entry_key.encode('utf-8')).hexdigest()
+
+    def get(self, filepath: Path, key):
+        if filepath.exists():
+            entry_name = self.get_entry_name(filepath, key)
+            if entry_name in self._entries:
+                try:
+                    value = pickle.loads(Path(self._cache_path, entry_name).read_bytes())
+                    self._entries.move_to_end(entry_name)
+                    self._num_hits += 1
+                    return value
+                except:
+                    __logger__.info(f'failed to load yaml parse cache entry: {filepath}, key: {key}, traceback: {traceback.format_exc()}')
+                    self.remove(entry_name)
+        self._num_misses += 1
+        return None
+
+    def set(self, filepath: Path, key, value):
+        if self._read_only or value is None or not filepath.exists():
+            return
+        entry_name = self.get_entry_name(filepath, key)
+        contents = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if self._max_size < len(contents):
+            return
+        if not self._cache_path.exists():
+            os.makedirs(self._cache_path.as_posix())
+        self.remove(entry_name)
+        Path(self._cache_path, entry_name).write_bytes(contents)
+        self._entries[entry_name] = len(contents)
+        self._total_size += len(contents)
+        self.evict()
+
+    def evict(self):
+        # evict least recently used entries
+        while self._max_size < self._total_size:
+            self.remove(next(iter(self._entries)))
+
+    def remove(self, entry_name):
+        if entry_name in self._entries:
+            self._total_size -= self._entries.pop(entry_name)
+            entry_filepath = Path(self._cache_path, entry_name)
+            if entry_filepath.exists():
+                entry_filepath.unlink()
+
+
+def decode_flow_value(text):
+    """
+    '{x: 0, y: 1}' -> {'x': '0', 'y': '1'}, '[a, b]' -> ['a', 'b'], any other text is returned as is.
+    unity writes flow mappings and sequences flat on a single line, so they are split by hand.
+    """
+    if text[:1] == '{':
+        end = text.find('}')
+        if 0 < end:
+            mapping = {}
+            for item in text[1:end].split(','):
+                separator = item.find(':')
+                if 0 <= separator:
+                    mapping[sys.intern(item[:separator].strip())] = item[separator + 1:].strip()
+            return mapping
+    elif text[:1] == '[':
+        end = text.find(']')
+        if 0 < end:
+            items = text[1:end].strip()
+            return [item.strip() for item in items.split(',')] if items else []
+    return text
+
+
+def decode_float(value):
+    return float(value)
+
+
+def decode_vector(value):
+    return tuple([float(value[key]) for key in ('x', 'y', 'z', 'w') if key in value])
+
+
+def decode_color(value):
+    return tuple([float(component) for component in value.values()])
+
+
+def decode_reference(value):
+    return UnityReference(file_id=int(value.get('fileID', 0)), guid=value.get('guid', ''), type=int(value.get('type', 0)))
+
+
+class UnityReference:
+    """
+    {fileID: 2800000, guid: 0123456789abcdef0123456789abcdef, type: 3}
+    """
+    __slots__ = ('_file_id', '_guid', '_type')
+
+    def __init__(self, file_id=0, guid='', type=0):
+        self._file_id = file_id
+        self._guid = guid
+        self._type = type
+
+    def __repr__(self):
+        return f'UnityReference(file_id={self._file_id}, guid={self._guid}, type={self._type})'
+
+    def get_file_id(self):
+        return self._file_id
+
+    def get_guid(self):
+        return self._guid
+
+    def get_type(self):
+        return self._type
+
 
 class YAMLGroup:
+    __slots__ = ('_group', '_group_by_name')
+
     def __init__(self):
         self._group = []
+        self._group_by_name = None
 
     def add_node(self, yaml_node):
         self._group.append(yaml_node)
+        if self._group_by_name is not None:
+            self._group_by_name.setdefault(yaml_node.get_name(), []).append(yaml_node)
 
     def get_node(self, index):
         return self._group[index]
@@ -22,14 +246,20 @@ class YAMLGroup:
     def get_nodes(self):
         return self._group
 
+    def get_group_by_name(self):
+        # built lazily on the first lookup, then kept up to date by add_node
+        if self._group_by_name is None:
+            self._group_by_name = {}
+            for yaml_node in self._group:
+                self._group_by_name.setdefault(yaml_node.get_name(), []).append(yaml_node)
+        return self._group_by_name
+
     def find_node(self, name):
-        for yaml_node in self._group:
-            if yaml_node.get_name() == name:
-                return yaml_node
-        return None
+        yaml_nodes = self.get_group_by_name().get(name)
+        return yaml_nodes[0] if yaml_nodes else None
 
     def find_nodes(self, name):
-        return [yaml_node for yaml_node in self._group if yaml_node.get_name() == name]
+        return list(self.get_group_by_name().get(name, []))
 
     def get_num_node(self):
         return len(self._group)
@@ -40,33 +270,47 @@ class YAML:
     yaml = YAML(name='YAML', contents=contents)
     data = yaml.to_dict()
     """
+    __slots__ = ('_parent', '_depth', '_name', '_value', '_decoded_value', '_typed_value', '_is_yaml_group_list', '_children', '_children_by_name', '_prefix')
+
     def __init__(self, parent=None, name='', value=None, prefix='', depth=0, contents=''):
         self._parent = parent
         self._depth = depth
         self._name = name
+        # the raw text of the value, decoded on the first access of get_value or a typed getter.
         self._value = value
+        self._decoded_value = None
+        self._typed_value = None
         self._is_yaml_group_list = False
-        self._children = []
+        # leaf nodes share the empty tuple, the list is created by the first add_child or add_group.
+        self._children = ()
+        self._children_by_name = None
         self._prefix = prefix
 
         if contents:
-            lines = contents.split('\n')
-            self.build_yaml(lines=lines, num_lines=len(lines))
+            self.build_yaml(lines=contents.split('\n'))
 
     @staticmethod
     def load_yaml(filepath: Path):
+        if __parse_cache__ is not None:
+            yaml = __parse_cache__.get(filepath, 'YAML')
+            if yaml is not None:
+                return yaml
+
         if filepath.exists():
-            for encoding in ['utf-8', 'utf-8-sig', 'cp949', 'utf-16']:
+            contents, encoding = decode_contents(filepath, filepath.read_bytes())
+            if contents is not None:
                 try:
-                    return YAML(name='YAML', contents=filepath.read_text(encoding=encoding))
+                    yaml = get_backend().parse(contents)
+                    if __parse_cache__ is not None:
+                        __parse_cache__.set(filepath, 'YAML', yaml)
+                    return yaml
                 except:
                     __logger__.info(f'failed to load yaml file: {filepath}, encoding: {encoding}, traceback: {traceback.format_exc()}')
-                    pass
         __logger__.info(f'failed to load yaml file: {filepath}')
         return None
 
     def get(self, key, default_value=None):
-        return self._value.get(key, default_value)
+        return self.get_value().get(key, default_value)
 
     def get_prefix(self):
         return self._prefix
@@ -74,91 +318,486 @@ class YAML:
     def get_name(self):
         return self._name
 
-    def get_value(self):
+    def get_raw_value(self):
         return self._value
 
+    def get_value(self):
+        if self._decoded_value is None:
+            self._decoded_value = decode_flow_value(self._value) if isinstance(self._value, str) else self._value
+        return self._decoded_value
+
+    def get_typed_value(self, decoder):
+        # memoized for the last decoder, a node holds one type of value.
+        if self._typed_value is None or self._typed_value[0] is not decoder:
+            self._typed_value = (decoder, decoder(self.get_value()))
+        return self._typed_value[1]
+
+    def get_float(self):
+        # a float is never a flow value, the raw text is converted without get_value
+        if self._typed_value is None or self._typed_value[0] is not decode_float:
+            self._typed_value = (decode_float, decode_float(self._value))
+        return self._typed_value[1]
+
+    def get_vector(self):
+        return self.get_typed_value(decode_vector)
+
+    def get_color(self):
+        return self.get_typed_value(decode_color)
+
+    def get_reference(self):
+        return self.get_typed_value(decode_reference)
+
+    def add_group(self):
+        if not self._children:
+            self._children = []
+        self._is_yaml_group_list = True
+        self._children.append(YAMLGroup())
+
     def add_child(self, child):
         child._parent = self
         if self._is_yaml_group_list:
             self._children[-1].add_node(child)
         else:
+            if not self._children:
+                self._children = []
             self._children.append(child)
+            if self._children_by_name is not None:
+                self._children_by_name.setdefault(child._name, []).append(child)
         return child
 
+    def get_children_by_name(self):
+        # built lazily on the first lookup, then kept up to date by add_child
+        if self._children_by_name is None:
+            self._children_by_name = {}
+            for child in self._children:
+                if isinstance(child, YAML):
+                    self._children_by_name.setdefault(child._name, []).append(child)
+        return self._children_by_name
+
     def get_child(self, name=None):
-        for child in self._children:
-            if name is None or child._name == name:
-                return child
-        return None
+        if name is None:
+            return self._children[0] if self._children else None
+        children = self.get_children_by_name().get(name)
+        return children[0] if children else None
 
     def get_children(self, name=None):
-        return [child for child in self._children if name is None or child._name == name]
-
-    def build_yaml(self, lines=[], num_lines=0):
-        while lines:
-            line = lines.pop(0)
-            tokens = line.split(':', 1)
-            if line and not re_ignore.match(line):
-                prefix = re_depth.findall(line)[0]
-                num_depth = int(len(prefix) / 2) + 1
-                if self._depth < num_depth:
-                    if len(tokens) == 2:
-                        name = tokens[0][len(prefix):].strip()
-                        value = tokens[1].strip()
-                    else:
-                        name = ''
-                        value = line[len(prefix):].strip()
-
-                    # no-named dict
-                    if name.startswith('{'):
-                        value = line[len(prefix):].strip()
-                        name = ''
+        if name is None:
+            return list(self._children)
+        return list(self.get_children_by_name().get(name, []))
 
+    def get_last_child(self):
+        last_child = self._children[-1]
+        if self._is_yaml_group_list:
+            last_child = last_child._group[-1]
+        return last_child
+
+    @staticmethod
+    def parse_line(line, prefix):
+        tokens = line.split(':', 1)
+        if len(tokens) == 2:
+            name = sys.intern(tokens[0][len(prefix):].strip())
+            value = tokens[1].strip()
+        else:
+            name = ''
+            value = line[len(prefix):].strip()
+
+        # no-named dict
+        if name.startswith('{'):
+            value = line[len(prefix):].strip()
+            name = ''
+
+        # flow mappings and sequences are kept as text, see decode_flow_value
+        return name, value
+
+    def build_yaml(self, lines):
+        # walk the lines once with a cursor, the stack holds the chain of nodes from self to the current parent.
+        stack = [self]
+        for line_index, line in enumerate(lines):
+            if not line or re_ignore.match(line):
+                continue
+
+            prefix = sys.intern(re_depth.findall(line)[0])
+            num_depth = int(len(prefix) / 2) + 1
+            while stack:
+                parent = stack[-1]
+                if num_depth <= parent._depth:
+                    # goto parent
+                    stack.pop()
+                elif (parent._depth + 1) == num_depth:
                     # list of yaml group
                     if '-' in prefix:
-                        if (self._depth + 1) == num_depth:
-                            self._is_yaml_group_list = True
-                            self._children.append(YAMLGroup())
-
-                    # value of dict
-                    list_values = re_list.match(value)
-                    dict_values = re_dict.match(value)
-                    if dict_values:
-                        value = {}
-                        for dict_value in dict_values.groups()[0].split(','):
-                            dict_value = dict_value.split(':', 1)
-                            value[dict_value[0].strip()] = dict_value[1].strip()
-                    elif list_values:
-                        value = []
-                        for list_value in list_values.groups()[0].split(','):
-                            value.append(list_value.strip())
-
-                    yaml_node = YAML(name=name, value=value, prefix=prefix, depth=num_depth)
-                    if (self._depth + 1) == num_depth:
-                        self.add_child(yaml_node)
-                    elif (self._depth + 2) == num_depth:
-                        lines.insert(0, line)
-                        last_child = self._children[-1]
-                        if self._is_yaml_group_list:
-                            last_child = last_child._group[-1]
-                        last_child.build_yaml(lines=lines, num_lines=num_lines)
-                    else:
-                        __logger__.error(f'[{num_lines - len(lines)}] - line: {line}, depth: {self._depth}, num_depth: {num_depth}')
+                        parent.add_group()
+                    name, value = YAML.parse_line(line, prefix)
+                    parent.add_child(YAML(name=name, value=value, prefix=prefix, depth=num_depth))
+                    break
+                elif (parent._depth + 2) == num_depth:
+                    stack.append(parent.get_last_child())
                 else:
-                    # goto parent
-                    lines.insert(0, line)
-                    return
+                    __logger__.error(f'[{line_index + 1}] - line: {line}, depth: {parent._depth}, num_depth: {num_depth}')
+                    break
 
-    def dump(self, contents=None, depth=0):
-        if depth == 0:
-            contents = []
+            if not stack:
+                return
 
+    def iter_child_nodes(self):
         for child in self._children:
-            nodes = child.get_nodes() if isinstance(child, YAMLGroup) else [child]
-            for node in nodes:
-                if node.get_value():
-                    contents.append(f'{node.get_prefix()}{node.get_name()}: {node.get_value()}')
+            if isinstance(child, YAMLGroup):
+                yield from child.get_nodes()
+            else:
+                yield child
+
+    def iter_dump(self):
+        # depth first with a stack of child iterators, so lines are yielded one by one without recursion.
+        stack = [self.iter_child_nodes()]
+        while stack:
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                continue
+
+            if not node.get_name():
+                # an item of a sequence, '- {fileID: 0}' or '- _EMISSION'
+                yield f'{node.get_prefix()}{node.get_raw_value()}'
+            elif node.get_raw_value():
+                yield f'{node.get_prefix()}{node.get_name()}: {node.get_raw_value()}'
+            else:
+                yield f'{node.get_prefix()}{node.get_name()}:'
+            stack.append(node.iter_child_nodes())
+
+    def write_dump(self, f):
+        for (index, line) in enumerate(self.iter_dump()):
+            if 0 < index:
+                f.write('\n')
+            f.write(line)
+
+    def dump_to(self, filepath: Path, encoding='utf-8'):
+        with open(filepath, 'w', encoding=encoding) as f:
+            self.write_dump(f)
+
+    def dump(self):
+        return '\n'.join(self.iter_dump())
+
+
+class YAMLBackend:
+    """
+    parses yaml contents into a YAML tree, select one with set_backend(name).
+    """
+    name = ''
+
+    @classmethod
+    def is_available(cls):
+        return True
+
+    def parse(self, contents):
+        raise NotImplementedError
+
+
+class PythonYAMLBackend(YAMLBackend):
+    name = 'python'
+
+    def parse(self, contents):
+        return YAML(name='YAML', contents=contents)
+
+
+class LibYAMLBackend(YAMLBackend):
+    """
+    composes the documents with libyaml through PyYAML's CBaseLoader, which keeps every scalar as a string,
+    then converts them to the same YAML/YAMLGroup tree that the python backend builds from unity yaml files.
+    quoted scalars and flow collections keep their text as written, like the raw values of the python backend.
+    """
+    name = 'libyaml'
+    re_unity_tag = re.compile(r"^--- !u!.*$", re.M)
+    # the line breaks of libyaml, so that the line numbers of the node marks index the same lines
+    re_line_break = re.compile(r"\r\n|[\r\n\x85\u2028\u2029]")
+
+    @classmethod
+    def is_available(cls):
+        return pyyaml is not None and getattr(pyyaml, '__with_libyaml__', False)
+
+    def parse(self, contents):
+        # unity declares the !u! tag handle only once for all documents and marks some documents as 'stripped'.
+        contents = self.re_unity_tag.sub('---', contents)
+        lines = self.re_line_break.split(contents)
+        yaml = YAML(name='YAML')
+        for document_node in pyyaml.compose_all(contents, Loader=pyyaml.CBaseLoader):
+            if isinstance(document_node, pyyaml.MappingNode):
+                self.add_mapping(lines, yaml, document_node, depth=1, first_prefix='')
+        return yaml
+
+    def add_mapping(self, lines, parent, mapping_node, depth, first_prefix):
+        for (index, (key_node, value_node)) in enumerate(mapping_node.value):
+            prefix = first_prefix if index == 0 else ' ' * (2 * (depth - 1))
+            self.add_node(lines, parent, key_node.value, value_node, depth, prefix)
+
+    def add_node(self, lines, parent, name, value_node, depth, prefix):
+        if isinstance(value_node, pyyaml.ScalarNode) or value_node.flow_style:
+            parent.add_child(YAML(name=sys.intern(name), value=self.get_flow_text(lines, value_node), prefix=sys.intern(prefix), depth=depth))
+            return
+
+        yaml_node = parent.add_child(YAML(name=sys.intern(name), value='', prefix=sys.intern(prefix), depth=depth))
+        if isinstance(value_node, pyyaml.MappingNode):
+            self.add_mapping(lines, yaml_node, value_node, depth + 1, ' ' * (2 * depth))
+        else:
+            item_prefix = sys.intern(' ' * (2 * (depth - 1)) + '- ')
+            for item_node in value_node.value:
+                yaml_node.add_group()
+                if isinstance(item_node, pyyaml.MappingNode) and not item_node.flow_style:
+                    self.add_mapping(lines, yaml_node, item_node, depth + 1, item_prefix)
                 else:
-                    contents.append(f'{node.get_prefix()}{node.get_name()}:')
-                node.dump(contents=contents, depth=depth + 1)
-        return '\n'.join(contents) if depth == 0 else None
\ No newline at end of file
+                    yaml_node.add_child(YAML(name='', value=self.get_flow_text(lines, item_node), prefix=item_prefix, depth=depth + 1))
+
+    def get_flow_text(self, lines, value_node):
+        if isinstance(value_node, pyyaml.ScalarNode) and value_node.style not in ("'", '"'):
+            return value_node.value
+
+        # a quoted scalar or a flow collection on a single line is taken from the source text
+        (start_mark, end_mark) = (value_node.start_mark, value_node.end_mark)
+        if start_mark.line == end_mark.line and start_mark.line < len(lines):
+            return lines[start_mark.line][start_mark.column:end_mark.column]
+        return self.get_composed_flow_text(value_node)
+
+    def get_composed_flow_text(self, value_node):
+        if isinstance(value_node, pyyaml.ScalarNode):
+            if value_node.style == "'":
+                return "'" + value_node.value.replace("'", "''") + "'"
+            elif value_node.style == '"':
+                return '"' + value_node.value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+            return value_node.value
+        elif isinstance(value_node, pyyaml.MappingNode):
+            return '{' + ', '.join([f'{key_node.value}: {self.get_composed_flow_text(item_node)}' for (key_node, item_node) in value_node.value]) + '}'
+        return '[' + ', '.join([self.get_composed_flow_text(item_node) for item_node in value_node.value]) + ']'
+
+
+YAML_BACKENDS = {
+    PythonYAMLBackend.name: PythonYAMLBackend,
+    LibYAMLBackend.name: LibYAMLBackend,
+}
+
+
+def get_backend():
+    global __backend__
+    if __backend__ is None:
+        __backend__ = PythonYAMLBackend()
+    return __backend__
+
+
+def set_backend(backend_name):
+    global __backend__
+    backend_class = YAML_BACKENDS.get(backend_name)
+    if backend_class is None or not backend_class.is_available():
+        __logger__.info(f'yaml backend is not available: {backend_name}, fallback to {PythonYAMLBackend.name}')
+        backend_class = PythonYAMLBackend
+    __backend__ = backend_class()
+    __logger__.info(f'yaml backend: {__backend__.name}')
+    return __backend__
+
+
+class UnityYAMLDocument:
+    __slots__ = ('_class_id', '_file_id', '_type_name', '_offset', '_size')
+
+    def __init__(self, class_id=0, file_id=0, type_name='', offset=0, size=0):
+        self._class_id = class_id
+        self._file_id = file_id
+        self._type_name = type_name
+        self._offset = offset
+        self._size = size
+
+    def __repr__(self):
+        return f'UnityYAMLDocument(class_id={self._class_id}, file_id={self._file_id}, type_name={self._type_name}, offset={self._offset}, size={self._size})'
+
+    def get_class_id(self):
+        return self._class_id
+
+    def get_file_id(self):
+        return self._file_id
+
+    def get_type_name(self):
+        return self._type_name
+
+    def get_offset(self):
+        return self._offset
+
+    def get_size(self):
+        return self._size
+
+
+class UnityYAMLFile:
+    """
+    unity_yaml_file = UnityYAMLFile(filepath)
+    yaml = unity_yaml_file.load_yaml(type_names=['PrefabInstance'])
+
+    Scans the '--- !u!<classID> &<fileID>' headers of a unity yaml file once and parses only the requested documents.
+    """
+    def __init__(self, filepath: Path):
+        self._filepath = Path(filepath)
+        self._contents = b''
+        self._encoding = 'utf-8'
+        # scanned lazily, so that a parse cache hit never reads the file.
+        self._documents = None
+        self._documents_by_file_id = {}
+
+    def exists(self):
+        return self._filepath.exists()
+
+    def read_bytes(self):
+        contents = self._filepath.read_bytes()
+        text, encoding = decode_contents(self._filepath, contents)
+        if encoding is None:
+            __logger__.info(f'failed to detect encoding of unity yaml file: {self._filepath}')
+            return b''
+
+        # offsets of utf-16 files are recorded in the utf-8 re-encoded contents.
+        if encoding == 'utf-16':
+            self._encoding = 'utf-8'
+            return text.encode('utf-8')
+        elif encoding == 'utf-8-sig':
+            self._encoding = 'utf-8'
+            return contents[len(codecs.BOM_UTF8):]
+        self._encoding = encoding
+        return contents
+
+    def decode(self, contents):
+        return contents.decode(self._encoding)
+
+    def scan_documents(self):
+        self._contents = self.read_bytes() if self._filepath.exists() else b''
+        self._documents = []
+        self._documents_by_file_id.clear()
+        matches = list(re_unity_document.finditer(self._contents))
+        for index, match in enumerate(matches):
+            offset = match.start()
+            end = matches[index + 1].start() if (index + 1) < len(matches) else len(self._contents)
+            type_line_end = self._contents.find(b'\n', match.end() + 1, end)
+            type_line = self._contents[match.end() + 1:end if type_line_end < 0 else type_line_end]
+            document = UnityYAMLDocument(
+                class_id=int(match.group(1)),
+                file_id=int(match.group(2)),
+                type_name=type_line.split(b':', 1)[0].strip().decode('utf-8', errors='replace'),
+                offset=offset,
+                size=end - offset
+            )
+            self._documents.append(document)
+            self._documents_by_file_id[document.get_file_id()] = document
+
+    def get_documents(self, type_names=None):
+        if self._documents is None:
+            self.scan_documents()
+        return [document for document in self._documents if type_names is None or document.get_type_name() in type_names]
+
+    def get_document(self, file_id):
+        if self._documents is None:
+            self.scan_documents()
+        return self._documents_by_file_id.get(file_id)
+
+    def get_document_contents(self, document):
+        return self.decode(self._contents[document.get_offset():document.get_offset() + document.get_size()])
+
+    def load_yaml(self, type_names=None):
+        cache_key = f'UnityYAMLFile|{sorted(type_names) if type_names is not None else None}'
+        if __parse_cache__ is not None:
+            yaml = __parse_cache__.get(self._filepath, cache_key)
+            if yaml is not None:
+                return yaml
+
+        if not self.get_documents():
+            return YAML.load_yaml(self._filepath)
+
+        try:
+            contents = '\n'.join([self.get_document_contents(document) for document in self.get_documents(type_names)])
+            yaml = get_backend().parse(contents)
+            if __parse_cache__ is not None:
+                __parse_cache__.set(self._filepath, cache_key, yaml)
+            return yaml
+        except:
+            __logger__.info(f'failed to load unity yaml file: {self._filepath}, type_names: {type_names}, traceback: {traceback.format_exc()}')
+        return None
+
+    def load_yaml_documents(self, type_names=None):
+        """
+        for document, yaml_node in unity_yaml_file.load_yaml_documents(type_names=['Transform']):
+            ...
+
+        Like load_yaml, but pairs each top level node with its document, so that the nodes can be looked up by fileID.
+        """
+        cache_key = f'UnityYAMLFile.load_yaml_documents|{sorted(type_names) if type_names is not None else None}'
+        if __parse_cache__ is not None:
+            yaml_documents = __parse_cache__.get(self._filepath, cache_key)
+            if yaml_documents is not None:
+                return yaml_documents
+
+        documents = self.get_documents(type_names)
+        if not documents:
+            return []
+
+        try:
+            contents = '\n'.join([self.get_document_contents(document) for document in documents])
+            yaml_nodes = get_backend().parse(contents).get_children()
+            # every unity document holds a single top level node
+            if len(yaml_nodes) != len(documents):
+                __logger__.info(f'failed to pair unity yaml documents: {self._filepath}, documents: {len(documents)}, nodes: {len(yaml_nodes)}')
+                return []
+            yaml_documents = list(zip(documents, yaml_nodes))
+            if __parse_cache__ is not None:
+                __parse_cache__.set(self._filepath, cache_key, yaml_documents)
+            return yaml_documents
+        except:
+            __logger__.info(f'failed to load unity yaml file: {self._filepath}, type_names: {type_names}, traceback: {traceback.format_exc()}')
+        return []
+
+
+def decode_line(line: bytes):
+    try:
+        return line.decode('utf-8').rstrip('\r\n')
+    except UnicodeDecodeError:
+        return line.decode('cp949', errors='replace').rstrip('\r\n')
+
+
+def iter_yaml_lines(filepath: Path):
+    with open(filepath, 'rb') as f:
+        head = f.peek(len(codecs.BOM_UTF8))
+        if head.startswith(codecs.BOM_UTF16_LE) or head.startswith(codecs.BOM_UTF16_BE):
+            contents, encoding = decode_contents(filepath, f.read())
+            yield from (contents or '').split('\n')
+            return
+
+        if head.startswith(codecs.BOM_UTF8):
+            f.read(len(codecs.BOM_UTF8))
+        for line in f:
+            yield decode_line(line)
+
+
+def iter_yaml_values(filepath: Path, key_paths):
+    """
+    for key_path, value in iter_yaml_values(filepath, ['guid', 'TextureImporter.serializedVersion']):
+        ...
+
+    Streams the lines of a yaml file without building nodes and yields (key_path, value) for each requested key path.
+    Key paths are dot separated names of nested keys. Reading stops as soon as every key path has been found.
+    """
+    remaining_key_paths = set(key_paths)
+    max_depth = max([key_path.count('.') + 1 for key_path in remaining_key_paths], default=0)
+    names = []
+    for line in iter_yaml_lines(filepath):
+        if not remaining_key_paths:
+            return
+
+        if not line or re_ignore.match(line):
+            continue
+
+        stripped_line = line.lstrip(' -')
+        num_depth = int((len(line) - len(stripped_line)) / 2) + 1
+        if max_depth < num_depth:
+            continue
+
+        del names[num_depth - 1:]
+        names.extend([''] * (num_depth - 1 - len(names)))
+        names.append(stripped_line.split(':', 1)[0].strip())
+        key_path = '.'.join(names)
+        if key_path in remaining_key_paths:
+            remaining_key_paths.remove(key_path)
+            prefix = line[:len(line) - len(stripped_line)]
+            yield key_path, decode_flow_value(YAML.parse_line(line, prefix)[1])
+
+
+def extract_yaml_values(filepath: Path, key_paths):
+    return dict(iter_yaml_values(filepath, key_paths))